@@ -1,6 +1,16 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from application.database.async_db import shutdown_db_executor
+from application.database.mssql_connection import close_sql_pool
+from application.database.nosql_connection import close_cosmos_client
+from application.features.assignment_version_generation.prompt_registry import get_prompt_registry
+from application.features.gpt.openai_client import close_openai_clients
+from application.services.docx_render_pool import shutdown_docx_render_pool
+from application.services.job_queue import close_job_queue
+
 # from application.core.config import get_settings
 
 from application.features.students.routes import router as student_router
@@ -18,8 +28,24 @@ from application.features.blob.routes import router as blob_router
 from application.features.gpt.routes import router as gpt_router
 from application.features.ratings.routes import router as ratings_router
 from application.features.student_groups.routes import router as student_groups_router
+from application.features.metrics.routes import router as metrics_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and validate prompt templates so a broken template fails startup, not a request
+    get_prompt_registry()
+    yield
+    # Stop taking generation jobs, then release pooled connections on shutdown
+    close_job_queue()
+    await close_openai_clients()
+    shutdown_docx_render_pool()
+    shutdown_db_executor()
+    close_sql_pool()
+    close_cosmos_client()
+
 
-application = FastAPI()
+application = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
@@ -48,3 +74,4 @@ application.include_router(tutor_students_router, tags=["TutorStudents"], prefix
 application.include_router(blob_router, tags=["Blob"], prefix="/blob")
 application.include_router(blob_router, tags=["Blob"], prefix="/blob")
 application.include_router(gpt_router, prefix="/gpt", tags=["GPT"])
+application.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
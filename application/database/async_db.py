@@ -0,0 +1,94 @@
+"""
+Async access to the blocking database drivers.
+
+pyodbc and the synchronous Cosmos SDK block the calling thread, so calling them
+directly from an `async def` route stalls the event loop for every request in the
+worker. `run_db` hands such calls to a dedicated thread pool sized to the SQL
+connection pool: at most SQL_POOL_MAX_SIZE calls run at once (one per pooled
+connection) and the rest wait in the executor queue instead of on the loop.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from application.database.mssql_connection import SQL_POOL_MAX_SIZE
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_submitted = 0
+_pending = 0
+_running = 0
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Return the process-wide database executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=SQL_POOL_MAX_SIZE,
+                    thread_name_prefix="db"
+                )
+    return _executor
+
+
+def _tracked(func: Callable[[], T]) -> T:
+    global _running
+    with _stats_lock:
+        _running += 1
+    try:
+        return func()
+    finally:
+        with _stats_lock:
+            _running -= 1
+
+
+def _on_done(_future):
+    # Runs on completion and on cancellation of calls that never started
+    global _pending
+    with _stats_lock:
+        _pending -= 1
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking data-access function on the database executor and await its result.
+    Exceptions (including HTTPException raised by CRUD helpers) propagate unchanged.
+    """
+    global _submitted, _pending
+    call = functools.partial(func, *args, **kwargs)
+    with _stats_lock:
+        _submitted += 1
+        _pending += 1
+    try:
+        future = get_db_executor().submit(_tracked, call)
+    except BaseException:
+        _on_done(None)
+        raise
+    future.add_done_callback(_on_done)
+    return await asyncio.wrap_future(future)
+
+
+def shutdown_db_executor():
+    global _executor
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def get_db_executor_stats() -> dict:
+    with _stats_lock:
+        return {
+            "max_workers": SQL_POOL_MAX_SIZE,
+            "running": _running,
+            "queued": _pending - _running,
+            "submitted": _submitted,
+        }
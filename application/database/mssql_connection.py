@@ -1,16 +1,287 @@
 import pyodbc
 import os
+import threading
+import time
+from collections import deque
 from dotenv import load_dotenv
 from contextlib import contextmanager
+from typing import Callable, Optional
 
 load_dotenv()
 
+SQL_POOL_MAX_SIZE = int(os.getenv("SQL_POOL_MAX_SIZE", "10"))
+SQL_POOL_ACQUIRE_TIMEOUT = float(os.getenv("SQL_POOL_ACQUIRE_TIMEOUT", "30"))
+SQL_POOL_MAX_IDLE_SECONDS = float(os.getenv("SQL_POOL_MAX_IDLE_SECONDS", "300"))
+SQL_POOL_MAX_LIFETIME_SECONDS = float(os.getenv("SQL_POOL_MAX_LIFETIME_SECONDS", "1800"))
+# Connections idle for longer than this are pinged before being handed out
+SQL_POOL_PING_AFTER_SECONDS = float(os.getenv("SQL_POOL_PING_AFTER_SECONDS", "30"))
+SQL_CONNECT_TIMEOUT = int(os.getenv("SQL_CONNECT_TIMEOUT", "30"))
+
+
+class PoolTimeoutError(pyodbc.OperationalError):
+    """Raised when no pooled connection becomes available within the acquire timeout."""
+
+
+class PoolClosedError(pyodbc.OperationalError):
+    """Raised when a connection is requested from a pool that has been shut down."""
+
+
+class _PooledConnection:
+    __slots__ = ("connection", "created_at", "last_used")
+
+    def __init__(self, connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+
+
+class SqlConnectionPool:
+    """
+    Bounded, thread-safe pool of pyodbc connections.
+
+    Idle connections are reused LIFO so the hottest ones stay warm, pinged when they
+    have been idle for a while, and recycled once they exceed the max idle time or
+    max lifetime. Callers block for up to `acquire_timeout` seconds when every
+    connection is checked out.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], "pyodbc.Connection"],
+        max_size: int = SQL_POOL_MAX_SIZE,
+        acquire_timeout: float = SQL_POOL_ACQUIRE_TIMEOUT,
+        max_idle_seconds: float = SQL_POOL_MAX_IDLE_SECONDS,
+        max_lifetime_seconds: float = SQL_POOL_MAX_LIFETIME_SECONDS,
+        ping_after_seconds: float = SQL_POOL_PING_AFTER_SECONDS,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._connect = connect
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.ping_after_seconds = ping_after_seconds
+
+        self._idle: deque[_PooledConnection] = deque()
+        self._available = threading.Condition(threading.Lock())
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._created = 0
+        self._recycled = 0
+        self._timeouts = 0
+        self._closed = False
+
+    # ---------- internal helpers ----------
+
+    def _is_expired(self, entry: _PooledConnection, now: float) -> bool:
+        if now - entry.created_at >= self.max_lifetime_seconds:
+            return True
+        return now - entry.last_used >= self.max_idle_seconds
+
+    @staticmethod
+    def _close_quietly(entry: _PooledConnection):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(entry: _PooledConnection) -> bool:
+        try:
+            cursor = entry.connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _forget(self, entry: _PooledConnection):
+        """Drop a checked-out connection from the pool's accounting and close it."""
+        with self._available:
+            self._size -= 1
+            self._in_use -= 1
+            self._recycled += 1
+            self._available.notify()
+        self._close_quietly(entry)
+
+    # ---------- public API ----------
+
+    def acquire(self) -> _PooledConnection:
+        deadline = time.monotonic() + self.acquire_timeout
+
+        while True:
+            expired = []
+            entry = None
+            create = False
+
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("SQL connection pool is closed")
+
+                    now = time.monotonic()
+                    while self._idle:
+                        candidate = self._idle.pop()
+                        if self._is_expired(candidate, now):
+                            self._size -= 1
+                            self._recycled += 1
+                            expired.append(candidate)
+                            continue
+                        entry = candidate
+                        break
+
+                    if entry is not None:
+                        self._in_use += 1
+                        break
+
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self._in_use += 1
+                        create = True
+                        break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.acquire_timeout}s waiting for a SQL connection "
+                            f"({self._in_use}/{self.max_size} in use)"
+                        )
+
+                    self._waiting += 1
+                    try:
+                        self._available.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            for stale in expired:
+                self._close_quietly(stale)
+
+            if create:
+                try:
+                    entry = _PooledConnection(self._connect())
+                except BaseException:
+                    with self._available:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._available.notify()
+                    raise
+                with self._available:
+                    self._created += 1
+                return entry
+
+            # Reused connection: verify it before handing it out if it sat idle for a while
+            if time.monotonic() - entry.last_used < self.ping_after_seconds or self._is_alive(entry):
+                return entry
+
+            self._forget(entry)
+
+    def release(self, entry: _PooledConnection, discard: bool = False):
+        """
+        Return a connection to the pool. Any open transaction is rolled back so the
+        next borrower starts clean; connections that fail the rollback, are past
+        their lifetime, or belong to a closed pool are closed instead.
+        """
+        if not discard:
+            try:
+                entry.connection.rollback()
+                if entry.connection.autocommit:
+                    entry.connection.autocommit = False
+            except pyodbc.Error:
+                discard = True
+
+        now = time.monotonic()
+        with self._available:
+            if self._closed or now - entry.created_at >= self.max_lifetime_seconds:
+                discard = True
+
+            if discard:
+                self._size -= 1
+                self._recycled += 1
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+
+            self._in_use -= 1
+            self._available.notify()
+
+        if discard:
+            self._close_quietly(entry)
+
+    @contextmanager
+    def connection(self):
+        entry = self.acquire()
+        try:
+            yield entry.connection
+        finally:
+            self.release(entry)
+
+    def close(self):
+        """Close all idle connections and reject new acquisitions; in-use ones close on release."""
+        with self._available:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._available.notify_all()
+
+        for entry in idle:
+            self._close_quietly(entry)
+
+    def stats(self) -> dict:
+        with self._available:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "created": self._created,
+                "recycled": self._recycled,
+                "timeouts": self._timeouts,
+                "closed": self._closed,
+            }
+
+
+_pool: Optional[SqlConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def _connect_from_env():
+    return pyodbc.connect(os.getenv("SQL_URL"), timeout=SQL_CONNECT_TIMEOUT)
+
+
+def get_sql_pool() -> SqlConnectionPool:
+    """Return the process-wide SQL connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SqlConnectionPool(_connect_from_env)
+    return _pool
+
+
+def close_sql_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_sql_pool_stats() -> dict:
+    return get_sql_pool().stats()
+
+
 @contextmanager
 def get_sql_db_connection():
-    """Context manager that opens and closes the SQL connection safely."""
-    sql_url = os.getenv("SQL_URL")
-    conn = pyodbc.connect(sql_url, timeout=30)
-    try:
+    """Context manager that borrows a pooled SQL connection and returns it safely."""
+    with get_sql_pool().connection() as conn:
         yield conn
-    finally:
-        conn.close()
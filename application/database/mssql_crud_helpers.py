@@ -1,3 +1,4 @@
+from application.database.async_db import run_db
 from application.database.mssql_connection import get_sql_db_connection
 import pyodbc
 from typing import List, Dict
@@ -171,4 +172,32 @@ def delete_record(table_name, record_id):
                 return {"error": f"No record with id {record_id} found in {table_name}"}
             return {"message": f"Record deleted from {table_name}"}
     except pyodbc.Error as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+
+# ---------- async variants for async route handlers ----------
+# Same behaviour and return shapes as the functions above, run on the database
+# executor so the event loop is not blocked while pyodbc waits on the server.
+
+async def fetch_all_async(table_name: str):
+    return await run_db(fetch_all, table_name)
+
+
+async def fetch_by_id_async(table_name, record_id):
+    return await run_db(fetch_by_id, table_name, record_id)
+
+
+async def create_record_async(table_name, data):
+    return await run_db(create_record, table_name, data)
+
+
+async def create_many_records_async(table_name, data_list) -> List[Dict]:
+    return await run_db(create_many_records, table_name, data_list)
+
+
+async def update_record_async(table_name, record_id, update_data):
+    return await run_db(update_record, table_name, record_id, update_data)
+
+
+async def delete_record_async(table_name, record_id):
+    return await run_db(delete_record, table_name, record_id)
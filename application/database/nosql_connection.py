@@ -1,17 +1,56 @@
 from azure.cosmos import CosmosClient
 import os
+import threading
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_cosmos_db_connection():
-    endpoint = os.getenv("COSMOS_ENDPOINT")
-    key = os.getenv("COSMOS_KEY")
-    client = CosmosClient(endpoint, key)
-    return client
-
-def get_container():
-    client = get_cosmos_db_connection()
-    DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
-    container = client.get_database_client(DATABASE_NAME).get_container_client("ai-assignment-versions-v2")
-    return container
\ No newline at end of file
+PROFILE_CONTAINER_NAME = "ai-student-profile"
+VERSIONS_CONTAINER_NAME = "ai-assignment-versions-v2"
+VERSION_SUMMARIES_CONTAINER_NAME = "ai-assignment-version-summaries"
+GENERATION_JOBS_CONTAINER_NAME = "ai-generation-jobs"
+GPT_SUMMARY_CACHE_CONTAINER_NAME = "ai-gpt-summary-cache"
+GPT_SUGGESTION_CACHE_CONTAINER_NAME = "ai-gpt-suggestion-cache"
+
+_client: Optional[CosmosClient] = None
+_containers: Dict[str, object] = {}
+_lock = threading.Lock()
+
+
+def get_cosmos_db_connection() -> CosmosClient:
+    """Return the process-wide Cosmos client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                endpoint = os.getenv("COSMOS_ENDPOINT")
+                key = os.getenv("COSMOS_KEY")
+                _client = CosmosClient(endpoint, key)
+    return _client
+
+
+def get_container(container_name: str = VERSIONS_CONTAINER_NAME):
+    """Return a cached container proxy for the configured Cosmos database."""
+    container = _containers.get(container_name)
+    if container is None:
+        client = get_cosmos_db_connection()
+        with _lock:
+            container = _containers.get(container_name)
+            if container is None:
+                DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
+                container = client.get_database_client(DATABASE_NAME).get_container_client(container_name)
+                _containers[container_name] = container
+    return container
+
+
+def close_cosmos_client():
+    """Close the shared Cosmos client and drop cached container proxies."""
+    global _client
+    with _lock:
+        client = _client
+        _client = None
+        _containers.clear()
+
+    if client is not None:
+        client.__exit__(None, None, None)
@@ -2,33 +2,31 @@
 import json
 import datetime
 import os
-from dotenv import load_dotenv
 import pyodbc
+from dotenv import load_dotenv
 from fastapi import HTTPException
 
 from application.database.mssql_connection import get_sql_db_connection
-from application.database.nosql_connection import get_cosmos_db_connection
-
-PROFILE_CONTAINER_NAME = "ai-student-profile"
-VERSIONS_CONTAINER_NAME = "ai-assignment-versions-v2"
+from application.database.nosql_connection import PROFILE_CONTAINER_NAME, get_container
+from application.features.assignment_version_generation.content_condenser import get_prompt_content
+from application.features.assignment_version_generation.prompt_registry import render_prompt_messages_within_budget
+from application.features.versionHistory.version_repository import get_version_document
 
 load_dotenv()
-DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
-
-_cosmos = get_cosmos_db_connection()
-_db = _cosmos.get_database_client(DATABASE_NAME)
-versions_container = _db.get_container_client(VERSIONS_CONTAINER_NAME)
-profile_container  = _db.get_container_client(PROFILE_CONTAINER_NAME)
-
+GPT_MODEL = os.getenv("GPT_MODEL")
+# Output allowance for full version generation; the prompt is fitted to leave room for it
+GENERATION_MAX_OUTPUT_TOKENS = 16000
 
 
 def load_assignment_context(assignment_version_id: str):
+    """
+    Version document, assignment, class and full student profile from SQL and Cosmos.
+    Only database work happens here; long content is condensed in build_prompt_for_version.
+    """
     # Version doc
-    try:
-        version_doc = versions_container.read_item(
-            item=assignment_version_id, partition_key=assignment_version_id
-        )
-    except Exception:
+    profile_container = get_container(PROFILE_CONTAINER_NAME)
+    version_doc = get_version_document(assignment_version_id)
+    if not version_doc:
         raise HTTPException(status_code=404, detail="Assignment version not found")
 
     assignment_id = version_doc["assignment_id"]
@@ -122,10 +120,22 @@ def build_prompt_for_version(
     assignment_version_id: str,
     selected_options: list[str],
     additional_edit_suggestions: str | None = "",
-    for_stream: bool = True
+    for_stream: bool = True,
+    context: tuple | None = None
 ):
+    """
+    Messages and persistence context for generating a version. Pass context (from
+    load_assignment_context) when it was loaded separately, e.g. on the DB executor,
+    so only the model work of condensing runs here.
+    """
     # Load context
-    version_doc, assignment, class_info, full_profile = load_assignment_context(assignment_version_id)
+    version_doc, assignment, class_info, full_profile = context or load_assignment_context(assignment_version_id)
+
+    # Long assignments are replaced by their condensed form in prompts (may call the model)
+    assignment = {
+        **assignment,
+        "content": get_prompt_content(assignment["id"], assignment["title"], assignment["content"]),
+    }
 
     # Selected options JSON
     selected = filter_selected_options(version_doc, selected_options)
@@ -134,9 +144,8 @@ def build_prompt_for_version(
     # Choose group A/B template file
     group = full_profile.get("group_type")
     if group == "A":
-        with open("application/features/assignment_version_generation/prompts/group_A_version_generation_prompt.txt", "r", encoding="utf-8") as f:
-            template = f.read()
-        user_prompt = template.format(
+        prompt_messages, prompt_tokens = render_prompt_messages_within_budget(
+            "group_A_version_generation_prompt", GPT_MODEL, GENERATION_MAX_OUTPUT_TOKENS,
             reading_level=full_profile.get("reading_level", "N/A"),
             writing_level=full_profile.get("writing_level", "N/A"),
             strengths=", ".join(full_profile.get("strengths", [])),
@@ -154,9 +163,8 @@ def build_prompt_for_version(
             additional_ideas_for_changes=additional_edit_suggestions or ""
         )
     else:
-        with open("application/features/assignment_version_generation/prompts/group_B_version_generation_prompt.txt", "r", encoding="utf-8") as f:
-            template = f.read()
-        user_prompt = template.format(
+        prompt_messages, prompt_tokens = render_prompt_messages_within_budget(
+            "group_B_version_generation_prompt", GPT_MODEL, GENERATION_MAX_OUTPUT_TOKENS,
             class_name=class_info.get("class_name", "N/A"),
             assignment_title=assignment.get("title", "N/A"),
             assignment_content=assignment.get("content", "N/A"),
@@ -239,15 +247,17 @@ def build_prompt_for_version(
     # )
 
 
-    messages = []
+    # Static instructions as the system message, student/assignment input as the user message
+    messages = list(prompt_messages)
     persist_ctx = {
         "version_doc": version_doc,
         "selected_options": selected_options,
         "additional_edit_suggestions": additional_edit_suggestions or "",
+        # Counted while fitting the prompt; passed on so the model call does not re-encode it
+        "prompt_tokens": prompt_tokens,
     }
     # if for_stream:
     #     messages.append({"role": "system", "content": tool_stream_header})
     # else:
     #     messages.append({"role": "system", "content": json_header})
-    messages.append({"role": "user", "content": user_prompt})
     return messages, persist_ctx
@@ -0,0 +1,212 @@
+"""
+Condensing long assignment content before it goes into generation prompts.
+
+Assignments uploaded as multi-page PDFs can carry tens of thousands of tokens of text,
+most of it boilerplate. When an assignment's content is over
+ASSIGNMENT_CONDENSE_THRESHOLD_TOKENS, it is split into chunks on paragraph boundaries.
+The chunks are condensed in parallel with a cheaper model (map), then joined in order
+(reduce). If the joined text is still over the threshold it gets one more pass.
+
+The result is stored on the assignment row together with the SHA-256 of the content
+it was made from, so it is reused until the content changes:
+
+    ALTER TABLE dbo.Assignments ADD condensed_content NVARCHAR(MAX) NULL,
+                                    condensed_content_hash CHAR(64) NULL;
+
+Identical content (e.g. one file uploaded for a whole class) is condensed once per
+process through a content-addressed cache, even before any row has been written.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import pyodbc
+from dotenv import load_dotenv
+
+from application.database.mssql_connection import get_sql_db_connection
+from application.features.assignment_version_generation.prompt_registry import (
+    get_prompt_version,
+    render_prompt_messages,
+)
+from application.features.gpt.gpt_connection import get_gpt_response
+from application.features.gpt.token_budget import count_tokens, get_encoder
+from application.services.content_cache import ContentCache, MemoryCacheTier, make_cache_key
+
+load_dotenv()
+
+ASSIGNMENT_CONDENSE_THRESHOLD_TOKENS = int(os.getenv("ASSIGNMENT_CONDENSE_THRESHOLD_TOKENS", "6000"))
+ASSIGNMENT_CONDENSE_CHUNK_TOKENS = int(os.getenv("ASSIGNMENT_CONDENSE_CHUNK_TOKENS", "3000"))
+ASSIGNMENT_CONDENSE_MODEL = os.getenv("ASSIGNMENT_CONDENSE_MODEL", "gpt-4o-mini")
+ASSIGNMENT_CONDENSE_CHUNK_OUTPUT_TOKENS = int(os.getenv("ASSIGNMENT_CONDENSE_CHUNK_OUTPUT_TOKENS", "1000"))
+ASSIGNMENT_CONDENSE_CONCURRENCY = int(os.getenv("ASSIGNMENT_CONDENSE_CONCURRENCY", "4"))
+ASSIGNMENT_CONDENSE_MAX_ROUNDS = 2
+
+CONDENSE_PROMPT = "assignment_condense_prompt"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def needs_condensing(content: Optional[str]) -> bool:
+    return bool(content) and count_tokens(content, ASSIGNMENT_CONDENSE_MODEL) > ASSIGNMENT_CONDENSE_THRESHOLD_TOKENS
+
+
+# ---------- map / reduce ----------
+
+def split_into_chunks(text: str, chunk_tokens: Optional[int] = None) -> List[str]:
+    """Split on blank lines into chunks of at most chunk_tokens; oversized paragraphs are cut by tokens."""
+    chunk_tokens = chunk_tokens or ASSIGNMENT_CONDENSE_CHUNK_TOKENS
+    encoder = get_encoder(ASSIGNMENT_CONDENSE_MODEL)
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for paragraph in text.split("\n\n"):
+        tokens = encoder.encode(paragraph, disallowed_special=())
+        if len(tokens) > chunk_tokens:
+            pieces = [encoder.decode(tokens[i:i + chunk_tokens]) for i in range(0, len(tokens), chunk_tokens)]
+        else:
+            pieces = [paragraph]
+
+        for piece in pieces:
+            piece_tokens = len(tokens) if len(pieces) == 1 else len(encoder.encode(piece, disallowed_special=()))
+            if current and current_tokens + piece_tokens > chunk_tokens:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def condense_chunk(title: str, chunk: str, part_number: int, part_count: int) -> str:
+    system_message, user_message = render_prompt_messages(
+        CONDENSE_PROMPT,
+        assignment_title=title or "Untitled assignment",
+        part_number=part_number,
+        part_count=part_count,
+        chunk=chunk,
+    )
+    return get_gpt_response(
+        user_message["content"],
+        model=ASSIGNMENT_CONDENSE_MODEL,
+        override_max_tokens=ASSIGNMENT_CONDENSE_CHUNK_OUTPUT_TOKENS,
+        system_prompt=system_message["content"],
+        call_type="summary",
+    )
+
+
+_condense_executor: Optional[ThreadPoolExecutor] = None
+_condense_executor_lock = threading.Lock()
+
+
+def _get_condense_executor() -> ThreadPoolExecutor:
+    global _condense_executor
+    if _condense_executor is None:
+        with _condense_executor_lock:
+            if _condense_executor is None:
+                _condense_executor = ThreadPoolExecutor(
+                    max_workers=ASSIGNMENT_CONDENSE_CONCURRENCY,
+                    thread_name_prefix="assignment-condense"
+                )
+    return _condense_executor
+
+
+def condense_content(title: str, content: str) -> str:
+    """Map-reduce condensation of content; returns it unchanged if it is under the threshold."""
+    text = content
+    for _ in range(ASSIGNMENT_CONDENSE_MAX_ROUNDS):
+        if not needs_condensing(text):
+            break
+        chunks = split_into_chunks(text)
+        futures = [
+            _get_condense_executor().submit(condense_chunk, title, chunk, i, len(chunks))
+            for i, chunk in enumerate(chunks, start=1)
+        ]
+        # Keep chunk order; the first failure is raised
+        text = "\n\n".join(future.result().strip() for future in futures)
+    return text
+
+
+# ---------- caching ----------
+
+_condensed_cache = ContentCache("assignment_condense", MemoryCacheTier(max_entries=200, ttl_seconds=24 * 3600))
+_stats_lock = threading.Lock()
+_row_stats = {"row_hits": 0, "row_write_failures": 0, "condense_failures": 0}
+
+
+def _count_row(name: str):
+    with _stats_lock:
+        _row_stats[name] += 1
+
+
+def _load_condensed(assignment_id: int, digest: str) -> Optional[str]:
+    try:
+        with get_sql_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT condensed_content FROM dbo.Assignments
+                    WHERE id = ? AND condensed_content_hash = ?
+                """, (assignment_id, digest))
+                row = cursor.fetchone()
+    except pyodbc.Error as e:
+        print(f"Could not read condensed content for assignment {assignment_id}: {e}")
+        return None
+    return row[0] if row else None
+
+
+def _store_condensed(assignment_id: int, digest: str, condensed: str):
+    try:
+        with get_sql_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE dbo.Assignments
+                    SET condensed_content = ?, condensed_content_hash = ?
+                    WHERE id = ?
+                """, (condensed, digest, assignment_id))
+                conn.commit()
+    except pyodbc.Error as e:
+        # The condensed text is still used for this request and cached in memory
+        _count_row("row_write_failures")
+        print(f"Could not store condensed content for assignment {assignment_id}: {e}")
+
+
+def get_prompt_content(assignment_id: int, title: str, content: Optional[str]) -> Optional[str]:
+    """
+    The assignment content to put in a prompt: the original when it is short enough,
+    otherwise its condensed form from the assignment row, the in-process cache, or a
+    fresh condensation (which is then stored on the row). If condensing fails the
+    original is returned and the prompt budget shortens it instead.
+    """
+    if not needs_condensing(content):
+        return content
+
+    digest = content_hash(content)
+    condensed = _load_condensed(assignment_id, digest)
+    if condensed:
+        _count_row("row_hits")
+        return condensed
+
+    key = make_cache_key(CONDENSE_PROMPT, content, get_prompt_version(CONDENSE_PROMPT), ASSIGNMENT_CONDENSE_MODEL)
+    try:
+        condensed = _condensed_cache.get_or_compute(key, lambda: condense_content(title, content))
+    except Exception as e:
+        _count_row("condense_failures")
+        print(f"Condensing assignment {assignment_id} failed, using the original content: {e}")
+        return content
+    _store_condensed(assignment_id, digest, condensed)
+    return condensed
+
+
+def get_condense_stats() -> dict:
+    stats = _condensed_cache.stats()
+    with _stats_lock:
+        stats.update(_row_stats)
+    stats["threshold_tokens"] = ASSIGNMENT_CONDENSE_THRESHOLD_TOKENS
+    stats["model"] = ASSIGNMENT_CONDENSE_MODEL
+    return stats
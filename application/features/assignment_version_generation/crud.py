@@ -1,21 +1,46 @@
+import asyncio
 import datetime
 import json
 import os
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable
 from dotenv import load_dotenv
 from fastapi import HTTPException
 import pyodbc
 import uuid
+from application.database.async_db import run_db
 from application.database.mssql_connection import get_sql_db_connection
-from application.features.assignment_version_generation.assignment_context import build_prompt_for_version
+from application.features.assignment_version_generation.assignment_context import (
+    GENERATION_MAX_OUTPUT_TOKENS,
+    build_prompt_for_version,
+    load_assignment_context,
+)
 from application.features.assignment_version_generation.helpers import generate_assignment, generate_assignment_modification_suggestions
-from application.database.nosql_connection import get_cosmos_db_connection
-
-
-from application.features.gpt.crud import process_gpt_prompt_html
+from application.features.assignment_version_generation.content_condenser import get_prompt_content
+from application.features.assignment_version_generation.prompt_registry import render_prompt_messages
+from application.features.assignment_version_generation.sections import (
+    SECTION_KEYS,
+    find_sections,
+    normalize_section_html,
+    splice_section,
+)
+from application.database.nosql_connection import PROFILE_CONTAINER_NAME, get_container
+from application.features.versionHistory.version_summaries import refresh_assignment_version_summary
+from application.features.versionHistory.version_repository import (
+    create_version_document,
+    get_version_document,
+    get_version_numbers_for_assignment,
+    replace_version_document,
+)
+
+
+from application.features.gpt.crud import process_gpt_prompt_html, stream_gpt_prompt_html
 
 
 load_dotenv()
 GPT_MODEL = os.getenv("GPT_MODEL")
+# A single section is a small fraction of a full version
+SECTION_MAX_OUTPUT_TOKENS = 3000
 
 
 def convert_json_to_html(json_content: dict) -> str:
@@ -98,28 +123,12 @@ def convert_json_to_html(json_content: dict) -> str:
 
 
 
-# Constants
-load_dotenv()
-DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
-
-PROFILE_CONTAINER_NAME = "ai-student-profile"
-VERSIONS_CONTAINER_NAME = "ai-assignment-versions-v2"
-
-# Cosmos client and containers
-client = get_cosmos_db_connection()
-db = client.get_database_client(DATABASE_NAME)
-profile_container = db.get_container_client(PROFILE_CONTAINER_NAME)
-versions_container = db.get_container_client(VERSIONS_CONTAINER_NAME)
-
 def handle_assignment_suggestion_generation(assignment_id: int, modifier_id: int, from_version: str = None) -> dict:
     # If from_version is provided, retrieve the stored options and create a new version
+    profile_container = get_container(PROFILE_CONTAINER_NAME)
     if from_version:
-        try:
-            version_doc = versions_container.read_item(
-                item=from_version,
-                partition_key=from_version
-            )
-        except Exception:
+        version_doc = get_version_document(from_version)
+        if not version_doc:
             raise HTTPException(status_code=404, detail="Version document not found")
 
         # Verify this version belongs to the requested assignment
@@ -140,11 +149,7 @@ def handle_assignment_suggestion_generation(assignment_id: int, modifier_id: int
 
         # Determine next version number from CosmosDB
         try:
-            existing_versions = list(versions_container.query_items(
-                query="SELECT VALUE c.version_number FROM c WHERE c.assignment_id = @aid",
-                parameters=[{"name": "@aid", "value": assignment_id}],
-                enable_cross_partition_query=True
-            ))
+            existing_versions = get_version_numbers_for_assignment(assignment_id)
             next_version = max(existing_versions or [0]) + 1
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error fetching version numbers: {str(e)}")
@@ -163,10 +168,12 @@ def handle_assignment_suggestion_generation(assignment_id: int, modifier_id: int
                 "finalized": False,
                 "date_modified": datetime.datetime.utcnow().isoformat()
             }
-            versions_container.create_item(body=new_doc)
+            create_version_document(new_doc)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error saving new version: {str(e)}")
 
+        refresh_assignment_version_summary(assignment_id)
+
         return {
             "skills_for_success": skills_for_success,
             "learning_pathways": generated_options,
@@ -248,6 +255,7 @@ def handle_assignment_suggestion_generation(assignment_id: int, modifier_id: int
 
     # 5. Generate GPT suggestions
     try:
+        assignment["content"] = get_prompt_content(assignment_id, assignment["title"], assignment["content"])
         gpt_raw = generate_assignment_modification_suggestions(
             student_profile=full_profile,
             assignment=assignment,
@@ -258,16 +266,14 @@ def handle_assignment_suggestion_generation(assignment_id: int, modifier_id: int
         # Inject internal IDs into each learning pathway
         for idx, option in enumerate(gpt_data.get("learning_pathways", []), start=1):
             option["internal_id"] = f"opt_{idx}"
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"GPT generation failed: {str(e)}")
 
     # 6. Determine next version number from CosmosDB
     try:
-        existing_versions = list(versions_container.query_items(
-            query="SELECT VALUE c.version_number FROM c WHERE c.assignment_id = @aid",
-            parameters=[{"name": "@aid", "value": assignment_id}],
-            enable_cross_partition_query=True
-        ))
+        existing_versions = get_version_numbers_for_assignment(assignment_id)
         next_version = max(existing_versions or [0]) + 1
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching version numbers: {str(e)}")
@@ -287,10 +293,12 @@ def handle_assignment_suggestion_generation(assignment_id: int, modifier_id: int
             "finalized": False,
             "date_modified": datetime.datetime.utcnow().isoformat()
         }
-        versions_container.create_item(body=new_doc)
+        create_version_document(new_doc)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving new version: {str(e)}")
 
+    refresh_assignment_version_summary(assignment_id)
+
     return {
         "skills_for_success": new_doc["skills_for_success"],
         "learning_pathways": new_doc["generated_options"],
@@ -324,7 +332,7 @@ def get_html_content_from_document(version_doc: dict) -> str | None:
         # Update the document to use HTML format (migrate on-the-fly)
         version_doc["final_generated_content"] = {"html_content": html_content}
         try:
-            versions_container.replace_item(item=version_doc["id"], body=version_doc)
+            replace_version_document(version_doc)
         except Exception as e:
             # If migration fails, just return the converted HTML without persisting
             pass
@@ -338,6 +346,13 @@ def get_html_content_from_document(version_doc: dict) -> str | None:
     return None
 
 
+def _split_messages(messages: list[dict]) -> tuple[str, str]:
+    """Join chat messages into (system prompt, user prompt) strings for the HTML generation calls."""
+    system_prompt = "\n".join(msg["content"] for msg in messages if msg["role"] == "system")
+    prompt = "\n".join(msg["content"] for msg in messages if msg["role"] == "user")
+    return system_prompt, prompt
+
+
 def handle_assignment_version_generation(
     assignment_version_id: str,
     selected_options: list[str],
@@ -353,20 +368,24 @@ def handle_assignment_version_generation(
 
     # Call HTML generation model
     try:
-        # Convert messages to a single prompt string for HTML generation
-        prompt = "\n".join([msg["content"] for msg in messages if msg["role"] == "user"])
+        system_prompt, prompt = _split_messages(messages)
         result_html = process_gpt_prompt_html(
             prompt=prompt,
             model=GPT_MODEL,
-            override_max_tokens=16000,
+            override_max_tokens=GENERATION_MAX_OUTPUT_TOKENS,
+            system_prompt=system_prompt,
+            prompt_tokens=ctx["prompt_tokens"],
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"GPT generation failed: {str(e)}")
 
-    version_doc = ctx["version_doc"]
-    current_timestamp = datetime.datetime.utcnow().replace(tzinfo=None).isoformat() + "Z"
+    return persist_generated_version_html(ctx, result_html)
 
-    # Save current version to history before updating (if it exists)
+
+def _push_generation_history(version_doc: dict, generation_type: str, current_timestamp: str, **details):
+    """Move the version's current content into generation_history (if it has any) before it is replaced."""
     if "final_generated_content" in version_doc and version_doc["final_generated_content"]:
         # Initialize generation_history if it doesn't exist
         if "generation_history" not in version_doc:
@@ -375,11 +394,25 @@ def handle_assignment_version_generation(
         # Add current version to history
         current_version = version_doc["final_generated_content"].copy()
         current_version["timestamp"] = version_doc.get("date_modified", current_timestamp)
-        current_version["generation_type"] = "regeneration"  # This is a regeneration of existing content
+        current_version["generation_type"] = generation_type
+        current_version.update(details)
         version_doc["generation_history"].append(current_version)
 
-    version_doc["selected_options"] = selected_options
-    version_doc["additional_edit_suggestions"] = additional_edit_suggestions or ""
+
+def persist_generated_version_html(ctx: dict, result_html: str) -> dict:
+    """
+    Store freshly generated HTML on the version document from build_prompt_for_version's
+    context, moving any existing content into generation_history first.
+    Shared by the synchronous, job and streaming generation paths.
+    """
+    version_doc = ctx["version_doc"]
+    current_timestamp = datetime.datetime.utcnow().replace(tzinfo=None).isoformat() + "Z"
+
+    # Save current version to history before updating (if it exists)
+    _push_generation_history(version_doc, "regeneration", current_timestamp)  # This is a regeneration of existing content
+
+    version_doc["selected_options"] = ctx["selected_options"]
+    version_doc["additional_edit_suggestions"] = ctx["additional_edit_suggestions"]
     version_doc["finalized"] = False
     version_doc["final_generated_content"] = {
         "html_content": result_html
@@ -387,10 +420,12 @@ def handle_assignment_version_generation(
     version_doc["date_modified"] = current_timestamp
 
     try:
-        versions_container.replace_item(item=version_doc["id"], body=version_doc)
+        replace_version_document(version_doc)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update version document: {str(e)}")
 
+    refresh_assignment_version_summary(version_doc["assignment_id"])
+
     return {
         "version_document_id": version_doc["id"],
         "html_content": result_html,
@@ -399,15 +434,175 @@ def handle_assignment_version_generation(
 
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_assignment_version_generation(
+    assignment_version_id: str,
+    selected_options: list[str],
+    additional_edit_suggestions: str | None,
+    is_disconnected: Callable[[], Awaitable[bool]]
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of handle_assignment_version_generation, as server-sent events:
+        start    - {"version_document_id"} once the prompt is built
+        delta    - {"html"} for each chunk of generated HTML
+        complete - {"version_document_id", "html_content"} after the version is saved
+        error    - {"status_code", "detail"}
+    The version is only persisted when the stream finishes. If the client
+    disconnects, the upstream model stream is closed and nothing is saved.
+    """
+    try:
+        # SQL and Cosmos on the DB executor; condensing long content calls the model,
+        # so it runs on its own thread rather than holding a DB executor slot
+        context = await run_db(load_assignment_context, assignment_version_id)
+        messages, ctx = await asyncio.to_thread(
+            build_prompt_for_version,
+            assignment_version_id=assignment_version_id,
+            selected_options=selected_options,
+            additional_edit_suggestions=additional_edit_suggestions or "",
+            for_stream=True,
+            context=context
+        )
+    except HTTPException as e:
+        yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+        return
+
+    yield _sse("start", {"version_document_id": ctx["version_doc"]["id"]})
+
+    system_prompt, prompt = _split_messages(messages)
+    chunks = []
+    try:
+        async with aclosing(stream_gpt_prompt_html(
+            prompt=prompt, model=GPT_MODEL, override_max_tokens=GENERATION_MAX_OUTPUT_TOKENS, system_prompt=system_prompt,
+            prompt_tokens=ctx["prompt_tokens"]
+        )) as stream:
+            async for delta in stream:
+                if await is_disconnected():
+                    print(f"Client disconnected, cancelled generation for {assignment_version_id}")
+                    return
+                chunks.append(delta)
+                yield _sse("delta", {"html": delta})
+    except HTTPException as e:
+        yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+        return
+    except Exception as e:
+        yield _sse("error", {"status_code": 500, "detail": f"GPT generation failed: {str(e)}"})
+        return
+
+    result_html = "".join(chunks).strip()
+    try:
+        result = await run_db(persist_generated_version_html, ctx, result_html)
+    except HTTPException as e:
+        yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+        return
+
+    yield _sse("complete", result)
+
+
+def _load_section_context(assignment_id: int) -> dict:
+    """The few assignment and student fields a section rewrite needs, in one query."""
+    try:
+        with get_sql_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT a.title, c.name, s.reading_level, s.writing_level
+                    FROM dbo.Assignments a
+                    JOIN dbo.Students s ON s.id = a.student_id
+                    LEFT JOIN dbo.Classes c ON c.id = a.class_id
+                    WHERE a.id = ?
+                """, (assignment_id,))
+                row = cursor.fetchone()
+    except pyodbc.Error as e:
+        raise HTTPException(status_code=500, detail=f"SQL error: {str(e)}")
+    if not row:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+
+    return {
+        "assignment_title": row[0] or "N/A",
+        "class_name": row[1] or "N/A",
+        "reading_level": row[2] or "N/A",
+        "writing_level": row[3] or "N/A",
+    }
+
+
+def handle_section_regeneration(assignment_version_id: str, section_key: str, instructions: str) -> dict:
+    """
+    Regenerate one section of a version's HTML and splice it back in place.
+    Only that section, the outline of the others and a few assignment fields are
+    sent to the model; the previous content goes to generation_history.
+    """
+    if section_key not in SECTION_KEYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown section '{section_key}'. Expected one of: {', '.join(SECTION_KEYS)}"
+        )
+
+    version_doc = get_version_document(assignment_version_id)
+    if not version_doc:
+        raise HTTPException(status_code=404, detail="Assignment version not found")
+
+    html_content = get_html_content_from_document(version_doc)
+    if html_content is None:
+        raise HTTPException(status_code=404, detail="No content found for this assignment version")
+
+    sections = find_sections(html_content)
+    section = next((s for s in sections if s["key"] == section_key), None)
+    if section is None:
+        raise HTTPException(status_code=404, detail=f"Section '{section_key}' not found in this version")
+
+    context = _load_section_context(version_doc["assignment_id"])
+    system_prompt, prompt = _split_messages(render_prompt_messages(
+        "section_regeneration_prompt",
+        outline="\n".join(f"-\t{s['heading'] or s['key'] or 'Untitled section'}" for s in sections),
+        section_title=section["heading"] or section_key,
+        section_html=section["html"],
+        instructions=instructions,
+        **context
+    ))
+
+    try:
+        result_html = process_gpt_prompt_html(
+            prompt=prompt,
+            model=GPT_MODEL,
+            override_max_tokens=SECTION_MAX_OUTPUT_TOKENS,
+            system_prompt=system_prompt,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"GPT generation failed: {str(e)}")
+
+    section_html = normalize_section_html(result_html, section)
+    updated_html = splice_section(html_content, section, section_html)
+
+    current_timestamp = datetime.datetime.utcnow().isoformat() + "Z"
+    _push_generation_history(version_doc, "section_regeneration", current_timestamp, section=section_key)
+    version_doc["final_generated_content"] = {"html_content": updated_html}
+    version_doc["finalized"] = False
+    version_doc["date_modified"] = current_timestamp
+
+    try:
+        replace_version_document(version_doc)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update version document: {str(e)}")
+
+    refresh_assignment_version_summary(version_doc["assignment_id"])
+
+    return {
+        "version_document_id": version_doc["id"],
+        "section": section_key,
+        "section_html": section_html,
+        "html_content": updated_html,
+    }
+
+
 # For PUT endpoint. Replaces the full HTML content. Preserves the original.
 def handle_assignment_version_update(assignment_version_id: str, updated_html: str) -> dict:
     # 1) Load
-    try:
-        version_doc = versions_container.read_item(
-            item=assignment_version_id,
-            partition_key=assignment_version_id
-        )
-    except Exception:
+    version_doc = get_version_document(assignment_version_id)
+    if not version_doc:
         raise HTTPException(status_code=404, detail="Assignment version not found")
 
     # 2) Basic validation - ensure it's HTML content
@@ -424,16 +619,7 @@ def handle_assignment_version_update(assignment_version_id: str, updated_html: s
             version_doc["original_generated_content"] = original_content
 
     # Save current version to history before updating (if it exists)
-    if "final_generated_content" in version_doc and version_doc["final_generated_content"]:
-        # Initialize generation_history if it doesn't exist
-        if "generation_history" not in version_doc:
-            version_doc["generation_history"] = []
-
-        # Add current version to history
-        current_version = version_doc["final_generated_content"].copy()
-        current_version["timestamp"] = version_doc.get("date_modified", current_timestamp)
-        current_version["generation_type"] = "edit"  # This is a manual edit
-        version_doc["generation_history"].append(current_version)
+    _push_generation_history(version_doc, "edit", current_timestamp)  # This is a manual edit
 
     # 4) Write the new HTML
     version_doc["final_generated_content"] = {"html_content": updated_html}
@@ -442,10 +628,12 @@ def handle_assignment_version_update(assignment_version_id: str, updated_html: s
 
     # 5) Save
     try:
-        versions_container.replace_item(item=version_doc["id"], body=version_doc)
+        replace_version_document(version_doc)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update version document: {str(e)}")
 
+    refresh_assignment_version_summary(version_doc["assignment_id"])
+
     # 6) Return
     return {
         "version_document_id": version_doc["id"],
@@ -463,12 +651,8 @@ def get_assignment_version_html(assignment_version_id: str) -> dict:
     Returns:
         Dictionary with version_document_id and html_content
     """
-    try:
-        version_doc = versions_container.read_item(
-            item=assignment_version_id,
-            partition_key=assignment_version_id
-        )
-    except Exception:
+    version_doc = get_version_document(assignment_version_id)
+    if not version_doc:
         raise HTTPException(status_code=404, detail="Assignment version not found")
 
     html_content = get_html_content_from_document(version_doc)
@@ -492,6 +676,7 @@ def migrate_legacy_json_to_html(assignment_version_id: str = None) -> dict:
     Returns:
         Migration results summary
     """
+    versions_container = get_container()
     migrated_count = 0
     error_count = 0
     errors = []
@@ -499,10 +684,9 @@ def migrate_legacy_json_to_html(assignment_version_id: str = None) -> dict:
     if assignment_version_id:
         # Migrate specific version
         try:
-            version_doc = versions_container.read_item(
-                item=assignment_version_id,
-                partition_key=assignment_version_id
-            )
+            version_doc = get_version_document(assignment_version_id)
+            if not version_doc:
+                raise ValueError("Assignment version not found")
 
             final_content = version_doc.get("final_generated_content", {})
             if "json_content" in final_content and "html_content" not in final_content:
@@ -510,7 +694,8 @@ def migrate_legacy_json_to_html(assignment_version_id: str = None) -> dict:
                 version_doc["final_generated_content"] = {"html_content": html_content}
                 version_doc["date_modified"] = datetime.datetime.utcnow().isoformat() + "Z"
 
-                versions_container.replace_item(item=version_doc["id"], body=version_doc)
+                replace_version_document(version_doc)
+                refresh_assignment_version_summary(version_doc["assignment_id"])
                 migrated_count = 1
 
         except Exception as e:
@@ -521,6 +706,7 @@ def migrate_legacy_json_to_html(assignment_version_id: str = None) -> dict:
         # Migrate all legacy versions
         try:
             # Query for documents with legacy JSON format
+            migrated_assignment_ids = set()
             legacy_docs = list(versions_container.query_items(
                 query="SELECT * FROM c WHERE IS_DEFINED(c.final_generated_content.json_content) AND NOT IS_DEFINED(c.final_generated_content.html_content)",
                 enable_cross_partition_query=True
@@ -534,13 +720,17 @@ def migrate_legacy_json_to_html(assignment_version_id: str = None) -> dict:
                     doc["final_generated_content"] = {"html_content": html_content}
                     doc["date_modified"] = datetime.datetime.utcnow().isoformat() + "Z"
 
-                    versions_container.replace_item(item=doc["id"], body=doc)
+                    replace_version_document(doc)
+                    migrated_assignment_ids.add(doc["assignment_id"])
                     migrated_count += 1
 
                 except Exception as e:
                     error_count += 1
                     errors.append(f"Error migrating {doc.get('id', 'unknown')}: {str(e)}")
 
+            for migrated_assignment_id in migrated_assignment_ids:
+                refresh_assignment_version_summary(migrated_assignment_id)
+
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
 
@@ -1,24 +1,61 @@
+import copy
 import json
 import os
+import threading
 from typing import Optional
 
 from dotenv import load_dotenv
 
+from application.database.nosql_connection import GPT_SUGGESTION_CACHE_CONTAINER_NAME
+from application.features.assignment_version_generation.prompt_registry import (
+    get_prompt_version,
+    render_prompt_messages_within_budget,
+)
 from application.features.gpt.crud import process_gpt_prompt_json, process_gpt_prompt_version_suggestion_json
+from application.services.content_cache import ContentCache, CosmosCacheTier, MemoryCacheTier, make_cache_key
 
 load_dotenv()
 GPT_MODEL = os.getenv("GPT_MODEL")
+SUGGESTION_MAX_OUTPUT_TOKENS = 8000
+PACKAGE_MAX_OUTPUT_TOKENS = 8000
+
+GPT_SUGGESTION_CACHE_BACKEND = os.getenv("GPT_SUGGESTION_CACHE_BACKEND", "memory")
+GPT_SUGGESTION_CACHE_MAX_ENTRIES = int(os.getenv("GPT_SUGGESTION_CACHE_MAX_ENTRIES", "500"))
+GPT_SUGGESTION_CACHE_TTL_SECONDS = int(os.getenv("GPT_SUGGESTION_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+
+_suggestion_cache: Optional[ContentCache] = None
+_suggestion_cache_lock = threading.Lock()
+
+
+def get_suggestion_cache() -> ContentCache:
+    """
+    Learning-pathway suggestions keyed by the rendered prompt and model. Group B prompts
+    carry no student fields, so every student given the same assignment shares one entry.
+    """
+    global _suggestion_cache
+    if _suggestion_cache is None:
+        with _suggestion_cache_lock:
+            if _suggestion_cache is None:
+                persistent = None
+                if GPT_SUGGESTION_CACHE_BACKEND == "cosmos":
+                    persistent = CosmosCacheTier(GPT_SUGGESTION_CACHE_CONTAINER_NAME, GPT_SUGGESTION_CACHE_TTL_SECONDS)
+                _suggestion_cache = ContentCache(
+                    "gpt_suggestions",
+                    MemoryCacheTier(GPT_SUGGESTION_CACHE_MAX_ENTRIES, GPT_SUGGESTION_CACHE_TTL_SECONDS),
+                    persistent
+                )
+    return _suggestion_cache
+
 
 def generate_assignment_modification_suggestions(student_profile: dict, assignment: dict, class_info: dict) -> dict:
     
     student_group = student_profile.get("group_type")
 
     if student_group == "A":
-      with open("application/features/assignment_version_generation/prompts/group_A_rec_prompt.txt", "r", encoding="utf-8") as f:
-
-        template = f.read()
-
-        prompt = template.format(
+        template_name = "group_A_rec_prompt"
+        messages, prompt_tokens = render_prompt_messages_within_budget(
+            template_name, GPT_MODEL, SUGGESTION_MAX_OUTPUT_TOKENS,
             reading_level=student_profile.get("reading_level", "N/A"),
             writing_level=student_profile.get("writing_level", "N/A"),
             strengths=", ".join(student_profile.get("strengths", [])),
@@ -35,18 +72,30 @@ def generate_assignment_modification_suggestions(student_profile: dict, assignme
         )
 
     elif student_group == "B":
-        with open("application/features/assignment_version_generation/prompts/group_B_rec_prompt.txt", "r", encoding="utf-8") as f:
-          template = f.read()
-          prompt = template.format(
+        template_name = "group_B_rec_prompt"
+        messages, prompt_tokens = render_prompt_messages_within_budget(
+            template_name, GPT_MODEL, SUGGESTION_MAX_OUTPUT_TOKENS,
             class_name=class_info.get("class_name", "N/A"),
             assignment_title=assignment.get("title", "N/A"),
             assignment_content=assignment.get("content", "N/A"),
             assignment_type=assignment.get("assignment_type", "N/A")
-         )
+        )
 
 #   TODO: Generate "else" case
 
-    return process_gpt_prompt_version_suggestion_json(prompt, model=GPT_MODEL, override_max_tokens=8000)
+    system_prompt, prompt = messages[0]["content"], messages[1]["content"]
+
+    # The static system prompt is covered by the template version
+    key = make_cache_key("assignment_suggestions", prompt, get_prompt_version(template_name), GPT_MODEL)
+    suggestions = get_suggestion_cache().get_or_compute(
+        key,
+        lambda: process_gpt_prompt_version_suggestion_json(
+            prompt, model=GPT_MODEL, override_max_tokens=SUGGESTION_MAX_OUTPUT_TOKENS, system_prompt=system_prompt,
+            prompt_tokens=prompt_tokens
+        )
+    )
+    # Callers annotate the options per version document, so never hand out the cached object
+    return copy.deepcopy(suggestions)
 
 
 
@@ -76,11 +125,9 @@ def generate_assignment(student_profile: dict, assignment: dict, class_info: dic
     selected_options_str = json.dumps(selected_options, indent=2)
 
     if student_group == "A":
-      with open("application/features/assignment_version_generation/prompts/group_A_version_generation_prompt.txt", "r", encoding="utf-8") as f:
-        template = f.read()
-
         # Format prompt with all fields
-        prompt = template.format(
+        messages, _ = render_prompt_messages_within_budget(
+            "group_A_version_generation_prompt", GPT_MODEL, PACKAGE_MAX_OUTPUT_TOKENS,
             reading_level=student_profile.get("reading_level", "N/A"),
             writing_level=student_profile.get("writing_level", "N/A"),
             strengths=", ".join(student_profile.get("strengths", [])),
@@ -99,12 +146,9 @@ def generate_assignment(student_profile: dict, assignment: dict, class_info: dic
         )
 
     elif student_group == "B":
-      with open("application/features/assignment_version_generation/prompts/group_B_version_generation_prompt.txt", "r", encoding="utf-8") as f:
-        template = f.read()
-
         # Format prompt with all fields
-        prompt = template.format(
-            
+        messages, _ = render_prompt_messages_within_budget(
+            "group_B_version_generation_prompt", GPT_MODEL, PACKAGE_MAX_OUTPUT_TOKENS,
             class_name=class_info.get("class_name", "N/A"),
             assignment_title=assignment.get("title", "N/A"),
             assignment_content=assignment.get("content", "N/A"),
@@ -116,4 +160,4 @@ def generate_assignment(student_profile: dict, assignment: dict, class_info: dic
     # TODO: Generate "else" case
 
        
-    return process_gpt_prompt_json(prompt, model=GPT_MODEL, override_max_tokens=8000)
\ No newline at end of file
+    return process_gpt_prompt_json(messages, model=GPT_MODEL, override_max_tokens=PACKAGE_MAX_OUTPUT_TOKENS)
\ No newline at end of file
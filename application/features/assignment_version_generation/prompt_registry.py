@@ -0,0 +1,226 @@
+"""
+Prompt template registry.
+
+Every template in prompts/ is read once, parsed into literal/placeholder segments
+and checked against the placeholders its callers supply, so a broken template fails
+at startup instead of on a teacher's request. Rendering joins the precompiled
+segments without touching the filesystem.
+
+Templates keep their variable input section at the end. render_messages() sends the
+static instructions before the first placeholder as a system message and the rest as
+the user message, so repeat calls share an identical prefix the provider can cache.
+
+Each template carries a short content hash as its version, for use in cache keys.
+Set PROMPT_HOT_RELOAD=true in development to pick up edited files without a restart.
+"""
+import hashlib
+import os
+import string
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from application.features.gpt.token_budget import count_static_tokens, fit_values
+
+load_dotenv()
+
+PROMPTS_DIR = Path(__file__).resolve().parent / "prompts"
+PROMPT_HOT_RELOAD = os.getenv("PROMPT_HOT_RELOAD", "false").lower() == "true"
+
+# Line the templates use between sections
+SECTION_BREAK = "________________________________________"
+
+# Field shortened when a rendered prompt would not fit the model's context window
+SHRINKABLE_FIELD = "assignment_content"
+
+_GROUP_A_PROFILE_FIELDS = {
+    "reading_level", "writing_level", "strengths", "challenges", "short_term_goals",
+    "long_term_goals", "best_ways_to_help", "hobbies_and_interests", "learning_goal",
+}
+_ASSIGNMENT_FIELDS = {"class_name", "assignment_title", "assignment_content", "assignment_type"}
+_GENERATION_FIELDS = {"selected_options", "additional_ideas_for_changes"}
+
+# Placeholders each template must contain exactly; templates not listed only need to parse
+EXPECTED_PLACEHOLDERS = {
+    "group_A_rec_prompt": _GROUP_A_PROFILE_FIELDS | _ASSIGNMENT_FIELDS,
+    "group_B_rec_prompt": _ASSIGNMENT_FIELDS,
+    "group_A_version_generation_prompt": _GROUP_A_PROFILE_FIELDS | _ASSIGNMENT_FIELDS | _GENERATION_FIELDS,
+    "group_B_version_generation_prompt": _ASSIGNMENT_FIELDS | _GENERATION_FIELDS,
+    "assignment_condense_prompt": {"assignment_title", "part_number", "part_count", "chunk"},
+    "section_regeneration_prompt": {
+        "class_name", "assignment_title", "reading_level", "writing_level",
+        "outline", "section_title", "section_html", "instructions",
+    },
+}
+
+
+class PromptTemplateError(Exception):
+    """Raised when a template is missing, cannot be parsed or has unexpected placeholders."""
+
+
+class PromptTemplate:
+    def __init__(self, name: str, path: Path, text: str, mtime: float):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        self.version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+        try:
+            parsed = list(string.Formatter().parse(text))
+        except ValueError as e:
+            raise PromptTemplateError(f"Prompt template '{name}' is malformed: {e}")
+
+        self._segments: List[Tuple[str, Optional[str]]] = []
+        for literal, field, format_spec, conversion in parsed:
+            if field is not None and (format_spec or conversion or not field.isidentifier()):
+                raise PromptTemplateError(
+                    f"Prompt template '{name}' uses unsupported placeholder '{{{field}}}'"
+                )
+            if self._segments and self._segments[-1][1] is None:
+                # Escaped braces split the literal text; merge it back into one segment
+                literal = self._segments.pop()[0] + literal
+            self._segments.append((literal, field))
+
+        self.placeholders = {field for _, field in self._segments if field is not None}
+        self._literal_text = "".join(literal for literal, _ in self._segments)
+        # Text before the first placeholder is identical on every call; the prefix stops at the
+        # last section break so the whole input section (with its headings) goes in the user message
+        head = self._segments[0][0] if self._segments else ""
+        cut = head.rfind(SECTION_BREAK) if self.placeholders else -1
+        self.static_prefix = head[:cut + len(SECTION_BREAK)] if cut != -1 else head
+
+    def render(self, /, **values) -> str:
+        missing = self.placeholders - values.keys()
+        if missing:
+            raise KeyError(f"Prompt template '{self.name}' is missing values for: {', '.join(sorted(missing))}")
+
+        parts = []
+        for literal, field in self._segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(format(values[field], ""))
+        return "".join(parts)
+
+    def static_tokens(self, model: str) -> int:
+        """Tokens in the template's fixed text, counted once per model."""
+        return count_static_tokens(self._literal_text, model)
+
+    def fit(self, model: str, max_output_tokens: int, /, **values) -> Tuple[dict, int]:
+        """
+        Values with the shrinkable field shortened, if needed, to fit the model's window,
+        and the token count of the prompt rendered from them.
+        """
+        shrinkable = SHRINKABLE_FIELD if SHRINKABLE_FIELD in self.placeholders else None
+        return fit_values(self.static_tokens(model), values, model, max_output_tokens, shrinkable)
+
+    def render_messages(self, /, **values) -> List[dict]:
+        """Render as a static system prefix followed by the variable user section."""
+        rendered = self.render(**values)
+        return [
+            {"role": "system", "content": self.static_prefix},
+            {"role": "user", "content": rendered[len(self.static_prefix):].lstrip("\n")},
+        ]
+
+
+class PromptRegistry:
+    def __init__(self, directory: Path = PROMPTS_DIR, expected: Dict[str, set] = EXPECTED_PLACEHOLDERS,
+                 hot_reload: bool = PROMPT_HOT_RELOAD):
+        self.directory = Path(directory)
+        self.expected = expected
+        self.hot_reload = hot_reload
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self.load_all()
+
+    def _load(self, path: Path) -> PromptTemplate:
+        template = PromptTemplate(path.stem, path, path.read_text(encoding="utf-8"), path.stat().st_mtime)
+
+        expected = self.expected.get(template.name)
+        if expected is not None and template.placeholders != expected:
+            missing = expected - template.placeholders
+            unexpected = template.placeholders - expected
+            raise PromptTemplateError(
+                f"Prompt template '{template.name}' placeholders do not match its callers "
+                f"(missing: {sorted(missing)}, unexpected: {sorted(unexpected)})"
+            )
+        return template
+
+    def load_all(self):
+        templates = {path.stem: self._load(path) for path in sorted(self.directory.glob("*.txt"))}
+
+        absent = set(self.expected) - templates.keys()
+        if absent:
+            raise PromptTemplateError(f"Missing prompt templates: {', '.join(sorted(absent))}")
+
+        with self._lock:
+            self._templates = templates
+
+    def get(self, name: str) -> PromptTemplate:
+        template = self._templates.get(name)
+        if template is None:
+            raise PromptTemplateError(f"Unknown prompt template '{name}'")
+
+        if self.hot_reload:
+            try:
+                changed = template.path.stat().st_mtime != template.mtime
+            except OSError:
+                changed = False
+            if changed:
+                # Keep serving the previous version if the edited file is broken
+                try:
+                    reloaded = self._load(template.path)
+                    with self._lock:
+                        self._templates[name] = reloaded
+                    template = reloaded
+                except (OSError, PromptTemplateError) as e:
+                    print(f"Prompt template '{name}' reload failed, keeping version {template.version}: {e}")
+        return template
+
+    def render(self, name: str, /, **values) -> str:
+        return self.get(name).render(**values)
+
+    def render_messages(self, name: str, /, **values) -> List[dict]:
+        return self.get(name).render_messages(**values)
+
+    def versions(self) -> Dict[str, str]:
+        with self._lock:
+            return {name: t.version for name, t in self._templates.items()}
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Return the process-wide registry, loading and validating all templates on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PromptRegistry()
+    return _registry
+
+
+def render_prompt(name: str, /, **values) -> str:
+    return get_prompt_registry().render(name, **values)
+
+
+def render_prompt_messages(name: str, /, **values) -> List[dict]:
+    return get_prompt_registry().render_messages(name, **values)
+
+
+def render_prompt_messages_within_budget(name: str, model: str, max_output_tokens: int, /,
+                                         **values) -> Tuple[List[dict], int]:
+    """
+    render_prompt_messages, shortening the assignment content if the prompt would
+    overflow. Also returns the prompt's token count, to pass on as prompt_tokens.
+    """
+    template = get_prompt_registry().get(name)
+    fitted, prompt_tokens = template.fit(model, max_output_tokens, **values)
+    return template.render_messages(**fitted), prompt_tokens
+
+
+def get_prompt_version(name: str) -> str:
+    return get_prompt_registry().get(name).version
@@ -1,24 +1,17 @@
+import asyncio
 import datetime
-import os
-from dotenv import load_dotenv
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+import json
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
-from application.database.nosql_connection import get_cosmos_db_connection
-from application.features.assignment_version_generation.assignment_context import build_prompt_for_version, versions_container
-from application.features.assignment_version_generation.crud import handle_assignment_suggestion_generation, handle_assignment_version_generation, handle_assignment_version_update, get_assignment_version_html, migrate_legacy_json_to_html, convert_json_to_html
+from application.database.async_db import run_db
+from application.features.assignment_version_generation.crud import handle_assignment_suggestion_generation, handle_assignment_version_generation, handle_assignment_version_update, handle_section_regeneration, get_assignment_version_html, migrate_legacy_json_to_html, stream_assignment_version_generation
 from application.features.auth.permissions import require_user_access
 
 
-from application.features.assignment_version_generation.schemas import AssignmentGenerationOptionsResponse, AssignmentGenerationRequest, AssignmentUpdateBody, AssignmentVersionGenerationResponse
-from application.utils.gpt_client import stream_sections_with_tools
+from application.features.assignment_version_generation.schemas import AssignmentGenerationOptionsResponse, AssignmentGenerationRequest, AssignmentUpdateBody, AssignmentVersionGenerationResponse, GenerationJobResponse, SectionRegenerationRequest, SectionRegenerationResponse
+from application.services.job_queue import TERMINAL_STATUSES, JobQueueFullError, get_job_queue
 
 router = APIRouter()
-load_dotenv()
-DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
-
-CONTAINER_NAME = "ai-modified-assignments"
-cosmos_client = get_cosmos_db_connection()
-cosmos_container = cosmos_client.get_database_client(DATABASE_NAME).get_container_client(CONTAINER_NAME)
 
 
 
@@ -73,45 +66,147 @@ def generate_new_assignment_version(
     
 
 
-# @router.post("/assignment-generation/{assignment_version_id}/stream")
-# def stream_assignment_version(
-#     assignment_version_id: str,
-#     selected_options: list[str] = Body(...),
-#     additional_edit_suggestions: str | None = Body("")
-# ):
-#     messages, persist_ctx = build_prompt_for_version(
-#         assignment_version_id=assignment_version_id,
-#         selected_options=selected_options,
-#         additional_edit_suggestions=additional_edit_suggestions or ""
-#     )
+# ---------- Background generation jobs ----------
+# The submit endpoints return immediately with a job id; the generation runs on the
+# job queue and persists to the version document exactly like the synchronous routes.
+
+JOB_EVENTS_POLL_SECONDS = 1.0
+JOB_EVENTS_MAX_SECONDS = 600
+
+
+def _job_response(job: dict) -> GenerationJobResponse:
+    return GenerationJobResponse(
+        job_id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        created_at=job["created_at"],
+        started_at=job.get("started_at"),
+        finished_at=job.get("finished_at"),
+        result=job.get("result"),
+        error=job.get("error"),
+    )
+
+
+def _submit_job(kind: str, func, *args, user: dict, resource_id: str, **kwargs) -> GenerationJobResponse:
+    try:
+        job = get_job_queue().submit(
+            kind, func, *args, owner_id=user.get("user_id"), resource_id=resource_id, **kwargs
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return _job_response(job)
+
+
+def _get_visible_job(job_id: str, user: dict) -> dict:
+    """Jobs are visible to the user who submitted them and to admins."""
+    job = get_job_queue().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.get("owner_id") != user.get("user_id") and "Admin" not in (user.get("role_names") or []):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post(
+    "/assignment-generation/{assignment_id}/suggestion-jobs",
+    response_model=GenerationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue learning pathway suggestion generation"
+)
+def submit_assignment_options_job(
+    assignment_id: int,
+    from_version: str = None,
+    _user=Depends(require_user_access)
+):
+    return _submit_job(
+        "assignment_suggestions",
+        handle_assignment_suggestion_generation,
+        assignment_id, _user["user_id"], from_version,
+        user=_user,
+        resource_id=str(assignment_id),
+    )
+
+
+@router.post(
+    "/assignment-generation/{assignment_version_id}/jobs",
+    response_model=GenerationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue generation of a new assignment version HTML"
+)
+def submit_assignment_version_job(
+    assignment_version_id: str,
+    payload: AssignmentGenerationRequest,
+    _user=Depends(require_user_access)
+):
+    return _submit_job(
+        "assignment_version_html",
+        handle_assignment_version_generation,
+        user=_user,
+        resource_id=assignment_version_id,
+        assignment_version_id=assignment_version_id,
+        selected_options=payload.selected_options,
+        additional_edit_suggestions=payload.additional_edit_suggestions or ""
+    )
 
-#     def persist_final(obj: dict):
-#         version_doc = persist_ctx["version_doc"]
-#         version_doc["selected_options"] = persist_ctx["selected_options"]
-#         version_doc["additional_edit_suggestions"] = persist_ctx["additional_edit_suggestions"]
-#         version_doc["finalized"] = False
 
-#         # Convert JSON to HTML before saving
-#         html_content = convert_json_to_html(obj)
-#         version_doc["final_generated_content"] = {"html_content": html_content}
+@router.get("/generation-jobs/{job_id}", response_model=GenerationJobResponse)
+def get_generation_job(job_id: str, _user=Depends(require_user_access)):
+    """Poll the status of a generation job. `result` is set once it has succeeded."""
+    return _job_response(_get_visible_job(job_id, _user))
 
-#         version_doc["date_modified"] = datetime.datetime.utcnow().isoformat() + "Z"
-#         versions_container.replace_item(item=version_doc["id"], body=version_doc)
 
+@router.get("/generation-jobs/{job_id}/events")
+async def stream_generation_job_events(job_id: str, request: Request, _user=Depends(require_user_access)):
+    """Server-sent events with the job state, sent on every status change until it finishes."""
+    job = await run_db(_get_visible_job, job_id, _user)
 
-#     def event_source():
-#         for frame in stream_sections_with_tools(
-#             messages,
-#             model=GPT_MODEL,
-#             on_complete=persist_final
-#         ):
+    async def event_source():
+        current = job
+        last_status = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + JOB_EVENTS_MAX_SECONDS
 
-#             yield frame
+        while True:
+            if current["status"] != last_status:
+                last_status = current["status"]
+                payload = _job_response(current).model_dump()
+                yield f"event: status\ndata: {json.dumps(payload, default=str)}\n\n"
+            if last_status in TERMINAL_STATUSES or loop.time() >= deadline:
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            current = await run_db(get_job_queue().get, job_id) or current
 
+    return StreamingResponse(event_source(), media_type="text/event-stream")
 
-#     return StreamingResponse(event_source(), media_type="text/event-stream")
 
 
+@router.post(
+    "/assignment-generation/{assignment_version_id}/stream",
+    summary="Generate a new assignment version HTML, streamed as server-sent events"
+)
+async def stream_assignment_version(
+    assignment_version_id: str,
+    payload: AssignmentGenerationRequest,
+    request: Request,
+    _user=Depends(require_user_access)
+):
+    """
+    Streams the generated HTML as `delta` events while the model writes it, then
+    saves the version (same history handling as the POST route) and sends `complete`.
+    """
+    return StreamingResponse(
+        stream_assignment_version_generation(
+            assignment_version_id=assignment_version_id,
+            selected_options=payload.selected_options,
+            additional_edit_suggestions=payload.additional_edit_suggestions or "",
+            is_disconnected=request.is_disconnected
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.put(
     "/assignment-generation/{assignment_version_id}",
@@ -128,6 +223,25 @@ def update_assignment_version(
     )
 
 
+@router.post(
+    "/assignment-generation/{assignment_version_id}/sections/{section}",
+    response_model=SectionRegenerationResponse,
+    summary="Regenerate one section of an assignment version"
+)
+def regenerate_assignment_section(
+    assignment_version_id: str,
+    section: str,
+    body: SectionRegenerationRequest,
+    _user = Depends(require_user_access)
+):
+    """
+    Rewrites a single section (instructions, plan, prompts, support-tools, ai-policy or
+    motivation) with the requested change and splices it into the version's HTML.
+    The previous HTML is kept in generation_history.
+    """
+    return handle_section_regeneration(assignment_version_id, section, body.instructions)
+
+
 @router.get(
     "/assignment-generation/{assignment_version_id}/html",
     response_model=AssignmentVersionGenerationResponse,
@@ -36,6 +36,26 @@ class AssignmentVersionGenerationResponse(BaseModel):
     html_content: str
 
 
+class SectionRegenerationRequest(BaseModel):
+    instructions: str = Field(..., min_length=1, description="The change to make to this section.")
+
+
+class SectionRegenerationResponse(AssignmentVersionGenerationResponse):
+    section: str
+    section_html: str = Field(..., description="The regenerated section as spliced into html_content.")
+
+
+class GenerationJobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+
+
 class SupportToolsModel(BaseModel):
     toolsHtml: str
     aiPromptingHtml: str
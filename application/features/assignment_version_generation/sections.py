@@ -0,0 +1,140 @@
+"""
+Locating and replacing the top-level <section> blocks of an assignment version's HTML.
+
+Versions converted from the legacy JSON format mark their sections with a class
+(see convert_json_to_html); generated HTML uses bare <section> tags with an <h2>
+heading, or no <section> tags at all, in which case each top-level <h2> starts a
+section that runs to the next one. All are mapped onto the same section keys.
+Sections are found by scanning the tags directly, so splicing one in leaves every
+other byte of the document as it was.
+"""
+import html
+import re
+from typing import Dict, List, Optional
+
+SECTION_KEYS = ("instructions", "plan", "prompts", "support-tools", "ai-policy", "motivation")
+
+# Checked in order against the lowercased <h2> text when a section has no class
+_HEADING_KEYWORDS = (
+    ("ai-policy", ("policy",)),
+    ("instructions", ("instruction",)),
+    ("plan", ("step", "plan")),
+    ("support-tools", ("support", "tool", "resource")),
+    ("prompts", ("prompt",)),
+    ("motivation", ("motivat",)),
+)
+
+_SECTION_TAG = re.compile(r"<(/?)section\b[^>]*>", re.IGNORECASE)
+_CLASS_ATTR = re.compile(r"""\bclass\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+_H2 = re.compile(r"<h2\b[^>]*>(.*?)</h2>", re.IGNORECASE | re.DOTALL)
+_H2_OPEN = re.compile(r"<h2\b", re.IGNORECASE)
+# Trailing markers such as <!-- TEMPLATE_REQUIRED: yes --> are not part of the last section
+_TRAILING_COMMENTS = re.compile(r"(?:\s*<!--.*?-->)*\s*$", re.DOTALL)
+_TAGS = re.compile(r"<[^>]+>")
+
+
+def _heading(section_html: str) -> str:
+    match = _H2.search(section_html)
+    return html.unescape(_TAGS.sub("", match.group(1))).strip() if match else ""
+
+
+def _key_for(open_tag: str, heading: str) -> Optional[str]:
+    match = _CLASS_ATTR.search(open_tag)
+    if match:
+        for css_class in match.group(1).split():
+            if css_class in SECTION_KEYS:
+                return css_class
+
+    lowered = heading.lower()
+    for key, keywords in _HEADING_KEYWORDS:
+        if any(word in lowered for word in keywords):
+            return key
+    return None
+
+
+def _section(document: str, start: int, end: int, open_tag: str, wrapped: bool) -> Dict:
+    section_html = document[start:end]
+    heading = _heading(section_html)
+    return {
+        "key": _key_for(open_tag, heading),
+        "heading": heading,
+        "start": start,
+        "end": end,
+        "html": section_html,
+        "wrapped": wrapped,
+    }
+
+
+def _section_spans(document: str):
+    """(start, end, open tag) of each top-level <section> element."""
+    depth = 0
+    start = open_tag = None
+    for match in _SECTION_TAG.finditer(document):
+        if not match.group(1):
+            if depth == 0:
+                start, open_tag = match.start(), match.group(0)
+            depth += 1
+        elif depth:
+            depth -= 1
+            if depth == 0:
+                yield start, match.end(), open_tag
+
+
+def _top_level_h2_starts(document: str, spans) -> List[int]:
+    return [
+        match.start() for match in _H2_OPEN.finditer(document)
+        if not any(start <= match.start() < end for start, end, _ in spans)
+    ]
+
+
+def find_sections(document: str) -> List[Dict]:
+    """
+    Top-level sections of document, in order, as dicts with key (None if it could
+    not be identified), heading, start, end, html (document[start:end]) and wrapped
+    (False for an <h2>-delimited section without a <section> element).
+    Nested sections such as <section data-block="template"> stay part of their parent.
+    """
+    spans = list(_section_spans(document))
+    sections = [_section(document, start, end, open_tag, True) for start, end, open_tag in spans]
+    if any(section["key"] or section["heading"] for section in sections):
+        return sections
+
+    # No identifiable <section> elements: each top-level <h2> runs to the next one
+    starts = _top_level_h2_starts(document, spans)
+    if not starts:
+        return sections
+    content_end = _TRAILING_COMMENTS.search(document, starts[-1]).start()
+    ends = starts[1:] + [content_end]
+    return [
+        _section(document, start, start + len(document[start:end].rstrip()), "", False)
+        for start, end in zip(starts, ends)
+    ]
+
+
+def find_section(document: str, key: str) -> Optional[Dict]:
+    return next((section for section in find_sections(document) if section["key"] == key), None)
+
+
+def normalize_section_html(new_html: str, original: Dict) -> str:
+    """
+    Make a regenerated fragment match the original's form. A wrapped section keeps
+    the original's opening tag, so its class (and thus its key) survives, and model
+    output without a <section> wrapper is wrapped. For an <h2>-delimited section a
+    wrapper the model added is removed. A stray code fence is removed either way.
+    """
+    fragment = re.sub(r"^```(?:html)?\s*|\s*```$", "", new_html.strip())
+
+    spans = list(_section_spans(fragment))
+    if len(spans) == 1 and not fragment[:spans[0][0]].strip() and not fragment[spans[0][1]:].strip():
+        body = fragment[fragment.index(">") + 1:fragment.rindex("</")]
+    else:
+        body = fragment
+
+    if not original.get("wrapped", True):
+        return body.strip()
+    open_tag = _SECTION_TAG.match(original["html"]).group(0)
+    return f"{open_tag}{body}</section>"
+
+
+def splice_section(document: str, section: Dict, new_section_html: str) -> str:
+    return document[:section["start"]] + new_section_html + document[section["end"]:]
@@ -6,13 +6,16 @@ import pyodbc
 from application.database.mssql_connection import get_sql_db_connection
 from application.database.nosql_connection import get_container
 from datetime import datetime
-from typing import List, Dict, Optional
-import zipfile
+from typing import Iterator, List, Dict, Optional
 import io
 import csv
+import json
 
 from application.features.versionHistory.crud import get_html_content_from_version_document, convert_html_to_word_bytes
+from application.services.docx_render_pool import RenderJob, get_docx_render_pool
+from application.services.docx_rendering import render_text_to_word_bytes
 from application.features.student_profile.crud import get_complete_profile
+from application.services.zip_stream import ZipEntry, prefix_entries, stream_zip
 
 
 def export_student_assignments_json(student_id: int, assignment_ids: Optional[List[int]] = None) -> dict:
@@ -414,7 +417,93 @@ def _create_assignments_summary_csv(assignments_data: List[dict]) -> str:
     return output.getvalue()
 
 
-def export_student_assignments_download(student_id: int, assignment_ids: Optional[List[int]] = None) -> bytes:
+def _document_jobs(assignments: List[dict]) -> Iterator[RenderJob]:
+    """Word renders for the assignment folders, in the order their entries are written."""
+    for assignment in assignments:
+        if assignment.get("html_content"):
+            yield convert_html_to_word_bytes, (assignment["html_content"],)
+        elif assignment.get("content"):
+            # If no HTML, create simple text doc
+            yield render_text_to_word_bytes, (assignment["title"], assignment["content"])
+
+        for version in assignment.get("versions", []):
+            yield convert_html_to_word_bytes, (get_html_content_from_version_document(version),)
+
+
+def _rendered_documents(assignments: List[dict]) -> Iterator[bytes]:
+    """Render every Word document for the assignments on the render pool, yielding them in entry order."""
+    return get_docx_render_pool().render_many(_document_jobs(assignments))
+
+
+def _assignment_folder_entries(assignment: dict, documents: Iterator[bytes]) -> Iterator[ZipEntry]:
+    """
+    ZIP entries for one assignment folder: the original as Word, each version as Word
+    with its complete details, and ratings.txt. Word documents are taken in order from
+    documents (see _rendered_documents).
+    """
+    assignment_id = assignment["assignment_id"]
+    title = assignment["title"]
+    # Sanitize title for folder name
+    safe_title = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in title)[:50]
+    folder_name = f"assignments/assignment_{assignment_id}_{safe_title}"
+
+    # Add original assignment content as Word doc
+    if assignment.get("html_content") or assignment.get("content"):
+        yield f"{folder_name}/original_assignment.docx", next(documents)
+
+    # Add each version as separate Word doc and detailed metadata
+    versions = assignment.get("versions", [])
+    all_ratings = []
+
+    for version in versions:
+        version_num = version.get("version_number", "unknown")
+        finalized_tag = "_finalized" if version.get("finalized") else ""
+
+        yield f"{folder_name}/version_{version_num}{finalized_tag}.docx", next(documents)
+
+        # Add complete version details as text file
+        yield (
+            f"{folder_name}/version_{version_num}{finalized_tag}_complete_details.txt",
+            _format_complete_version_details(version)
+        )
+
+        # Collect ratings
+        if version.get("rating_data"):
+            all_ratings.append({
+                "version_number": version_num,
+                "finalized": version.get("finalized"),
+                "rating_data": version.get("rating_data")
+            })
+
+    # Add ratings.txt if any ratings exist
+    if all_ratings:
+        ratings_text = f"RATINGS FOR ASSIGNMENT {assignment_id}: {title}\n"
+        ratings_text += "=" * 60 + "\n\n"
+
+        for rating_info in all_ratings:
+            ratings_text += f"Version {rating_info['version_number']}"
+            if rating_info['finalized']:
+                ratings_text += " (FINALIZED)"
+            ratings_text += "\n" + "-" * 60 + "\n"
+            ratings_text += _format_rating_data(rating_info['rating_data'])
+            ratings_text += "\n\n"
+
+        yield f"{folder_name}/ratings.txt", ratings_text
+    else:
+        yield f"{folder_name}/ratings.txt", "No ratings available for this assignment.\n"
+
+
+def _student_download_entries(export_data: dict) -> Iterator[ZipEntry]:
+    yield "student_info.txt", _format_student_info(export_data["student"])
+    yield "classes_and_goals.txt", _format_classes_and_goals(export_data["classes"])
+    yield "assignments_summary.csv", _create_assignments_summary_csv(export_data["assignments"])
+
+    documents = _rendered_documents(export_data["assignments"])
+    for assignment in export_data["assignments"]:
+        yield from _assignment_folder_entries(assignment, documents)
+
+
+def export_student_assignments_download(student_id: int, assignment_ids: Optional[List[int]] = None) -> Iterator[bytes]:
     """
     Export all assignment data for a student as a user-friendly ZIP file.
 
@@ -429,117 +518,63 @@ def export_student_assignments_download(student_id: int, assignment_ids: Optiona
             - version_{n}_complete_details.txt (all metadata, learning pathways, skills, history)
             - ratings.txt
 
+    The student's data is loaded (and missing students reported) before this returns;
+    the Word documents are rendered while the archive streams.
+
     Args:
         student_id: The student's internal ID
         assignment_ids: Optional list of assignment IDs to filter by
 
     Returns:
-        ZIP file as bytes
+        Iterator over the ZIP file's bytes
     """
     try:
         # Get JSON export data first
         export_data = export_student_assignments_json(student_id, assignment_ids)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Download export error: {str(e)}")
 
-        # Create ZIP in memory
-        zip_buffer = io.BytesIO()
+    return stream_zip(_student_download_entries(export_data))
 
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # 1. Add student_info.txt
-            student_info_text = _format_student_info(export_data["student"])
-            zip_file.writestr("student_info.txt", student_info_text)
 
-            # 2. Add classes_and_goals.txt
-            classes_text = _format_classes_and_goals(export_data["classes"])
-            zip_file.writestr("classes_and_goals.txt", classes_text)
+def _load_student_profile(student_id: int) -> dict:
+    try:
+        profile_data = get_complete_profile(student_id)
+        if not profile_data:
+            raise HTTPException(status_code=404, detail=f"Student profile for id {student_id} not found")
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=f"Failed to fetch student profile: {str(e)}")
+    return profile_data
 
-            # 3. Add assignments_summary.csv
-            summary_csv = _create_assignments_summary_csv(export_data["assignments"])
-            zip_file.writestr("assignments_summary.csv", summary_csv)
 
-            # 4. Add individual assignment folders
-            for assignment in export_data["assignments"]:
-                assignment_id = assignment["assignment_id"]
-                title = assignment["title"]
-                # Sanitize title for folder name
-                safe_title = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in title)[:50]
-                folder_name = f"assignments/assignment_{assignment_id}_{safe_title}"
-
-                # 4a. Add original assignment content as Word doc
-                if assignment.get("html_content"):
-                    original_word_bytes = convert_html_to_word_bytes(assignment["html_content"])
-                    zip_file.writestr(f"{folder_name}/original_assignment.docx", original_word_bytes)
-                elif assignment.get("content"):
-                    # If no HTML, create simple text doc
-                    from docx import Document
-                    doc = Document()
-                    doc.add_heading(assignment["title"], 0)
-                    doc.add_paragraph(assignment["content"])
-                    doc_buffer = io.BytesIO()
-                    doc.save(doc_buffer)
-                    doc_buffer.seek(0)
-                    zip_file.writestr(f"{folder_name}/original_assignment.docx", doc_buffer.getvalue())
-
-                # 4b. Add each version as separate Word doc and detailed metadata
-                versions = assignment.get("versions", [])
-                all_ratings = []
-
-                for version in versions:
-                    version_num = version.get("version_number", "unknown")
-                    finalized_tag = "_finalized" if version.get("finalized") else ""
-
-                    # Get HTML content from version
-                    html_content = get_html_content_from_version_document(version)
-
-                    # Convert HTML content to Word document
-                    version_word_bytes = convert_html_to_word_bytes(html_content)
-
-                    zip_file.writestr(
-                        f"{folder_name}/version_{version_num}{finalized_tag}.docx",
-                        version_word_bytes
-                    )
-
-                    # Add complete version details as text file
-                    complete_details = _format_complete_version_details(version)
-                    zip_file.writestr(
-                        f"{folder_name}/version_{version_num}{finalized_tag}_complete_details.txt",
-                        complete_details
-                    )
-
-                    # Collect ratings
-                    if version.get("rating_data"):
-                        all_ratings.append({
-                            "version_number": version_num,
-                            "finalized": version.get("finalized"),
-                            "rating_data": version.get("rating_data")
-                        })
-
-                # 4c. Add ratings.txt if any ratings exist
-                if all_ratings:
-                    ratings_text = f"RATINGS FOR ASSIGNMENT {assignment_id}: {title}\n"
-                    ratings_text += "=" * 60 + "\n\n"
-
-                    for rating_info in all_ratings:
-                        ratings_text += f"Version {rating_info['version_number']}"
-                        if rating_info['finalized']:
-                            ratings_text += " (FINALIZED)"
-                        ratings_text += "\n" + "-" * 60 + "\n"
-                        ratings_text += _format_rating_data(rating_info['rating_data'])
-                        ratings_text += "\n\n"
-
-                    zip_file.writestr(f"{folder_name}/ratings.txt", ratings_text)
-                else:
-                    zip_file.writestr(f"{folder_name}/ratings.txt", "No ratings available for this assignment.\n")
-
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue()
+def _complete_student_entries(profile_data: dict, assignment_export_data: dict) -> Iterator[ZipEntry]:
+    # === STUDENT PROFILE SECTION ===
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Download export error: {str(e)}")
+    # Add detailed student profile
+    yield "student_profile.txt", _format_complete_student_profile(profile_data)
 
+    # Add profile as JSON for programmatic access
+    yield "student_profile.json", json.dumps(profile_data, indent=2, default=str)
 
-def export_complete_student_data(student_id: int, assignment_ids: Optional[List[int]] = None) -> bytes:
+    # === CLASSES AND GOALS SECTION ===
+    yield "classes_and_learning_goals.txt", _format_classes_and_goals(assignment_export_data["classes"])
+
+    # === ASSIGNMENTS SECTION ===
+    # Add assignments summary CSV
+    yield "assignments_summary.csv", _create_assignments_summary_csv(assignment_export_data["assignments"])
+
+    # Add individual assignment folders
+    documents = _rendered_documents(assignment_export_data["assignments"])
+    for assignment in assignment_export_data["assignments"]:
+        yield from _assignment_folder_entries(assignment, documents)
+
+    # === EXPORT METADATA ===
+    yield "export_metadata.txt", _format_export_metadata(assignment_export_data, profile_data)
+
+
+def export_complete_student_data(student_id: int, assignment_ids: Optional[List[int]] = None) -> Iterator[bytes]:
     """
     Export complete student data combining profile and assignments in one comprehensive ZIP.
 
@@ -554,123 +589,22 @@ def export_complete_student_data(student_id: int, assignment_ids: Optional[List[
         assignment_ids: Optional list of assignment IDs to filter by
 
     Returns:
-        ZIP file as bytes with complete student data
+        Iterator over the ZIP file's bytes with complete student data
     """
     try:
         # 1. Get student profile data
-        try:
-            profile_data = get_complete_profile(student_id)
-            if not profile_data:
-                raise HTTPException(status_code=404, detail=f"Student profile for id {student_id} not found")
-        except Exception as e:
-            raise HTTPException(status_code=404, detail=f"Failed to fetch student profile: {str(e)}")
+        profile_data = _load_student_profile(student_id)
 
         # 2. Get assignment export data
         assignment_export_data = export_student_assignments_json(student_id, assignment_ids)
-
-        # 3. Create comprehensive ZIP
-        zip_buffer = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # === STUDENT PROFILE SECTION ===
-
-            # Add detailed student profile
-            profile_text = _format_complete_student_profile(profile_data)
-            zip_file.writestr("student_profile.txt", profile_text)
-
-            # Add profile as JSON for programmatic access
-            import json
-            zip_file.writestr("student_profile.json", json.dumps(profile_data, indent=2, default=str))
-
-            # === CLASSES AND GOALS SECTION ===
-            classes_text = _format_classes_and_goals(assignment_export_data["classes"])
-            zip_file.writestr("classes_and_learning_goals.txt", classes_text)
-
-            # === ASSIGNMENTS SECTION ===
-            # Add assignments summary CSV
-            summary_csv = _create_assignments_summary_csv(assignment_export_data["assignments"])
-            zip_file.writestr("assignments_summary.csv", summary_csv)
-
-            # Add individual assignment folders (reuse existing logic)
-            for assignment in assignment_export_data["assignments"]:
-                assignment_id = assignment["assignment_id"]
-                title = assignment["title"]
-                safe_title = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in title)[:50]
-                folder_name = f"assignments/assignment_{assignment_id}_{safe_title}"
-
-                # Original assignment
-                if assignment.get("html_content"):
-                    original_word_bytes = convert_html_to_word_bytes(assignment["html_content"])
-                    zip_file.writestr(f"{folder_name}/original_assignment.docx", original_word_bytes)
-                elif assignment.get("content"):
-                    from docx import Document
-                    doc = Document()
-                    doc.add_heading(assignment["title"], 0)
-                    doc.add_paragraph(assignment["content"])
-                    doc_buffer = io.BytesIO()
-                    doc.save(doc_buffer)
-                    doc_buffer.seek(0)
-                    zip_file.writestr(f"{folder_name}/original_assignment.docx", doc_buffer.getvalue())
-
-                # Assignment versions
-                versions = assignment.get("versions", [])
-                all_ratings = []
-
-                for version in versions:
-                    version_num = version.get("version_number", "unknown")
-                    finalized_tag = "_finalized" if version.get("finalized") else ""
-
-                    html_content = get_html_content_from_version_document(version)
-                    version_word_bytes = convert_html_to_word_bytes(html_content)
-
-                    zip_file.writestr(
-                        f"{folder_name}/version_{version_num}{finalized_tag}.docx",
-                        version_word_bytes
-                    )
-
-                    # Add complete version details as text file
-                    complete_details = _format_complete_version_details(version)
-                    zip_file.writestr(
-                        f"{folder_name}/version_{version_num}{finalized_tag}_complete_details.txt",
-                        complete_details
-                    )
-
-                    if version.get("rating_data"):
-                        all_ratings.append({
-                            "version_number": version_num,
-                            "finalized": version.get("finalized"),
-                            "rating_data": version.get("rating_data")
-                        })
-
-                # Ratings file
-                if all_ratings:
-                    ratings_text = f"RATINGS FOR ASSIGNMENT {assignment_id}: {title}\n"
-                    ratings_text += "=" * 60 + "\n\n"
-
-                    for rating_info in all_ratings:
-                        ratings_text += f"Version {rating_info['version_number']}"
-                        if rating_info['finalized']:
-                            ratings_text += " (FINALIZED)"
-                        ratings_text += "\n" + "-" * 60 + "\n"
-                        ratings_text += _format_rating_data(rating_info['rating_data'])
-                        ratings_text += "\n\n"
-
-                    zip_file.writestr(f"{folder_name}/ratings.txt", ratings_text)
-                else:
-                    zip_file.writestr(f"{folder_name}/ratings.txt", "No ratings available for this assignment.\n")
-
-            # === EXPORT METADATA ===
-            metadata_text = _format_export_metadata(assignment_export_data, profile_data)
-            zip_file.writestr("export_metadata.txt", metadata_text)
-
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue()
-
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Complete export error: {str(e)}")
 
+    # 3. Stream the comprehensive ZIP
+    return stream_zip(_complete_student_entries(profile_data, assignment_export_data))
+
 
 def _format_complete_student_profile(profile_data: dict) -> str:
     """Format complete student profile as readable text"""
@@ -844,144 +778,124 @@ def _format_export_metadata(assignment_data: dict, profile_data: dict) -> str:
 def export_all_students_complete_data(
     student_ids: Optional[List[int]] = None,
     assignment_ids: Optional[List[int]] = None
-) -> bytes:
+) -> Iterator[bytes]:
     """
     Export complete data for ALL students (or filtered subset) in one comprehensive ZIP.
 
     Creates a master ZIP file containing individual student folders, each with complete data.
+    Students are exported one at a time while the archive streams, so memory use does
+    not grow with the number of students. Each student's entries are written straight
+    into the master archive under their folder, so every document is rendered and
+    compressed once.
 
     Args:
         student_ids: Optional list of student IDs to filter by (exports ALL if None)
         assignment_ids: Optional list of assignment IDs to filter by
 
     Returns:
-        ZIP file as bytes with all student data
+        Iterator over the ZIP file's bytes with all student data
     """
     try:
         from application.features.students.crud import fetch_all_students_with_names
-        from application.features.student_profile.crud import get_complete_profile
 
         # Get all students (or filtered list)
         all_students = fetch_all_students_with_names()
-
-        # Filter by student_ids if provided
-        if student_ids:
-            all_students = [s for s in all_students if s.get('id') in student_ids]
-
-        if not all_students:
-            raise HTTPException(status_code=404, detail="No students found")
-
-        # Create master ZIP
-        zip_buffer = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as master_zip:
-            students_summary_data = []
-
-            # Process each student
-            for student in all_students:
-                student_id = student.get('id')
-                first_name = student.get('first_name', 'Unknown')
-                last_name = student.get('last_name', 'Unknown')
-
-                # Sanitize names for folder
-                safe_first = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in first_name)
-                safe_last = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in last_name)
-                student_folder = f"student_{student_id}_{safe_first}_{safe_last}"
-
-                try:
-                    # Get student's complete export data
-                    student_zip_bytes = export_complete_student_data(student_id, assignment_ids)
-
-                    # Extract the student's ZIP and add contents to master ZIP under student folder
-                    student_zip = zipfile.ZipFile(io.BytesIO(student_zip_bytes), 'r')
-
-                    for file_info in student_zip.filelist:
-                        file_data = student_zip.read(file_info.filename)
-                        master_zip.writestr(f"{student_folder}/{file_info.filename}", file_data)
-
-                    student_zip.close()
-
-                    # Gather summary data
-                    # Get assignment count for summary
-                    assignment_data = export_student_assignments_json(student_id, assignment_ids)
-                    total_assignments = len(assignment_data.get('assignments', []))
-                    total_versions = sum(len(a.get('versions', [])) for a in assignment_data.get('assignments', []))
-
-                    # Check if profile exists
-                    has_profile = False
-                    try:
-                        profile = get_complete_profile(student_id)
-                        has_profile = profile is not None
-                    except:
-                        has_profile = False
-
-                    students_summary_data.append({
-                        "student_id": student_id,
-                        "first_name": first_name,
-                        "last_name": last_name,
-                        "email": student.get('email', 'N/A'),
-                        "year_name": student.get('year_name', 'N/A'),
-                        "total_assignments": total_assignments,
-                        "total_versions": total_versions,
-                        "has_profile": has_profile
-                    })
-
-                except Exception as e:
-                    # Log error but continue with other students
-                    error_msg = f"Error exporting student {student_id}: {str(e)}\n"
-                    master_zip.writestr(f"{student_folder}/EXPORT_ERROR.txt", error_msg)
-
-                    students_summary_data.append({
-                        "student_id": student_id,
-                        "first_name": first_name,
-                        "last_name": last_name,
-                        "email": student.get('email', 'N/A'),
-                        "year_name": student.get('year_name', 'N/A'),
-                        "total_assignments": 0,
-                        "total_versions": 0,
-                        "has_profile": False
-                    })
-
-            # Add summary CSV at root level
-            summary_csv = _create_all_students_summary_csv(students_summary_data)
-            master_zip.writestr("export_summary.csv", summary_csv)
-
-            # Add master export metadata
-            from datetime import datetime as dt
-            master_metadata = [
-                "=" * 80,
-                "ALL STUDENTS EXPORT METADATA",
-                "=" * 80,
-                f"Export Date: {dt.utcnow().isoformat()}",
-                f"Total Students Exported: {len(students_summary_data)}",
-                f"Filtered by Student IDs: {student_ids if student_ids else 'No (all students)'}",
-                f"Filtered by Assignment IDs: {assignment_ids if assignment_ids else 'No (all assignments)'}",
-                "",
-                "=== STRUCTURE ===",
-                "This ZIP contains individual folders for each student with:",
-                "  • Complete student profile (txt and json)",
-                "  • All class enrollments with learning goals",
-                "  • All assignments with original content",
-                "  • All assignment versions with complete metadata",
-                "  • Learning pathways with full reasoning",
-                "  • Skills for success for each version",
-                "  • Student's ideas and suggestions",
-                "  • All ratings and feedback history",
-                "  • Rating and generation history",
-                "",
-                "=== FILES ===",
-                "  • export_summary.csv - Overview of all students",
-                "  • student_{id}_{name}/ - Individual student folders",
-                "",
-                "See individual student folders for complete data.",
-                "=" * 80
-            ]
-            master_zip.writestr("export_metadata.txt", "\n".join(master_metadata))
-
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue()
-
-    except HTTPException:
-        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"All students export error: {str(e)}")
+
+    # Filter by student_ids if provided
+    if student_ids:
+        all_students = [s for s in all_students if s.get('id') in student_ids]
+
+    if not all_students:
+        raise HTTPException(status_code=404, detail="No students found")
+
+    return stream_zip(_all_students_entries(all_students, student_ids, assignment_ids))
+
+
+def _all_students_entries(
+    all_students: List[dict],
+    student_ids: Optional[List[int]],
+    assignment_ids: Optional[List[int]]
+) -> Iterator[ZipEntry]:
+    students_summary_data = []
+
+    # Process each student
+    for student in all_students:
+        student_id = student.get('id')
+        first_name = student.get('first_name', 'Unknown')
+        last_name = student.get('last_name', 'Unknown')
+
+        # Sanitize names for folder
+        safe_first = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in first_name)
+        safe_last = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in last_name)
+        student_folder = f"student_{student_id}_{safe_first}_{safe_last}"
+
+        try:
+            # Load once; the same data feeds the student's folder and the summary row
+            profile_data = _load_student_profile(student_id)
+            assignment_data = export_student_assignments_json(student_id, assignment_ids)
+            yield from prefix_entries(student_folder, _complete_student_entries(profile_data, assignment_data))
+
+            students_summary_data.append({
+                "student_id": student_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": student.get('email', 'N/A'),
+                "year_name": student.get('year_name', 'N/A'),
+                "total_assignments": len(assignment_data.get('assignments', [])),
+                "total_versions": sum(len(a.get('versions', [])) for a in assignment_data.get('assignments', [])),
+                # A complete export requires the profile
+                "has_profile": True
+            })
+
+        except Exception as e:
+            # Log error but continue with other students
+            error_msg = f"Error exporting student {student_id}: {str(e)}\n"
+            yield f"{student_folder}/EXPORT_ERROR.txt", error_msg
+
+            students_summary_data.append({
+                "student_id": student_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": student.get('email', 'N/A'),
+                "year_name": student.get('year_name', 'N/A'),
+                "total_assignments": 0,
+                "total_versions": 0,
+                "has_profile": False
+            })
+
+    # Add summary CSV at root level
+    yield "export_summary.csv", _create_all_students_summary_csv(students_summary_data)
+
+    # Add master export metadata
+    from datetime import datetime as dt
+    master_metadata = [
+        "=" * 80,
+        "ALL STUDENTS EXPORT METADATA",
+        "=" * 80,
+        f"Export Date: {dt.utcnow().isoformat()}",
+        f"Total Students Exported: {len(students_summary_data)}",
+        f"Filtered by Student IDs: {student_ids if student_ids else 'No (all students)'}",
+        f"Filtered by Assignment IDs: {assignment_ids if assignment_ids else 'No (all assignments)'}",
+        "",
+        "=== STRUCTURE ===",
+        "This ZIP contains individual folders for each student with:",
+        "  • Complete student profile (txt and json)",
+        "  • All class enrollments with learning goals",
+        "  • All assignments with original content",
+        "  • All assignment versions with complete metadata",
+        "  • Learning pathways with full reasoning",
+        "  • Skills for success for each version",
+        "  • Student's ideas and suggestions",
+        "  • All ratings and feedback history",
+        "  • Rating and generation history",
+        "",
+        "=== FILES ===",
+        "  • export_summary.csv - Overview of all students",
+        "  • student_{id}_{name}/ - Individual student folders",
+        "",
+        "See individual student folders for complete data.",
+        "=" * 80
+    ]
+    yield "export_metadata.txt", "\n".join(master_metadata)
@@ -6,7 +6,7 @@ import pyodbc
 from application.database.mssql_connection import get_sql_db_connection
 from application.database.nosql_connection import get_container
 from application.database.mssql_crud_helpers import (
-    create_many_records,
+    create_many_records_async,
     create_record,
     fetch_all,
     update_record,
@@ -16,6 +16,13 @@ from typing import List, Dict, Optional
 
 from application.features.assignments.schemas import AssignmentCreateResponse, AssignmentDetailResponse
 from application.features.users.crud.user_queries import get_users_with_roles
+from application.features.versionHistory.version_repository import delete_version_document
+from application.features.versionHistory.version_summaries import (
+    DEFAULT_VERSION_SUMMARY,
+    delete_assignment_version_summary,
+    get_version_summaries_map,
+    summarize_versions,
+)
 
 TABLE_NAME = "Assignments"
 
@@ -68,6 +75,9 @@ def analyze_assignment_versions(assignment_id: str):
 def get_all_assignment_versions_map():
     """
     Fetch all assignment versions from Cosmos DB and return a dict mapping assignment_id to its metadata.
+
+    This scans the whole versions container; list endpoints read the materialized
+    summaries from get_version_summaries_map instead.
     """
     container = get_container()
 
@@ -82,34 +92,10 @@ def get_all_assignment_versions_map():
         grouped.setdefault(aid, []).append(item)
 
     result_map = {}
-
     for assignment_id, versions in grouped.items():
-        finalized = any(v.get("finalized") for v in versions)
-        date_modified = max(
-        [
-            datetime.fromisoformat(v["date_modified"]).replace(tzinfo=None)
-            for v in versions
-            if "date_modified" in v
-        ],
-        default=None
-)
-
-        finalized_versions = [v for v in versions if v.get("finalized")]
-        finalized_version = finalized_versions[0] if finalized_versions else None
-
-        if finalized_version and finalized_version.get("rating_data"):
-            rating_status = "Rated"
-        elif any(v.get("rating_data") for v in versions):
-            rating_status = "Partially Rated"
-        else:
-            rating_status = "Pending"
-
-        result_map[str(assignment_id)] = {
-            "finalized": finalized,
-            "rating_status": rating_status,
-            "date_modified": date_modified,
-            "final_version_id": finalized_version.get("id") if finalized_version else None
-        }
+        summary = summarize_versions(versions)
+        summary.pop("version_count", None)
+        result_map[str(assignment_id)] = summary
 
     return result_map
 
@@ -165,21 +151,14 @@ def get_all_assignments(tutor_user_id: Optional[int] = None):
             records = cursor.fetchall()
             column_names = [column[0] for column in cursor.description]
 
-            assignment_versions = get_all_assignment_versions_map()
+        assignments = [dict(zip(column_names, row)) for row in records]
+        assignment_versions = get_version_summaries_map(a["id"] for a in assignments)
 
-            results = []
-            for row in records:
-                assignment = dict(zip(column_names, row))
-                version_data = assignment_versions.get(str(assignment["id"]), {
-                    "finalized": False,
-                    "rating_status": "Pending",
-                    "date_modified": None,
-                    "final_version_id": None
-                })
-                assignment.update(version_data)
-                results.append(assignment)
+        for assignment in assignments:
+            version_data = assignment_versions.get(str(assignment["id"]), DEFAULT_VERSION_SUMMARY)
+            assignment.update(version_data)
 
-            return results
+        return assignments
 
     except pyodbc.Error as e:
         return {"error": str(e)}
@@ -213,21 +192,14 @@ def get_all_assignments_by_student_id(student_id):
             records = cursor.fetchall()
             column_names = [column[0] for column in cursor.description]
 
-            assignment_versions = get_all_assignment_versions_map()
+        assignments = [dict(zip(column_names, row)) for row in records]
+        assignment_versions = get_version_summaries_map(a["id"] for a in assignments)
 
-            results = []
-            for row in records:
-                assignment = dict(zip(column_names, row))
-                version_data = assignment_versions.get(str(assignment["id"]), {
-                    "finalized": False,
-                    "rating_status": "Pending",
-                    "date_modified": None,
-                    "final_version_id": None
-                })
-                assignment.update(version_data)
-                results.append(assignment)
+        for assignment in assignments:
+            version_data = assignment_versions.get(str(assignment["id"]), DEFAULT_VERSION_SUMMARY)
+            assignment.update(version_data)
 
-            return results
+        return assignments
 
     except pyodbc.Error as e:
         return {"error": str(e)}
@@ -369,7 +341,7 @@ def add_assignment(data):
 
 async def add_many_assignments(data) -> List[Dict]:
     """Add many new assignments in Assignments table"""
-    new_records = create_many_records(TABLE_NAME, data)
+    new_records = await create_many_records_async(TABLE_NAME, data)
 
     if new_records and isinstance(new_records, list) and "error" in new_records[0]:
         raise HTTPException(
@@ -403,11 +375,12 @@ def delete_assignment_by_id(assignment_id: int):
 
         # Delete associated versions from Cosmos DB
         container = get_container()
-        query = f"SELECT * FROM c WHERE c.assignment_id = {assignment_id}"
+        query = f"SELECT c.id FROM c WHERE c.assignment_id = {assignment_id}"
         items = list(container.query_items(query=query, enable_cross_partition_query=True))
         for item in items:
-            item_id = item['id']
-            container.delete_item(item, partition_key=item_id)
+            delete_version_document(item['id'])
+
+        delete_assignment_version_summary(assignment_id)
 
     except pyodbc.Error as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
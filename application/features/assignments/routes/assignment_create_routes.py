@@ -1,6 +1,7 @@
 """
 Assignment creation routes - POST operations for creating/uploading assignments
 """
+import asyncio
 import datetime
 from io import BytesIO
 from typing import List
@@ -17,6 +18,7 @@ from application.features.assignments.crud import (
     add_assignment,
     add_many_assignments,
 )
+from application.database.async_db import run_db
 from application.features.auth.permissions import require_user_access
 from application.services.html_extractors import extract_html_from_file
 from application.services.upload_to_blob import upload_to_blob, upload_html_as_word_to_blob
@@ -32,7 +34,7 @@ async def create_assignment(
     _user = Depends(require_user_access)
 ):
     """Create a new assignment."""
-    created_assignment = add_assignment(assignment_data.model_dump())
+    created_assignment = await run_db(add_assignment, assignment_data.model_dump())
     return created_assignment
 
 
@@ -136,8 +138,9 @@ async def create_assignment_from_text(
     _user = Depends(require_user_access)
 ):
     """Create a new assignment from raw text content."""
-    # Generate HTML content from text using GPT
-    html_content = generate_html_from_text(assignment_data.content)
+    # Format the text as HTML (local rules, GPT only for layouts they are unsure of).
+    # The model call is synchronous, so it runs off the event loop
+    html_content = await asyncio.to_thread(generate_html_from_text, assignment_data.content)
 
     # Upload HTML content as Word document to blob storage
     blob_url = await upload_html_as_word_to_blob(
@@ -152,14 +155,14 @@ async def create_assignment_from_text(
         title=assignment_data.title,
         class_id=assignment_data.class_id,
         content=assignment_data.content,
-        html_content=html_content,  # GPT-generated HTML content
+        html_content=html_content,  # Formatted HTML content
         blob_url=blob_url,  # Word document download URL
         source_format="docx",  # Mark as Word document
         date_created=assignment_data.date_created or datetime.datetime.now(datetime.timezone.utc),
         assignment_type_id=assignment_data.assignment_type_id
     )
 
-    created_assignment = add_assignment(assignment_create_data.model_dump())
+    created_assignment = await run_db(add_assignment, assignment_create_data.model_dump())
     return created_assignment
 
 
@@ -169,8 +172,8 @@ async def create_many_assignments_from_text(
     _user = Depends(require_user_access)
 ):
     """Create assignments for multiple students using the same raw text content."""
-    # Generate HTML content once for all students (efficiency)
-    html_content = generate_html_from_text(assignment_data.content)
+    # Generate HTML content once for all students (efficiency), off the event loop
+    html_content = await asyncio.to_thread(generate_html_from_text, assignment_data.content)
 
     assignment_create_list = []
 
@@ -188,7 +191,7 @@ async def create_many_assignments_from_text(
                 title=assignment_data.title,
                 class_id=assignment_data.class_id,
                 content=assignment_data.content,
-                html_content=html_content,  # GPT-generated HTML content (reused)
+                html_content=html_content,  # Formatted HTML content (reused)
                 blob_url=blob_url,  # Unique Word document download URL per student
                 source_format="docx",  # Mark as Word document
                 date_created=datetime.datetime.now(datetime.timezone.utc),
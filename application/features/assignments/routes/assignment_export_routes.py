@@ -2,7 +2,8 @@
 Assignment export routes - JSON and ZIP download operations
 """
 from typing import Optional
-from fastapi import Depends, HTTPException, APIRouter, Response, Query
+from fastapi import Depends, HTTPException, APIRouter, Query
+from fastapi.responses import StreamingResponse
 
 from application.features.assignments.schemas import StudentAssignmentExportResponse
 from application.features.assignments.crud import (
@@ -82,7 +83,7 @@ def export_student_data_download(
         assignment_ids: Optional comma-separated list of assignment IDs (e.g., "1,2,3")
 
     Returns:
-        ZIP file download
+        ZIP file download, streamed as entries are produced
     """
     # Parse assignment_ids if provided
     parsed_assignment_ids = None
@@ -92,13 +93,13 @@ def export_student_data_download(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid assignment_ids format. Use comma-separated integers.")
 
-    zip_bytes = export_student_assignments_download(student_id, parsed_assignment_ids)
+    zip_stream = export_student_assignments_download(student_id, parsed_assignment_ids)
 
     from datetime import datetime as dt, timezone
     filename = f"student_{student_id}_export_{dt.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.zip"
 
-    return Response(
-        content=zip_bytes,
+    return StreamingResponse(
+        zip_stream,
         media_type="application/zip",
         headers={
             "Content-Disposition": f"attachment; filename=\"{filename}\""
@@ -142,7 +143,7 @@ def export_complete_student_data_download(
         assignment_ids: Optional comma-separated list of assignment IDs to filter (e.g., "1,2,3")
 
     Returns:
-        Comprehensive ZIP file with all student data
+        Comprehensive ZIP file with all student data, streamed as entries are produced
     """
     # Parse assignment_ids if provided
     parsed_assignment_ids = None
@@ -152,13 +153,13 @@ def export_complete_student_data_download(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid assignment_ids format. Use comma-separated integers.")
 
-    zip_bytes = export_complete_student_data(student_id, parsed_assignment_ids)
+    zip_stream = export_complete_student_data(student_id, parsed_assignment_ids)
 
     from datetime import datetime as dt, timezone
     filename = f"student_{student_id}_complete_export_{dt.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.zip"
 
-    return Response(
-        content=zip_bytes,
+    return StreamingResponse(
+        zip_stream,
         media_type="application/zip",
         headers={
             "Content-Disposition": f"attachment; filename=\"{filename}\""
@@ -205,7 +206,7 @@ def export_all_students_data_download(
         assignment_ids: Optional comma-separated list of assignment IDs to filter by
 
     Returns:
-        Master ZIP file with all student data
+        Master ZIP file with all student data, streamed as each student is exported
     """
     # Parse student_ids if provided
     parsed_student_ids = None
@@ -223,13 +224,13 @@ def export_all_students_data_download(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid assignment_ids format. Use comma-separated integers.")
 
-    zip_bytes = export_all_students_complete_data(parsed_student_ids, parsed_assignment_ids)
+    zip_stream = export_all_students_complete_data(parsed_student_ids, parsed_assignment_ids)
 
     from datetime import datetime as dt, timezone
     filename = f"all_students_export_{dt.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.zip"
 
-    return Response(
-        content=zip_bytes,
+    return StreamingResponse(
+        zip_stream,
         media_type="application/zip",
         headers={
             "Content-Disposition": f"attachment; filename=\"{filename}\""
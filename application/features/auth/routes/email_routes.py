@@ -1,5 +1,6 @@
 import os
 from fastapi import HTTPException, APIRouter, Depends
+from application.database.async_db import run_db
 from application.features.users.crud.user_queries import get_user_with_roles_by_id
 from application.features.auth.permissions import require_admin_access
 from application.features.auth.schemas import UserLogin, TokenResponse, ForgotPasswordRequest, ResetPasswordRequest, AdminResetPasswordRequest
@@ -27,8 +28,9 @@ async def email_login(user_credentials: UserLogin) -> TokenResponse:
     user_id = -1
 
     try:
-        user_id = validate_user_email_login(
-            user_credentials.email, 
+        user_id = await run_db(
+            validate_user_email_login,
+            user_credentials.email,
             user_credentials.password
         )
     except HTTPException as e:
@@ -40,7 +42,7 @@ async def email_login(user_credentials: UserLogin) -> TokenResponse:
             detail="An internal server error occurred."
         )
 
-    return create_token_response(user_id)
+    return await run_db(create_token_response, user_id)
 
 
 @router.post("/forgot-password")
@@ -50,11 +52,11 @@ async def forgot_password(request: ForgotPasswordRequest):
     Always returns success for security (doesn't reveal if email exists).
     """
     try:
-        user = get_user_by_email(request.email)
+        user = await run_db(get_user_by_email, request.email)
         
         if user:
             user_id = user["id"]
-            reset_token = create_password_reset_token(user_id)
+            reset_token = await run_db(create_password_reset_token, user_id)
             
             if reset_token:
                 frontend_base_url = os.getenv("FRONTEND_BASE_URL")
@@ -76,7 +78,7 @@ async def reset_password(request: ResetPasswordRequest):
     Resets user password using a valid reset token.
     Requires email verification for additional security.
     """
-    user_id = validate_password_reset_token(request.token)
+    user_id = await run_db(validate_password_reset_token, request.token)
     
     if not user_id:
         raise HTTPException(
@@ -85,7 +87,7 @@ async def reset_password(request: ResetPasswordRequest):
         )
     
     # Verify email matches the user associated with the token
-    stored_email = get_user_email_by_id(user_id)
+    stored_email = await run_db(get_user_email_by_id, user_id)
     
     if not stored_email:
         raise HTTPException(
@@ -100,16 +102,16 @@ async def reset_password(request: ResetPasswordRequest):
             detail="Email does not match the account associated with this reset token."
         )
     
-    hashed_password = hash_password(request.new_password)
+    hashed_password = await run_db(hash_password, request.new_password)
     
-    success = update_user_password(user_id, hashed_password)
+    success = await run_db(update_user_password, user_id, hashed_password)
     if not success:
         raise HTTPException(
             status_code=500,
             detail="Failed to update password. Please try again."
         )
     
-    mark_password_reset_token_used(request.token)
+    await run_db(mark_password_reset_token_used, request.token)
 
     return {"message": "Password has been successfully reset."}
 
@@ -124,7 +126,7 @@ async def admin_reset_password(
     Does not require email verification or reset tokens.
     """
     # Get user information from user ID
-    user = get_user_with_roles_by_id(request.user_id)
+    user = await run_db(get_user_with_roles_by_id, request.user_id)
 
     if not user:
         raise HTTPException(
@@ -132,10 +134,10 @@ async def admin_reset_password(
             detail=f"User with ID {request.user_id} not found."
         )
 
-    hashed_password = hash_password(request.new_password)
+    hashed_password = await run_db(hash_password, request.new_password)
 
     # Update the password
-    success = update_user_password(request.user_id, hashed_password)
+    success = await run_db(update_user_password, request.user_id, hashed_password)
     if not success:
         raise HTTPException(
             status_code=500,
@@ -1,6 +1,7 @@
 from typing import Dict
 from datetime import datetime
 from fastapi import HTTPException, APIRouter, Depends
+from application.database.async_db import run_db
 from application.features.auth.crud import (
     get_refresh_token_details,
     delete_refresh_token,
@@ -20,7 +21,7 @@ async def logout(
     """
     Logs user out of app by deleting refresh token from DB.
     """
-    delete_refresh_token(refresh_token)
+    await run_db(delete_refresh_token, refresh_token)
     return {"message": "Log-out successful."}
 
 
@@ -30,7 +31,7 @@ async def refresh_access_token(refresh_token: str) -> TokenResponse:
     Retrieves current refresh token and generates a new access token (JWT) with
     new expiration date.
     """
-    token_details = get_refresh_token_details(refresh_token)
+    token_details = await run_db(get_refresh_token_details, refresh_token)
     if not token_details:
         raise HTTPException(status_code=401, detail="Invalid refresh token.")
 
@@ -38,13 +39,13 @@ async def refresh_access_token(refresh_token: str) -> TokenResponse:
     expires_at = token_details["expires_at"]
 
     if expires_at < datetime.now():
-        delete_refresh_token(refresh_token)
+        await run_db(delete_refresh_token, refresh_token)
         raise HTTPException(
             status_code=401, 
             detail="Invalid or expired refresh token. Please log in again."
             )
     
-    new_token_response = create_token_response(user_id)
-    delete_refresh_token(refresh_token)
+    new_token_response = await run_db(create_token_response, user_id)
+    await run_db(delete_refresh_token, refresh_token)
 
     return new_token_response
\ No newline at end of file
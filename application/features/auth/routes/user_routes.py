@@ -8,6 +8,7 @@ from application.features.auth.schemas import (
     UpdateProfilePictureRequest,
     UpdateOwnNameRequest
 )
+from application.database.async_db import run_db
 from application.features.auth.permissions import require_user_access
 from application.features.users.crud.user_queries import (
     get_user_with_roles_by_id,
@@ -35,7 +36,7 @@ async def get_current_user(
             detail="Invalid token payload: missing user_id."
         )
     
-    user = get_user_with_roles_by_id(user_id)
+    user = await run_db(get_user_with_roles_by_id, user_id)
     if not user:
         raise HTTPException(
             status_code=404, 
@@ -92,7 +93,8 @@ async def update_own_email(
         )
 
     # Call existing update_user_email function
-    updated_user = update_user_email(
+    updated_user = await run_db(
+        update_user_email,
         user_id=user_id,
         email=email_data.email,
         gt_email=email_data.gt_email
@@ -131,7 +133,8 @@ async def reset_own_password(
             detail="Invalid token payload: missing user_id."
         )
 
-    result = update_own_password(
+    result = await run_db(
+        update_own_password,
         user_id=user_id,
         current_password=password_data.current_password,
         new_password=password_data.new_password
@@ -181,7 +184,7 @@ async def update_own_profile_picture(
         raise HTTPException(status_code=400, detail="No profile picture provided")
 
     # Update the user's profile picture in the database
-    update_user_profile_picture(user_id, blob_url)
+    await run_db(update_user_profile_picture, user_id, blob_url)
 
     return {
         "success": True,
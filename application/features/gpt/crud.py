@@ -1,7 +1,14 @@
+import functools
 import json
-from typing import Dict, List, Optional
-from .gpt_connection import get_gpt_response
-from openai import OpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+from .gpt_connection import get_gpt_response, record_prompt_cache_usage, stream_gpt_response
+from .openai_client import get_openai_client
+from .resilience import openai_caller
+from application.database.nosql_connection import GPT_SUMMARY_CACHE_CONTAINER_NAME
+from application.services.content_cache import ContentCache, CosmosCacheTier, MemoryCacheTier, make_cache_key
+from application.services.text_to_html import convert_text_to_html
 
 from dotenv import load_dotenv
 import os 
@@ -9,16 +16,27 @@ import os
 
 load_dotenv()
 GPT_MODEL = os.getenv("GPT_MODEL")
+# Upper bound on summary calls in flight across all profile saves in this process
+PROFILE_SUMMARY_CONCURRENCY = int(os.getenv("PROFILE_SUMMARY_CONCURRENCY", "5"))
+GPT_SUMMARY_CACHE_BACKEND = os.getenv("GPT_SUMMARY_CACHE_BACKEND", "memory")
+GPT_SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("GPT_SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+GPT_SUMMARY_CACHE_TTL_SECONDS = int(os.getenv("GPT_SUMMARY_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Rule-based text-to-HTML results at or above this confidence skip the model call
+TEXT_TO_HTML_MIN_CONFIDENCE = float(os.getenv("TEXT_TO_HTML_MIN_CONFIDENCE", "0.8"))
 
 
 def process_gpt_prompt(prompt: str, model = GPT_MODEL) -> str:
     # You could add extra processing here if needed
-    return get_gpt_response(prompt, model)
+    return get_gpt_response(prompt, model, call_type="summary")
 
 
-def process_gpt_prompt_version_suggestion_json(prompt: str, model = GPT_MODEL, override_max_tokens: Optional[int] = None
+def process_gpt_prompt_version_suggestion_json(prompt: str, model = GPT_MODEL, override_max_tokens: Optional[int] = None,
+    system_prompt: Optional[str] = None, prompt_tokens: Optional[int] = None
 ) -> dict:
-    response_text = get_gpt_response(prompt, model=model, override_max_tokens=override_max_tokens).strip()
+    response_text = get_gpt_response(
+        prompt, model=model, override_max_tokens=override_max_tokens, system_prompt=system_prompt,
+        prompt_tokens=prompt_tokens
+    ).strip()
 
     try:
         return json.loads(response_text)
@@ -26,9 +44,6 @@ def process_gpt_prompt_version_suggestion_json(prompt: str, model = GPT_MODEL, o
         raise ValueError(f"Invalid JSON from GPT: {e}\nRaw content:\n{response_text}")
 
 
-# gpt_client.py
-client = OpenAI()
-
 ASSIGNMENT_PACKAGE_JSON_SCHEMA = {
     "type": "object",
     "additionalProperties": False,
@@ -65,20 +80,24 @@ def process_gpt_prompt_json(
     model = GPT_MODEL,
     override_max_tokens: int | None = None
 ) -> dict:
-    resp = client.responses.create(
-        model=GPT_MODEL,
-        input=messages,
-        text={
-            "format": {
-                "type": "json_schema",
-                "name": "AssignmentPackage",
-                "strict": True,
-                "schema": ASSIGNMENT_PACKAGE_JSON_SCHEMA,  # <-- raw JSON Schema dict
-            }
-        },
-        # temperature=0.2,
-        max_output_tokens=8000,
+    resp = openai_caller.call(
+        lambda timeout: get_openai_client().responses.create(
+            model=GPT_MODEL,
+            input=messages,
+            text={
+                "format": {
+                    "type": "json_schema",
+                    "name": "AssignmentPackage",
+                    "strict": True,
+                    "schema": ASSIGNMENT_PACKAGE_JSON_SCHEMA,  # <-- raw JSON Schema dict
+                }
+            },
+            # temperature=0.2,
+            max_output_tokens=8000,
+            timeout=timeout,
+        )
     )
+    record_prompt_cache_usage(resp.usage)
     obj = json.loads(resp.output_text)
 
 
@@ -88,13 +107,18 @@ def process_gpt_prompt_json(
 def process_gpt_prompt_html(
     prompt: str,
     model = GPT_MODEL,
-    override_max_tokens: Optional[int] = None
+    override_max_tokens: Optional[int] = None,
+    system_prompt: Optional[str] = None,
+    prompt_tokens: Optional[int] = None
 ) -> str:
     """
     Sends a prompt to GPT and returns the raw HTML string.
-    Allows an optional override for max tokens.
+    Allows an optional override for max tokens and a static system prompt.
     """
-    response_text = get_gpt_response(prompt, model=model, override_max_tokens=override_max_tokens).strip()
+    response_text = get_gpt_response(
+        prompt, model=model, override_max_tokens=override_max_tokens, system_prompt=system_prompt,
+        prompt_tokens=prompt_tokens
+    ).strip()
 
     # # Optionally, validate that the output is HTML
     # if not response_text.lower().startswith("<!doctype html") and not response_text.lower().startswith("<html"):
@@ -103,6 +127,59 @@ def process_gpt_prompt_html(
     return response_text
 
 
+def stream_gpt_prompt_html(
+    prompt: str,
+    model = GPT_MODEL,
+    override_max_tokens: Optional[int] = None,
+    system_prompt: Optional[str] = None,
+    prompt_tokens: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of process_gpt_prompt_html: yields raw HTML chunks as
+    the model produces them. The caller strips and persists the assembled text.
+    """
+    return stream_gpt_response(
+        prompt, model=model, override_max_tokens=override_max_tokens, system_prompt=system_prompt,
+        prompt_tokens=prompt_tokens
+    )
+
+
+# ---------- Profile summaries ----------
+# Summaries are cached by a hash of (function, prompt version, model, normalized input),
+# so re-saving an unchanged profile returns instantly without a model call.
+# Bump a function's prompt_version whenever its prompt text changes.
+
+_summary_cache: Optional[ContentCache] = None
+_summary_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> ContentCache:
+    global _summary_cache
+    if _summary_cache is None:
+        with _summary_cache_lock:
+            if _summary_cache is None:
+                persistent = None
+                if GPT_SUMMARY_CACHE_BACKEND == "cosmos":
+                    persistent = CosmosCacheTier(GPT_SUMMARY_CACHE_CONTAINER_NAME, GPT_SUMMARY_CACHE_TTL_SECONDS)
+                _summary_cache = ContentCache(
+                    "gpt_summaries",
+                    MemoryCacheTier(GPT_SUMMARY_CACHE_MAX_ENTRIES, GPT_SUMMARY_CACHE_TTL_SECONDS),
+                    persistent
+                )
+    return _summary_cache
+
+
+def cached_summary(prompt_version: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(value):
+            key = make_cache_key(func.__name__, value, prompt_version, GPT_MODEL)
+            return get_summary_cache().get_or_compute(key, lambda: func(value))
+        return wrapper
+    return decorator
+
+
+@cached_summary(prompt_version="1")
 def summarize_strengths(strengths: list[str]) -> str:
     prompt = f"""Write a short,  1 sentence summary (5-10 words AT MOST)  of these strengths in **first person**.
     Use plain, simple language (no greater than 4th grade level).
@@ -115,6 +192,7 @@ def summarize_strengths(strengths: list[str]) -> str:
     """
     return process_gpt_prompt(prompt, model=GPT_MODEL)
 
+@cached_summary(prompt_version="1")
 def summarize_short_term_goals(short_term: str) -> str:
     prompt = f"""Write a short, 1 sentence summary (5-10 words AT MOST) of these short-term goals in **first person**.
     Use plain, simple language (no greater than 4th grade level).
@@ -128,6 +206,7 @@ def summarize_short_term_goals(short_term: str) -> str:
     """
     return process_gpt_prompt(prompt, model=GPT_MODEL)
 
+@cached_summary(prompt_version="1")
 def summarize_long_term_goals(long_term: str) -> str:
     prompt = f"""Write a short, 1 sentence summary (5-10 words AT MOST)  of these long-term goals in **first person**.
     Use plain, simple language (no greater than 4th grade level).
@@ -141,6 +220,7 @@ def summarize_long_term_goals(long_term: str) -> str:
     """
     return process_gpt_prompt(prompt, model=GPT_MODEL)
 
+@cached_summary(prompt_version="1")
 def summarize_best_ways_to_learn(best_ways: str) -> str:
     prompt = f"""Write a short, 1 sentence summary (5-10 words AT MOST) of the best ways for me to learn, in **first person**.
     Use plain, simple language (no greater than 4th grade level).
@@ -156,6 +236,7 @@ def summarize_best_ways_to_learn(best_ways: str) -> str:
     """
     return process_gpt_prompt(prompt, model=GPT_MODEL)
 
+@cached_summary(prompt_version="1")
 def generate_vision_statement(student_info: str) -> str:
     prompt = f"""Write a **first-person** vision statement, 1-2 sentences long (each sentence 5-7 words), using plain, simple language (no greater than 4th grade level).
     Make it **motivating**, connecting my present learning to my future dreams.
@@ -171,8 +252,71 @@ def generate_vision_statement(student_info: str) -> str:
     return process_gpt_prompt(prompt, model=GPT_MODEL)
 
 
+_summary_executor: Optional[ThreadPoolExecutor] = None
+_summary_executor_lock = threading.Lock()
+
+
+def _get_summary_executor() -> ThreadPoolExecutor:
+    global _summary_executor
+    if _summary_executor is None:
+        with _summary_executor_lock:
+            if _summary_executor is None:
+                _summary_executor = ThreadPoolExecutor(
+                    max_workers=PROFILE_SUMMARY_CONCURRENCY,
+                    thread_name_prefix="profile-summary"
+                )
+    return _summary_executor
+
+
+def generate_profile_summaries(
+    strengths: Optional[list[str]] = None,
+    short_term_goals: Optional[str] = None,
+    long_term_goals: Optional[str] = None,
+    best_ways_to_help: Optional[str] = None,
+    vision_source: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Runs the requested profile summaries concurrently so a profile save costs about
+    one model round trip instead of one per field. Only arguments that are not None
+    are summarized. Returns a dict keyed like the profile document:
+    strength_short, short_term_goals, long_term_goals, best_ways_to_help, vision.
+    The first failure is raised after all calls have finished.
+    """
+    tasks = {
+        "strength_short": (summarize_strengths, strengths),
+        "short_term_goals": (summarize_short_term_goals, short_term_goals),
+        "long_term_goals": (summarize_long_term_goals, long_term_goals),
+        "best_ways_to_help": (summarize_best_ways_to_learn, best_ways_to_help),
+        "vision": (generate_vision_statement, vision_source),
+    }
+
+    executor = _get_summary_executor()
+    futures = {
+        key: executor.submit(func, value)
+        for key, (func, value) in tasks.items()
+        if value is not None
+    }
+
+    results = {}
+    error = None
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            error = error or e
+    if error:
+        raise error
+    return results
+
+
 def generate_html_from_text(text_content: str) -> str:
     """Generate simple HTML formatting from raw text content for display. DO NOT CHANGE ANYTHING ABOUT THE INPUT CONTENT EXCEPT FOR THE HTML FORMATTING."""
+    # Most pasted text is plain paragraphs and lists; only ask the model when the rules are unsure
+    html_content, confidence = convert_text_to_html(text_content)
+    if confidence >= TEXT_TO_HTML_MIN_CONFIDENCE:
+        _count_text_to_html("local")
+        return html_content
+
     prompt = f"""Convert the following raw text into clean, simple HTML for display purposes.
 
 Requirements:
@@ -194,23 +338,25 @@ Text to convert:
 {text_content}
 """
     try:
-        return process_gpt_prompt_html(prompt, model=GPT_MODEL, override_max_tokens=1000)
+        result = process_gpt_prompt_html(prompt, model=GPT_MODEL, override_max_tokens=1000)
+        _count_text_to_html("model")
+        return result
     except Exception as e:
-        # Fallback to basic HTML formatting if GPT fails
-        print(f"GPT HTML generation failed: {e}")
-        return generate_basic_html_fallback(text_content)
+        # Fall back to the rule-based HTML if GPT fails
+        print(f"GPT HTML generation failed (local confidence {confidence}): {e}")
+        _count_text_to_html("model_failed")
+        return html_content
+
+
+_text_to_html_lock = threading.Lock()
+_text_to_html_counts = {"local": 0, "model": 0, "model_failed": 0}
 
 
-def generate_basic_html_fallback(text_content: str) -> str:
-    """Basic HTML formatting fallback if GPT is unavailable."""
-    # Split by double line breaks for paragraphs
-    paragraphs = text_content.split('\n\n')
-    html_paragraphs = []
+def _count_text_to_html(outcome: str):
+    with _text_to_html_lock:
+        _text_to_html_counts[outcome] += 1
 
-    for paragraph in paragraphs:
-        if paragraph.strip():
-            # Clean up single line breaks within paragraphs
-            cleaned = paragraph.replace('\n', ' ').strip()
-            html_paragraphs.append(f"<p>{cleaned}</p>")
 
-    return '\n'.join(html_paragraphs)
+def get_text_to_html_stats() -> dict:
+    with _text_to_html_lock:
+        return {**_text_to_html_counts, "min_confidence": TEXT_TO_HTML_MIN_CONFIDENCE}
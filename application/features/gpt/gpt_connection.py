@@ -1,59 +1,157 @@
-from typing import Optional
-import tiktoken
-from openai import OpenAI
+import threading
+from typing import AsyncIterator, List, Optional
 
-client = OpenAI()
+from .openai_client import get_async_openai_client, get_openai_client, openai_limiter
+from .resilience import openai_caller
+from .token_budget import count_static_tokens, count_tokens as _count_tokens, output_tokens_for
+
+DEFAULT_MAX_OUTPUT_TOKENS = 500  # keep the original default
 
-import tiktoken
 
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     """
     Counts how many tokens a text will consume for the specified model.
     """
-    # Map new/unknown models to a known encoding
-    if model.startswith("gpt-4.1") or model.startswith("gpt-4o"):
-        # GPT-4.1 and gpt-4o families both use cl100k_base
-        enc = tiktoken.get_encoding("cl100k_base")
-    else:
-        try:
-            enc = tiktoken.encoding_for_model(model)
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
-    return len(enc.encode(text))
+    return _count_tokens(text, model)
+
+
+def _max_output_tokens_for(prompt: str, model: str, override_max_tokens: Optional[int],
+                           system_prompt: Optional[str] = None, prompt_tokens: Optional[int] = None) -> int:
+    """
+    Count the prompt against the model's context window and return the output token limit.
+    prompt_tokens, when the caller already has it (system prompt included), skips the count.
+    """
+    if prompt_tokens is None:
+        # The system prompt is a static template prefix, so its count is memoised
+        prompt_tokens = count_tokens(prompt, model=model)
+        if system_prompt:
+            prompt_tokens += count_static_tokens(system_prompt, model)
+    print(f"Prompt token count: {prompt_tokens}")
+
+    # Shrinks the output allowance to the room left rather than failing, when it can
+    return output_tokens_for(prompt_tokens, model, override_max_tokens or DEFAULT_MAX_OUTPUT_TOKENS)
+
 
+# ---------- Provider prompt-cache telemetry ----------
+# OpenAI caches long prompt prefixes automatically and reports how many input tokens
+# were served from that cache. These counters show how often repeat generations hit it.
+
+_prompt_cache_lock = threading.Lock()
+_prompt_cache_counters = {"calls": 0, "calls_with_cached_tokens": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+
+def record_prompt_cache_usage(usage) -> None:
+    """Record input/cached token counts from a Chat Completions or Responses API usage object."""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    if prompt_tokens is None:
+        prompt_tokens = getattr(usage, "input_tokens", None) or 0
+        details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or 0
+
+    with _prompt_cache_lock:
+        _prompt_cache_counters["calls"] += 1
+        _prompt_cache_counters["prompt_tokens"] += prompt_tokens
+        _prompt_cache_counters["cached_tokens"] += cached_tokens
+        if cached_tokens:
+            _prompt_cache_counters["calls_with_cached_tokens"] += 1
+
+
+def get_prompt_cache_stats() -> dict:
+    with _prompt_cache_lock:
+        counters = dict(_prompt_cache_counters)
+    counters["cached_token_rate"] = (
+        round(counters["cached_tokens"] / counters["prompt_tokens"], 3) if counters["prompt_tokens"] else 0.0
+    )
+    counters["call_hit_rate"] = (
+        round(counters["calls_with_cached_tokens"] / counters["calls"], 3) if counters["calls"] else 0.0
+    )
+    return counters
 
 
+def _build_messages(prompt: str, system_prompt: Optional[str]) -> List[dict]:
+    # A static system prompt goes first so it forms a cacheable prefix
+    messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
 
 def get_gpt_response(
     prompt: str,
     model: str = "gpt-4o",
-    override_max_tokens: Optional[int] = None
+    override_max_tokens: Optional[int] = None,
+    system_prompt: Optional[str] = None,
+    call_type: str = "generation",
+    prompt_tokens: Optional[int] = None
 ) -> str:
+    client = get_openai_client()
     if not client.api_key:
         raise RuntimeError("OpenAI API key not configured")
 
-    # --- Count tokens in the prompt ---
-    prompt_tokens = count_tokens(prompt, model=model)
-    print(f"Prompt token count: {prompt_tokens}")
-
-    # --- Set safe limits ---
-    context_limit = 4096 if "3.5" in model else 128000  # adjust for gpt-4.1
-    default_max_output_tokens = 500  # keep the original default
-    max_output_tokens = override_max_tokens or default_max_output_tokens
-
-    # --- Validate against context window ---
-    if prompt_tokens + max_output_tokens > context_limit:
-        raise ValueError(
-            f"Prompt ({prompt_tokens} tokens) is too large for {model}'s {context_limit}-token limit. "
-            "Consider splitting the input or lowering override_max_tokens."
-        )
+    max_output_tokens = _max_output_tokens_for(prompt, model, override_max_tokens, system_prompt, prompt_tokens)
 
     # --- Make the API call ---
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}],
-        max_completion_tokens=max_output_tokens,
-        # temperature=0.7,
+    messages = _build_messages(prompt, system_prompt)
+    resp = openai_caller.call(
+        lambda timeout: client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_completion_tokens=max_output_tokens,
+            timeout=timeout,
+            # temperature=0.7,
+        ),
+        call_type=call_type,
     )
+    record_prompt_cache_usage(resp.usage)
 
     return resp.choices[0].message.content.strip()
+
+
+async def stream_gpt_response(
+    prompt: str,
+    model: str = "gpt-4o",
+    override_max_tokens: Optional[int] = None,
+    system_prompt: Optional[str] = None,
+    prompt_tokens: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Same request as get_gpt_response, streamed: yields content deltas as they arrive.
+    Closing the generator early (e.g. the client went away) closes the upstream
+    HTTP stream, which cancels the generation on OpenAI's side.
+    """
+    async_client = get_async_openai_client()
+    if not async_client.api_key:
+        raise RuntimeError("OpenAI API key not configured")
+
+    max_output_tokens = _max_output_tokens_for(prompt, model, override_max_tokens, system_prompt, prompt_tokens)
+
+    # The slot is held for the whole stream, since the connection stays busy until it ends
+    # Only opening the stream is retried; a failure after chunks were sent is final
+    messages = _build_messages(prompt, system_prompt)
+    async with openai_limiter.slot_async():
+        stream = await openai_caller.acall(
+            lambda timeout: async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_completion_tokens=max_output_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout,
+            ),
+            call_type="stream",
+            limit=False,
+        )
+        try:
+            async for chunk in stream:
+                # With include_usage the final chunk carries token usage and no choices
+                if chunk.usage is not None:
+                    record_prompt_cache_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            await stream.close()
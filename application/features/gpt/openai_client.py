@@ -0,0 +1,291 @@
+"""
+Shared OpenAI clients.
+
+Every model call goes through one async and one sync client, created on first use
+with a pooled keep-alive httpx transport. The sync client serves callers that already
+run on worker threads (generation jobs, the profile summary pool); both share the
+same configuration and the same concurrency limit.
+
+    OPENAI_MAX_CONNECTIONS / OPENAI_MAX_KEEPALIVE_CONNECTIONS / OPENAI_KEEPALIVE_EXPIRY_SECONDS
+        connection pool of each client
+    OPENAI_MAX_CONCURRENT_REQUESTS
+        requests in flight across both clients; further calls wait for a slot
+    OPENAI_CONNECT_TIMEOUT_SECONDS and OPENAI_<TYPE>_TIMEOUT_SECONDS
+        timeouts per call type (summary, generation, stream); for streams the
+        timeout is the longest allowed gap between chunks
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+load_dotenv()
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+OPENAI_MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENAI_MAX_CONCURRENT_REQUESTS", "16"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "10"))
+
+CALL_TIMEOUTS = {
+    "summary": float(os.getenv("OPENAI_SUMMARY_TIMEOUT_SECONDS", "30")),
+    "generation": float(os.getenv("OPENAI_GENERATION_TIMEOUT_SECONDS", "300")),
+    "stream": float(os.getenv("OPENAI_STREAM_TIMEOUT_SECONDS", "60")),
+}
+
+
+def timeout_for(call_type: str) -> httpx.Timeout:
+    return httpx.Timeout(CALL_TIMEOUTS[call_type], connect=OPENAI_CONNECT_TIMEOUT_SECONDS)
+
+
+# ---------- concurrency limit ----------
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight requests across threads and the event loop, counting waits.
+
+    Waiters queue in arrival order and a released slot is handed straight to the
+    next one: a thread is woken through its Event, a coroutine through a future
+    resolved on its own loop, so async callers wait without occupying a thread.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._available = limit
+        self._waiters: deque = deque()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.acquired = 0
+        self.waited = 0
+        self.wait_total = 0.0
+
+    def _entered(self, wait_started: Optional[float]):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.acquired += 1
+            if wait_started is not None:
+                self.waited += 1
+                self.wait_total += time.monotonic() - wait_started
+
+    def _hand_off(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                try:
+                    waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+                    return
+                except RuntimeError:
+                    # The waiter's loop is closed; try the next one
+                    continue
+            self._available += 1
+
+    def _grant(self, waiter: asyncio.Future):
+        # Runs on the waiter's loop; a waiter cancelled meanwhile passes the slot on
+        if waiter.cancelled():
+            self._hand_off()
+        else:
+            waiter.set_result(None)
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._hand_off()
+
+    @contextmanager
+    def slot(self):
+        wait_started = None
+        with self._lock:
+            if self._available:
+                self._available -= 1
+                granted = None
+            else:
+                granted = threading.Event()
+                self._waiters.append(granted)
+        if granted is not None:
+            wait_started = time.monotonic()
+            granted.wait()
+        self._entered(wait_started)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def slot_async(self):
+        wait_started = None
+        with self._lock:
+            if self._available:
+                self._available -= 1
+                granted = None
+            else:
+                granted = asyncio.get_running_loop().create_future()
+                self._waiters.append(granted)
+        if granted is not None:
+            wait_started = time.monotonic()
+            try:
+                await granted
+            except asyncio.CancelledError:
+                with self._lock:
+                    queued = granted in self._waiters
+                    if queued:
+                        self._waiters.remove(granted)
+                # A slot granted just before the cancellation is passed on; one still
+                # on its way is passed on by _grant
+                if not queued and granted.done() and not granted.cancelled():
+                    self._hand_off()
+                raise
+        self._entered(wait_started)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrent_requests": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "peak_in_flight": self.peak_in_flight,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "avg_wait_seconds": round(self.wait_total / self.waited, 3) if self.waited else 0.0,
+            }
+
+
+openai_limiter = ConcurrencyLimiter(OPENAI_MAX_CONCURRENT_REQUESTS)
+
+
+# ---------- connection reuse ----------
+
+class ConnectionCounter:
+    """
+    Counts requests and newly opened TCP connections via httpcore's trace extension,
+    so connection reuse shows up as requests that did not open a connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def _connected(self, event_name: str):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+
+    def _trace(self, event_name: str, info: dict):
+        self._connected(event_name)
+
+    async def _atrace(self, event_name: str, info: dict):
+        self._connected(event_name)
+
+    def _count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def on_request(self, request: httpx.Request):
+        self._count_request()
+        request.extensions.setdefault("trace", self._trace)
+
+    async def on_request_async(self, request: httpx.Request):
+        self._count_request()
+        request.extensions.setdefault("trace", self._atrace)
+
+    def stats(self) -> dict:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+_sync_connections = ConnectionCounter()
+_async_connections = ConnectionCounter()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+# ---------- clients ----------
+
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    """Return the process-wide sync client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    timeout=timeout_for("generation"),
+                    # Retries are handled by resilience.openai_caller
+                    max_retries=0,
+                    http_client=DefaultHttpxClient(
+                        limits=_limits(),
+                        timeout=timeout_for("generation"),
+                        event_hooks={"request": [_sync_connections.on_request]},
+                    ),
+                )
+    return _client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Return the process-wide async client, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncOpenAI(
+                    timeout=timeout_for("generation"),
+                    max_retries=0,
+                    http_client=DefaultAsyncHttpxClient(
+                        limits=_limits(),
+                        timeout=timeout_for("generation"),
+                        event_hooks={"request": [_async_connections.on_request_async]},
+                    ),
+                )
+    return _async_client
+
+
+async def close_openai_clients():
+    """Close both shared clients and their connection pools."""
+    global _client, _async_client
+    with _client_lock:
+        client, async_client = _client, _async_client
+        _client = _async_client = None
+
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.close()
+
+
+def get_openai_client_stats() -> dict:
+    return {
+        "concurrency": openai_limiter.stats(),
+        "sync_connections": _sync_connections.stats(),
+        "async_connections": _async_connections.stats(),
+    }
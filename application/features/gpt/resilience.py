@@ -0,0 +1,327 @@
+"""
+Retries, backoff and a circuit breaker for OpenAI calls.
+
+Each model call gets a deadline budget for its call type. Within that budget,
+rate limits (429), server errors (5xx), timeouts and connection failures are retried
+with jittered exponential backoff. A Retry-After header, when present, is used as the
+minimum delay. Other errors (bad request, auth, quota) are raised immediately.
+
+Calls that fail upstream after exhausting their retries open a circuit breaker once
+enough of them fail in a row. Each call counts at most once, and calls that only ran
+into rate limits do not count, since a 429 means the upstream is answering and backoff
+already handles it. While the circuit is open, new calls fail fast with a 503 instead
+of queueing behind a degraded upstream; calls already retrying are not cut short.
+After a cool-down one trial call is let through and its outcome decides whether the
+circuit closes again.
+
+    OPENAI_MAX_RETRIES, OPENAI_BACKOFF_BASE_SECONDS, OPENAI_BACKOFF_MAX_SECONDS
+    OPENAI_<TYPE>_DEADLINE_SECONDS          total budget per call type, retries included
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD        consecutive failed calls that open the circuit
+    OPENAI_CIRCUIT_RESET_SECONDS            how long it stays open before a trial call
+"""
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from contextlib import nullcontext
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+import openai
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from .openai_client import CALL_TIMEOUTS, OPENAI_CONNECT_TIMEOUT_SECONDS, openai_limiter
+
+load_dotenv()
+
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+OPENAI_BACKOFF_BASE_SECONDS = float(os.getenv("OPENAI_BACKOFF_BASE_SECONDS", "1"))
+OPENAI_BACKOFF_MAX_SECONDS = float(os.getenv("OPENAI_BACKOFF_MAX_SECONDS", "30"))
+OPENAI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("OPENAI_CIRCUIT_FAILURE_THRESHOLD", "5"))
+OPENAI_CIRCUIT_RESET_SECONDS = float(os.getenv("OPENAI_CIRCUIT_RESET_SECONDS", "30"))
+
+CALL_DEADLINES = {
+    "summary": float(os.getenv("OPENAI_SUMMARY_DEADLINE_SECONDS", "60")),
+    "generation": float(os.getenv("OPENAI_GENERATION_DEADLINE_SECONDS", "600")),
+    # Covers starting the stream; once chunks flow only the per-chunk timeout applies
+    "stream": float(os.getenv("OPENAI_STREAM_DEADLINE_SECONDS", "120")),
+}
+
+T = TypeVar("T")
+
+
+class ModelUnavailableError(HTTPException):
+    """The model could not be reached within the call's budget, or the circuit is open."""
+
+    def __init__(self, detail: str, retry_after: Optional[float] = None):
+        headers = {"Retry-After": str(max(1, int(retry_after)))} if retry_after else None
+        super().__init__(status_code=503, detail=detail, headers=headers)
+        self.retry_after = retry_after
+
+
+# ---------- classification ----------
+
+def _retry_reason(error: Exception) -> Optional[str]:
+    """Return why an error is worth retrying, or None if it is not."""
+    if isinstance(error, openai.RateLimitError):
+        # An exhausted quota will not recover by waiting
+        if getattr(error, "code", None) == "insufficient_quota":
+            return None
+        return "rate_limited"
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection"
+    if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+        return "server_error"
+    return None
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        # Retry-After may also be an HTTP date
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry number (0-based)."""
+    return random.uniform(0, min(OPENAI_BACKOFF_MAX_SECONDS, OPENAI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+# ---------- circuit breaker ----------
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = OPENAI_CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Raise ModelUnavailableError if the circuit does not allow a call right now."""
+        with self._lock:
+            if self.state == CIRCUIT_OPEN:
+                remaining = self._opened_at + self.reset_seconds - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise ModelUnavailableError("Model service is temporarily unavailable", retry_after=remaining)
+                self.state = CIRCUIT_HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    raise ModelUnavailableError("Model service is recovering", retry_after=self.reset_seconds)
+                self._trial_in_flight = True
+
+    def release_trial(self):
+        """Let another call be the half-open trial when this one ended without an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == CIRCUIT_HALF_OPEN or (
+                self.state == CIRCUIT_CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = CIRCUIT_OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+                self.trips += 1
+                print(f"OpenAI circuit opened after {self.consecutive_failures} consecutive failures")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+
+# ---------- retry loop ----------
+
+class ResilientCaller:
+    def __init__(self, breaker: CircuitBreaker, max_retries: int = OPENAI_MAX_RETRIES, limiter=openai_limiter):
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.retries_by_reason: dict[str, int] = {}
+        self.failures = 0
+        self.deadline_exceeded = 0
+
+    def _count(self, attr: str, reason: Optional[str] = None):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+            if reason:
+                self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
+
+    @staticmethod
+    def _attempt_timeout(call_type: str, remaining: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            min(CALL_TIMEOUTS[call_type], remaining),
+            connect=min(OPENAI_CONNECT_TIMEOUT_SECONDS, remaining),
+        )
+
+    def _before_call(self):
+        try:
+            self.breaker.before_call()
+        except ModelUnavailableError:
+            self._count("failures")
+            raise
+
+    def _give_up(self, reason: Optional[str]):
+        """Record a call that ended on a retryable error: one breaker failure unless it was only throttled."""
+        self._count("failures")
+        if reason == "rate_limited":
+            self.breaker.release_trial()
+        else:
+            self.breaker.record_failure()
+
+    def _next_delay(self, error: Exception, attempt: int, deadline: float) -> float:
+        """Delay before the next attempt, or raise if the error or budget rules out a retry."""
+        reason = _retry_reason(error)
+        if reason is None:
+            # The upstream answered; a client-side error says nothing about its health
+            self.breaker.record_success()
+            self._count("failures")
+            raise error
+
+        retry_after = _retry_after_seconds(error)
+        if attempt >= self.max_retries:
+            self._give_up(reason)
+            raise ModelUnavailableError(
+                f"Model call failed after {attempt + 1} attempts: {error}", retry_after=retry_after
+            ) from error
+
+        delay = max(_backoff_seconds(attempt), retry_after or 0.0)
+        if time.monotonic() + delay >= deadline:
+            self._count("deadline_exceeded")
+            self._give_up(reason)
+            raise ModelUnavailableError(
+                f"Model call ran out of time after {attempt + 1} attempts: {error}", retry_after=retry_after
+            ) from error
+
+        self._count("retries", reason)
+        print(f"Retrying model call in {delay:.1f}s ({reason}, attempt {attempt + 1})")
+        return delay
+
+    def _remaining(self, deadline: float, attempt: int, reason: Optional[str]) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._count("deadline_exceeded")
+            self._give_up(reason)
+            raise ModelUnavailableError(f"Model call ran out of time after {attempt} attempts")
+        return remaining
+
+    def call(self, func: Callable[[httpx.Timeout], T], call_type: str = "generation", limit: bool = True) -> T:
+        """Run func(timeout) with retries; the timeout never exceeds the remaining budget."""
+        self._count("calls")
+        deadline = time.monotonic() + CALL_DEADLINES[call_type]
+        # Only a new call is gated by the circuit; its retries run to completion
+        self._before_call()
+        attempt = 0
+        last_reason = None
+        while True:
+            remaining = self._remaining(deadline, attempt, last_reason)
+            try:
+                with self.limiter.slot() if limit else nullcontext():
+                    result = func(self._attempt_timeout(call_type, remaining))
+            except Exception as e:
+                time.sleep(self._next_delay(e, attempt, deadline))
+                last_reason = _retry_reason(e)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, func: Callable[[httpx.Timeout], Awaitable[T]], call_type: str = "generation",
+                    limit: bool = True) -> T:
+        """Async counterpart of call()."""
+        self._count("calls")
+        deadline = time.monotonic() + CALL_DEADLINES[call_type]
+        self._before_call()
+        attempt = 0
+        last_reason = None
+        try:
+            while True:
+                remaining = self._remaining(deadline, attempt, last_reason)
+                try:
+                    if limit:
+                        async with self.limiter.slot_async():
+                            result = await func(self._attempt_timeout(call_type, remaining))
+                    else:
+                        result = await func(self._attempt_timeout(call_type, remaining))
+                except Exception as e:
+                    await asyncio.sleep(self._next_delay(e, attempt, deadline))
+                    last_reason = _retry_reason(e)
+                    attempt += 1
+                    continue
+                self.breaker.record_success()
+                return result
+        except asyncio.CancelledError:
+            # The caller gave up, possibly mid-backoff; that says nothing about the upstream's health
+            self.breaker.release_trial()
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "calls": self.calls,
+                "retries": self.retries,
+                "retries_by_reason": dict(self.retries_by_reason),
+                "failures": self.failures,
+                "deadline_exceeded": self.deadline_exceeded,
+            }
+        stats["circuit"] = self.breaker.stats()
+        return stats
+
+
+openai_caller = ResilientCaller(CircuitBreaker())
+
+
+def get_resilience_stats() -> dict:
+    return openai_caller.stats()
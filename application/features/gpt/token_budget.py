@@ -0,0 +1,152 @@
+"""
+Token counting and prompt budgets.
+
+Encoders are loaded once per encoding and shared; counts of large static texts
+(template instructions, system prompts) are memoised, so per-call counting only
+touches the variable fields.
+
+Per-model context windows and output caps come from MODEL_TOKEN_LIMITS, a JSON
+object keyed by model name prefix, for example
+    {"gpt-4o": {"context": 128000, "max_output": 16384}}
+Entries there override the defaults below; the longest matching prefix wins.
+"""
+import functools
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import tiktoken
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MODEL_LIMITS: Dict[str, dict] = {
+    "gpt-3.5": {"context": 16385, "max_output": 4096},
+    "gpt-4o": {"context": 128000, "max_output": 16384},
+    "gpt-4.1": {"context": 1047576, "max_output": 32768},
+    "gpt-5": {"context": 400000, "max_output": 128000},
+}
+FALLBACK_LIMITS = {"context": 128000, "max_output": 16384}
+
+# Output tokens we will go down to before giving up on a request
+MIN_OUTPUT_TOKENS = int(os.getenv("MIN_OUTPUT_TOKENS", "1000"))
+TRUNCATION_NOTICE = "\n\n[... content shortened to fit the model's context window ...]\n\n"
+# Slack for token boundaries shifting where fields join the template text
+PROMPT_TOKEN_MARGIN = 64
+
+
+def _load_model_limits() -> Dict[str, dict]:
+    limits = dict(DEFAULT_MODEL_LIMITS)
+    raw = os.getenv("MODEL_TOKEN_LIMITS")
+    if raw:
+        try:
+            limits.update(json.loads(raw))
+        except json.JSONDecodeError as e:
+            print(f"Ignoring invalid MODEL_TOKEN_LIMITS: {e}")
+    return limits
+
+
+MODEL_LIMITS = _load_model_limits()
+
+
+def model_limits(model: str) -> dict:
+    """Context window and output cap for a model, by longest matching name prefix."""
+    matches = [prefix for prefix in MODEL_LIMITS if (model or "").startswith(prefix)]
+    if not matches:
+        return FALLBACK_LIMITS
+    return {**FALLBACK_LIMITS, **MODEL_LIMITS[max(matches, key=len)]}
+
+
+# ---------- encoders ----------
+
+@functools.lru_cache(maxsize=None)
+def _encoding_name(model: str) -> str:
+    try:
+        return tiktoken.encoding_for_model(model).name
+    except KeyError:
+        # Newer model families share the 4o tokenizer
+        if model.startswith(("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")):
+            return "o200k_base"
+        return "cl100k_base"
+
+
+@functools.lru_cache(maxsize=None)
+def _load_encoding(name: str):
+    return tiktoken.get_encoding(name)
+
+
+def get_encoder(model: str):
+    return _load_encoding(_encoding_name(model or ""))
+
+
+def count_tokens(text: str, model: str) -> int:
+    return len(get_encoder(model).encode(text, disallowed_special=()))
+
+
+@functools.lru_cache(maxsize=256)
+def count_static_tokens(text: str, model: str) -> int:
+    """count_tokens for texts that repeat verbatim across calls (templates, system prompts)."""
+    return count_tokens(text, model)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Keep the start and end of text within max_tokens, marking the cut."""
+    encoder = get_encoder(model)
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+
+    notice_tokens = count_static_tokens(TRUNCATION_NOTICE, model)
+    keep = max(max_tokens - notice_tokens, 0)
+    # Instructions and rubrics tend to sit at the end of an assignment, so keep some of it
+    head = keep * 3 // 4
+    tail = keep - head
+    return (
+        encoder.decode(tokens[:head])
+        + TRUNCATION_NOTICE
+        + (encoder.decode(tokens[-tail:]) if tail else "")
+    )
+
+
+# ---------- budgets ----------
+
+def output_tokens_for(prompt_tokens: int, model: str, requested: Optional[int]) -> int:
+    """
+    Output tokens to request for a prompt of prompt_tokens: the requested amount,
+    capped by the model's output limit and whatever room the context window has left.
+    Raises ValueError only when less than MIN_OUTPUT_TOKENS would remain.
+    """
+    limits = model_limits(model)
+    wanted = min(requested or limits["max_output"], limits["max_output"])
+    available = limits["context"] - prompt_tokens
+    if available < min(wanted, MIN_OUTPUT_TOKENS):
+        raise ValueError(
+            f"Prompt ({prompt_tokens} tokens) is too large for {model}'s {limits['context']}-token limit."
+        )
+    return min(wanted, available)
+
+
+def fit_values(static_tokens: int, values: Dict[str, object], model: str, max_output_tokens: int,
+               shrinkable: Optional[str]) -> Tuple[Dict[str, object], int]:
+    """
+    Return values with the `shrinkable` field shortened so that static_tokens, all
+    variable fields and max_output_tokens fit in the model's context window, and the
+    prompt's token count with those values, so callers need not encode it again.
+    Fields are counted individually, so the static text is never re-encoded.
+    """
+    limits = model_limits(model)
+    budget = limits["context"] - min(max_output_tokens, limits["max_output"]) - static_tokens - PROMPT_TOKEN_MARGIN
+
+    other_tokens = sum(
+        count_tokens(str(value), model) for field, value in values.items() if field != shrinkable
+    )
+    content = str(values.get(shrinkable, "")) if shrinkable else ""
+    content_tokens = count_tokens(content, model)
+    room = budget - other_tokens
+    if not shrinkable or content_tokens <= room:
+        return values, static_tokens + other_tokens + content_tokens
+
+    print(f"Shortening {shrinkable} from {content_tokens} to {max(room, 0)} tokens for {model}")
+    # truncate_to_tokens keeps the shortened field within room, so it is not counted again
+    fitted = {**values, shrinkable: truncate_to_tokens(content, max(room, 0), model)}
+    return fitted, static_tokens + other_tokens + max(room, 0)
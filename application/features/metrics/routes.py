@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+
+from application.database.async_db import get_db_executor_stats
+from application.database.mssql_connection import get_sql_pool_stats
+from application.features.assignment_version_generation.content_condenser import get_condense_stats
+from application.features.assignment_version_generation.helpers import get_suggestion_cache
+from application.features.auth.permissions import require_admin_access
+from application.features.gpt.crud import get_summary_cache, get_text_to_html_stats
+from application.features.gpt.gpt_connection import get_prompt_cache_stats
+from application.features.gpt.openai_client import get_openai_client_stats
+from application.features.gpt.resilience import get_resilience_stats
+from application.services.docx_cache import get_docx_cache_stats
+from application.services.docx_render_pool import get_docx_render_stats
+from application.services.job_queue import get_job_queue_stats
+
+router = APIRouter()
+
+
+@router.get("/")
+def get_runtime_metrics(user_data: dict = Depends(require_admin_access)):
+    """Runtime counters for connection pools and background services."""
+    return {
+        "sql_pool": get_sql_pool_stats(),
+        "db_executor": get_db_executor_stats(),
+        "generation_jobs": get_job_queue_stats(),
+        "summary_cache": get_summary_cache().stats(),
+        "suggestion_cache": get_suggestion_cache().stats(),
+        "assignment_condense": get_condense_stats(),
+        "prompt_cache": get_prompt_cache_stats(),
+        "text_to_html": get_text_to_html_stats(),
+        "docx_render": get_docx_render_stats(),
+        "docx_cache": get_docx_cache_stats(),
+        "openai": get_openai_client_stats(),
+        "openai_resilience": get_resilience_stats(),
+    }
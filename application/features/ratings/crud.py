@@ -1,50 +1,36 @@
 
 import datetime
-import os
-from dotenv import load_dotenv
 import pyodbc
 from typing import List
 from fastapi import HTTPException
 from application.database.mssql_connection import get_sql_db_connection
-from application.database.nosql_connection import get_cosmos_db_connection
+from application.database.nosql_connection import PROFILE_CONTAINER_NAME, get_container
+from application.features.versionHistory.version_summaries import refresh_assignment_version_summary
+from application.features.versionHistory.version_repository import get_version_document, replace_version_document
 from application.features.ratings.schemas import AssignmentRatingData, RatingUpdateRequest, ExistingRatingDataResponse
 from application.features.versionHistory.schemas import AssignmentVersionResponse
 from application.features.assignment_version_generation.schemas import LearningPathwayOption
 from application.features.student_profile.schemas import StudentProfileResponse, StudentClass, ProfileSummaries
 
-# Database configuration
-load_dotenv()
-DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
-
-PROFILE_CONTAINER_NAME = "ai-student-profile"
-VERSIONS_CONTAINER_NAME = "ai-assignment-versions-v2"
-
-_cosmos = get_cosmos_db_connection()
-_db = _cosmos.get_database_client(DATABASE_NAME)
-versions_container = _db.get_container_client(VERSIONS_CONTAINER_NAME)
-profile_container = _db.get_container_client(PROFILE_CONTAINER_NAME)
-
 
 def get_rating_data_by_assignment_version_id(assignment_version_id: str) -> AssignmentRatingData:
     """
     Comprehensive data gathering for assignment rating endpoint.
     Fetches all necessary data from both Cosmos DB and SQL Server.
     """
+    profile_container = get_container(PROFILE_CONTAINER_NAME)
     try:
         # 1. Get assignment version document from Cosmos DB
         try:
-            version_doc = list(versions_container.query_items(
-                query="SELECT * FROM c WHERE c.id = @id",
-                parameters=[{"name": "@id", "value": assignment_version_id}],
-                enable_cross_partition_query=True
-            ))
+            version_doc = get_version_document(assignment_version_id)
             if not version_doc:
                 raise HTTPException(status_code=404, detail="Assignment version not found")
             
-            version_doc = version_doc[0]
             assignment_id = version_doc["assignment_id"]
             student_id = version_doc["student_id"]
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch assignment version: {str(e)}")
 
@@ -258,17 +244,11 @@ def upsert_rating_fields(assignment_version_id: str, rating_data: RatingUpdateRe
     """
     try:
         # 1. Find the assignment version document
-        version_docs = list(versions_container.query_items(
-            query="SELECT * FROM c WHERE c.id = @id",
-            parameters=[{"name": "@id", "value": assignment_version_id}],
-            enable_cross_partition_query=True
-        ))
+        existing_doc = get_version_document(assignment_version_id)
 
-        if not version_docs:
+        if not existing_doc:
             raise HTTPException(status_code=404, detail="Assignment version not found")
 
-        existing_doc = version_docs[0]
-
         # 2. Convert rating data to dictionary, excluding unset values
         rating_dict = rating_data.dict(exclude_unset=True)
 
@@ -305,7 +285,8 @@ def upsert_rating_fields(assignment_version_id: str, rating_data: RatingUpdateRe
         existing_doc["rating_data"]["last_rating_update"] = rating_dict.get("date_modified", datetime.datetime.utcnow().isoformat())
 
         # 6. Save back to Cosmos DB
-        versions_container.replace_item(item=existing_doc["id"], body=existing_doc)
+        replace_version_document(existing_doc)
+        refresh_assignment_version_summary(existing_doc["assignment_id"])
 
         return {
             "success": True,
@@ -328,17 +309,11 @@ def get_existing_rating_data(assignment_version_id: str) -> ExistingRatingDataRe
     """
     try:
         # Find the assignment version document
-        version_docs = list(versions_container.query_items(
-            query="SELECT * FROM c WHERE c.id = @id",
-            parameters=[{"name": "@id", "value": assignment_version_id}],
-            enable_cross_partition_query=True
-        ))
+        existing_doc = get_version_document(assignment_version_id)
 
-        if not version_docs:
+        if not existing_doc:
             raise HTTPException(status_code=404, detail="Assignment version not found")
 
-        existing_doc = version_docs[0]
-
         # Check if rating data exists
         rating_data = existing_doc.get("rating_data")
         if not rating_data:
@@ -366,17 +341,11 @@ def get_rating_history(assignment_version_id: str):
     """
     try:
         # Find the assignment version document
-        version_docs = list(versions_container.query_items(
-            query="SELECT * FROM c WHERE c.id = @id",
-            parameters=[{"name": "@id", "value": assignment_version_id}],
-            enable_cross_partition_query=True
-        ))
+        existing_doc = get_version_document(assignment_version_id)
 
-        if not version_docs:
+        if not existing_doc:
             raise HTTPException(status_code=404, detail="Assignment version not found")
 
-        existing_doc = version_docs[0]
-
         # Get current rating data
         current_rating_data = existing_doc.get("rating_data")
 
@@ -463,6 +432,7 @@ def update_rating_fields(
 
     try:
         container.replace_item(item=doc_id, body=existing)
+        refresh_assignment_version_summary(existing["assignment_id"])
         existing["modifier_id"] = int(existing["modifier_id"])
         return AssignmentVersionResponse(**existing)
     except Exception as e:
@@ -3,7 +3,8 @@ from fastapi import Depends, APIRouter, HTTPException, status
 
 from application.features.auth.permissions import _expand_roles, require_admin_access, require_user_access
 
-from application.database.mssql_crud_helpers import create_record, update_record, delete_record, fetch_by_id
+from application.database.async_db import run_db
+from application.database.mssql_crud_helpers import create_record_async, update_record_async, delete_record_async, fetch_by_id_async
 from application.features.roles.crud import fetch_roles_by_names
 from application.features.roles.schemas import RoleCreate, RoleResponse, RoleUpdate
 
@@ -28,7 +29,7 @@ async def get_roles(user_data: dict = Depends(require_user_access)):
         )
 
     allowed_roles = _expand_roles(set(role_names))
-    return fetch_roles_by_names(allowed_roles)
+    return await run_db(fetch_roles_by_names, allowed_roles)
 
 
 @router.get("/{role_id}", response_model=RoleResponse)
@@ -36,7 +37,7 @@ async def get_role_by_id(role_id: int, user_data: dict = Depends(require_admin_a
     """
     Retrieves a specific role by its ID.
     """
-    role = fetch_by_id("Roles", role_id)
+    role = await fetch_by_id_async("Roles", role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     return role
@@ -54,7 +55,7 @@ async def create_role(role_data: RoleCreate, user_data: dict = Depends(require_a
         "description": role_data.description
     }
 
-    created_role = create_record("Roles", new_role)
+    created_role = await create_record_async("Roles", new_role)
 
     if not created_role:
         raise HTTPException(status_code=400, detail="Role creation failed")
@@ -76,7 +77,7 @@ async def update_role(
     if not fields_to_update:
         raise HTTPException(status_code=400, detail="No data provided for update")
 
-    role = update_record("Roles", role_id, fields_to_update)
+    role = await update_record_async("Roles", role_id, fields_to_update)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     return role
@@ -87,7 +88,7 @@ async def delete_role(role_id: int, user_data: dict = Depends(require_admin_acce
     """
     Deletes a role by its ID.
     """
-    result = delete_record("Roles", role_id)
+    result = await delete_record_async("Roles", role_id)
     if not result:
         raise HTTPException(status_code=404, detail="Role not found")
     return {"detail": "Role deleted successfully"}
\ No newline at end of file
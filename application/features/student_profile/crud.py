@@ -1,5 +1,3 @@
-import os
-from dotenv import load_dotenv
 from fastapi import HTTPException
 from typing import Optional
 import uuid
@@ -8,19 +6,11 @@ import io
 import json
 from application.database.mssql_connection import get_sql_db_connection
 from application.features.student_profile.schemas import StudentProfileCreate, StudentProfileUpdate
-from application.database.nosql_connection import get_cosmos_db_connection
-from application.features.gpt.crud import summarize_best_ways_to_learn, summarize_long_term_goals, summarize_short_term_goals, summarize_strengths, generate_vision_statement
+from application.database.nosql_connection import PROFILE_CONTAINER_NAME, get_container
+from application.features.gpt.crud import generate_profile_summaries
 
 import pyodbc
 
-load_dotenv()
-DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
-
-CONTAINER_NAME = "ai-student-profile"
-
-client = get_cosmos_db_connection()
-db = client.get_database_client(DATABASE_NAME)
-container = db.get_container_client(CONTAINER_NAME)
 
 def create_or_update_profile(data: StudentProfileCreate) -> dict:
     """
@@ -30,6 +20,7 @@ def create_or_update_profile(data: StudentProfileCreate) -> dict:
     4. Up‑sert Cosmos doc with GPT‑generated summaries & vision
     Returns combined SQL + Cosmos payload (can become your response model).
     """
+    container = get_container(PROFILE_CONTAINER_NAME)
 
     # ----------  SQL section (transaction) ----------
    
@@ -138,11 +129,14 @@ def create_or_update_profile(data: StudentProfileCreate) -> dict:
 
     existing_doc = docs[0] if docs else None
 
-    # ----- GPT summaries -----
-    strength_short = summarize_strengths(data.strengths)
-    goals_short_term = summarize_short_term_goals(data.short_term_goals)
-    goals_long_term = summarize_long_term_goals(data.long_term_goals)
-    best_help_short = summarize_best_ways_to_learn(data.best_ways_to_help)
+    # ----- GPT summaries (run concurrently) -----
+    summaries = generate_profile_summaries(
+        strengths=data.strengths,
+        short_term_goals=data.short_term_goals,
+        long_term_goals=data.long_term_goals,
+        best_ways_to_help=data.best_ways_to_help,
+        vision_source=str(data),
+    )
 
     doc_body = {
         "id": existing_doc["id"] if existing_doc else str(uuid.uuid4()),
@@ -154,12 +148,12 @@ def create_or_update_profile(data: StudentProfileCreate) -> dict:
         "long_term_goals": data.long_term_goals,
         "best_ways_to_help": data.best_ways_to_help,
         "summaries": {
-            "strength_short": strength_short,
-            "short_term_goals": goals_short_term,
-            "long_term_goals": goals_long_term, 
-            "best_ways_to_help": best_help_short,
+            "strength_short": summaries["strength_short"],
+            "short_term_goals": summaries["short_term_goals"],
+            "long_term_goals": summaries["long_term_goals"], 
+            "best_ways_to_help": summaries["best_ways_to_help"],
         },
-        "vision": generate_vision_statement(str(data)),
+        "vision": summaries["vision"],
     }
 
 
@@ -175,32 +169,126 @@ def create_or_update_profile(data: StudentProfileCreate) -> dict:
         "cosmos_doc_id": doc_body["id"],
     }
 
+STUDENT_DETAILS_COLUMNS = """
+    y.name, u.id, u.first_name, u.last_name, u.email, u.gt_email, u.profile_picture_url,
+    s.ppt_embed_url, s.ppt_edit_url, s.group_type
+"""
+
+
+def _build_complete_profile(student_id: int, doc: dict, details_row, classes: list) -> dict:
+    """Map a Cosmos profile doc plus the SQL student row and classes to the front‑end shape."""
+    (
+        year_name, user_id, first_name, last_name, gmail, gt_email,
+        profile_picture_url, ppt_embed_url, ppt_edit_url, group_type
+    ) = details_row if details_row else (None,) * 10
+
+    summaries = doc.get("summaries", {})
+    return {
+        "student_id": student_id,
+        "user_id": user_id,
+        "first_name": first_name,
+        "last_name": last_name,
+        "email":gmail,
+        "gt_email": gt_email,
+        "profile_picture_url": profile_picture_url,
+        "year_name": year_name,
+        "ppt_embed_url": ppt_embed_url,
+        "ppt_edit_url": ppt_edit_url,
+        "group_type": group_type,
+        "classes": classes,
+        "strengths": doc.get("strengths"),
+        "challenges": doc.get("challenges"),
+        "long_term_goals": doc.get("long_term_goals"),
+        "short_term_goals": doc.get("short_term_goals"),
+        "best_ways_to_help": doc.get("best_ways_to_help"),
+        "hobbies_and_interests": doc.get("hobbies_and_interests"),
+        "profile_summaries": {
+            "strengths_short": summaries.get("strength_short"),
+            "short_term_goals": summaries.get("short_term_goals"),
+            "long_term_goals": summaries.get("long_term_goals"),
+            "best_ways_to_help": summaries.get("best_ways_to_help"),
+            "vision": doc.get("vision"),
+        },
+    }
+
+
+def _class_entry(cid, cname, ccode, goal) -> dict:
+    return {
+        "class_id": cid,
+        "class_name": cname,
+        "course_code": ccode,
+        "learning_goal": goal,
+    }
+
+
 def get_all_complete_profiles() -> list:
     """
-    Get all student profiles by fetching all student IDs and calling get_complete_profile for each.
-    Returns a list of complete profile dictionaries.
+    Get the complete profile of every active student in a fixed number of round trips:
+    one SQL query for student/year/user details, one for class enrollments and one
+    Cosmos query for all profile documents, joined in memory.
+    Students without a profile document are skipped.
     """
     try:
         with get_sql_db_connection() as conn:
             cursor = conn.cursor()
 
-            # Get all student IDs that have active status
-            cursor.execute("SELECT id FROM dbo.Students WHERE active_status = 1")
-            student_ids = [row[0] for row in cursor.fetchall()]
+            # Student, year and user details for all active students
+            cursor.execute(
+                f"""
+                SELECT s.id, y.id, {STUDENT_DETAILS_COLUMNS}
+                FROM dbo.Students s
+                LEFT JOIN dbo.Years y ON s.year_id = y.id
+                LEFT JOIN dbo.Users u ON s.user_id = u.id
+                WHERE s.active_status = 1
+                """
+            )
+            details_by_student = {}
+            for row in cursor.fetchall():
+                # Same result as the per-student INNER JOIN: no details unless both year and user exist
+                student_id, year_id, user_id = row[0], row[1], row[3]
+                has_details = year_id is not None and user_id is not None
+                details_by_student[student_id] = tuple(row[2:]) if has_details else None
+
+            # Classes of all active students
+            cursor.execute(
+                """
+                SELECT sc.student_id, sc.class_id, c.name, c.course_code, sc.learning_goal
+                FROM dbo.StudentClasses sc
+                INNER JOIN dbo.Classes c ON sc.class_id = c.id
+                INNER JOIN dbo.Students s ON sc.student_id = s.id
+                WHERE s.active_status = 1
+                """
+            )
+            classes_by_student = {}
+            for student_id, cid, cname, ccode, goal in cursor.fetchall():
+                classes_by_student.setdefault(student_id, []).append(_class_entry(cid, cname, ccode, goal))
 
     except pyodbc.Error as e:
         return [{"error": f"Database error: {str(e)}"}]
     except Exception as e:
         return [{"error": f"Unexpected error: {str(e)}"}]
 
-    # Get complete profile for each student
-    profiles = []
-    for student_id in student_ids:
-        profile = get_complete_profile(student_id)
-        if profile and "error" not in profile:
-            profiles.append(profile)
-
-    return profiles
+    # All profile documents in one query; keep the first doc per active student
+    container = get_container(PROFILE_CONTAINER_NAME)
+    docs_by_student = {}
+    for doc in container.query_items(
+        "SELECT * FROM c WHERE IS_DEFINED(c.student_id)",
+        enable_cross_partition_query=True,
+    ):
+        student_id = doc.get("student_id")
+        if student_id in details_by_student and student_id not in docs_by_student:
+            docs_by_student[student_id] = doc
+
+    return [
+        _build_complete_profile(
+            student_id,
+            docs_by_student[student_id],
+            details,
+            classes_by_student.get(student_id, []),
+        )
+        for student_id, details in details_by_student.items()
+        if student_id in docs_by_student
+    ]
     
 
 def get_complete_profile(student_id: int) -> Optional[dict]:
@@ -209,6 +297,7 @@ def get_complete_profile(student_id: int) -> Optional[dict]:
     • Join SQL for year‑name & class list
     • Map keys to front‑end names
     """
+    container = get_container(PROFILE_CONTAINER_NAME)
     # ---------- Cosmos ----------
     query = "SELECT * FROM c WHERE c.student_id = @sid"
     cosmos_doc = list(
@@ -229,8 +318,8 @@ def get_complete_profile(student_id: int) -> Optional[dict]:
             cursor = conn.cursor()
             # Year name and user name
             cursor.execute(
-                """
-                SELECT y.name, u.id, u.first_name, u.last_name, u.email, u.gt_email, u.profile_picture_url, s.ppt_embed_url, s.ppt_edit_url, s.group_type
+                f"""
+                SELECT {STUDENT_DETAILS_COLUMNS}
                 FROM dbo.Students s
                 INNER JOIN dbo.Years y ON s.year_id = y.id
                 INNER JOIN dbo.Users u ON s.user_id = u.id
@@ -239,16 +328,6 @@ def get_complete_profile(student_id: int) -> Optional[dict]:
                 (student_id,),
             )
             row = cursor.fetchone()
-            year_name = row[0] if row else None
-            user_id = row[1] if row else None
-            first_name = row[2] if row else None
-            last_name = row[3] if row else None
-            gmail = row[4] if row else None
-            gt_email = row[5] if row else None
-            profile_picture_url = row[6] if row else None
-            ppt_embed_url = row[7] if row else None
-            ppt_edit_url = row[8] if row else None
-            group_type = row[9] if row else None
 
             # Classes
             cursor.execute(
@@ -260,15 +339,7 @@ def get_complete_profile(student_id: int) -> Optional[dict]:
                 """,
                 (student_id,),
             )
-            classes = [
-                {
-                    "class_id": cid,
-                    "class_name": cname,
-                    "course_code": ccode,
-                    "learning_goal": goal,
-                }
-                for cid, cname, ccode, goal in cursor.fetchall()
-            ]
+            classes = [_class_entry(cid, cname, ccode, goal) for cid, cname, ccode, goal in cursor.fetchall()]
     except pyodbc.Error as e:
         # Handle DB-related errors gracefully
         return {"error": f"Database error: {str(e)}"}
@@ -278,46 +349,30 @@ def get_complete_profile(student_id: int) -> Optional[dict]:
 
 
     # ---------- Map to front‑end shape ----------
-    summaries = doc.get("summaries", {})
-    return {
-        "student_id": student_id,
-        "user_id": user_id,
-        "first_name": first_name,
-        "last_name": last_name,
-        "email":gmail,
-        "gt_email": gt_email,
-        "profile_picture_url": profile_picture_url,
-        "year_name": year_name,
-        "ppt_embed_url": ppt_embed_url,
-        "ppt_edit_url": ppt_edit_url,
-        "group_type": group_type,
-        "classes": classes,
-        "strengths": doc.get("strengths"),
-        "challenges": doc.get("challenges"),
-        "long_term_goals": doc.get("long_term_goals"),
-        "short_term_goals": doc.get("short_term_goals"),
-        "best_ways_to_help": doc.get("best_ways_to_help"),
-        "hobbies_and_interests": doc.get("hobbies_and_interests"),
-        "profile_summaries": {
-            "strengths_short": summaries.get("strength_short"),
-            "short_term_goals": summaries.get("short_term_goals"),
-            "long_term_goals": summaries.get("long_term_goals"),
-            "best_ways_to_help": summaries.get("best_ways_to_help"),
-            "vision": doc.get("vision"),
-        },
-    }
+    return _build_complete_profile(student_id, doc, tuple(row) if row else None, classes)
 
 
 
 def get_profile(student_id: int):
+    container = get_container(PROFILE_CONTAINER_NAME)
     query = "SELECT * FROM c WHERE c.student_id = @student_id"
     params = [{"name": "@student_id", "value": student_id}]
     items = list(container.query_items(query=query, parameters=params, enable_cross_partition_query=True))
     return items[0] if items else None
 
 
+def _vision_source(doc: dict) -> str:
+    """
+    Profile fields the vision statement is written from. Cosmos system fields (_ts, _etag, ...)
+    and previously generated text are left out, so an unchanged profile produces the same
+    input and the cached vision is reused.
+    """
+    return str({k: v for k, v in doc.items() if not k.startswith("_") and k not in ("summaries", "vision")})
+
+
 def update_student_profile(user_id: int, update_data: StudentProfileUpdate) -> dict:
    
+    container = get_container(PROFILE_CONTAINER_NAME)
     try:
         with get_sql_db_connection() as conn:
             cursor = conn.cursor()
@@ -379,7 +434,6 @@ def update_student_profile(user_id: int, update_data: StudentProfileUpdate) -> d
     # Only update provided fields
     if update_data.strengths is not None:
         doc["strengths"] = update_data.strengths
-        doc["summaries"]["strength_short"] = summarize_strengths(update_data.strengths)
 
     if update_data.challenges is not None:
         doc["challenges"] = update_data.challenges
@@ -389,17 +443,23 @@ def update_student_profile(user_id: int, update_data: StudentProfileUpdate) -> d
 
     if update_data.short_term_goals is not None:
         doc["short_term_goals"] = update_data.short_term_goals
-        doc["summaries"]["short_term_goals"] = summarize_short_term_goals(update_data.short_term_goals)
 
     if update_data.long_term_goals is not None:
         doc["long_term_goals"] = update_data.long_term_goals
-        doc["summaries"]["long_term_goals"] = summarize_long_term_goals(update_data.long_term_goals)
 
     if update_data.best_ways_to_help is not None:
         doc["best_ways_to_help"] = update_data.best_ways_to_help
-        doc["summaries"]["best_ways_to_help"] = summarize_best_ways_to_learn(update_data.best_ways_to_help)
 
-    doc["vision"] = generate_vision_statement(str(doc))  # update vision based on updated fields
+    # Re-summarize changed fields and the vision (from the updated fields) concurrently
+    summaries = generate_profile_summaries(
+        strengths=update_data.strengths,
+        short_term_goals=update_data.short_term_goals,
+        long_term_goals=update_data.long_term_goals,
+        best_ways_to_help=update_data.best_ways_to_help,
+        vision_source=_vision_source(doc),
+    )
+    doc["vision"] = summaries.pop("vision")
+    doc.setdefault("summaries", {}).update(summaries)
 
     container.replace_item(item=doc, body=doc)
 
@@ -415,6 +475,7 @@ def get_prefill_profile(user_id: int) -> Optional[dict]:
     Return basic user info, optional student_id, and Cosmos fields if any.
     Used for pre-filling the profile creation form.
     """
+    container = get_container(PROFILE_CONTAINER_NAME)
     try:
         with get_sql_db_connection() as conn:
             cursor = conn.cursor()
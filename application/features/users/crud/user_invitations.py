@@ -130,36 +130,51 @@ def complete_user_invite(token: str, first_name: str, last_name: str, password_h
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
-def regenerate_invite_url(user_id: int) -> Optional[str]:
+def _build_invite_url(raw_token: str) -> Optional[str]:
+    frontend_base_url = os.getenv('FRONTEND_BASE_URL')
+    if not frontend_base_url:
+        print("Warning: FRONTEND_BASE_URL not set")
+        return None
+    return f"{frontend_base_url}/complete-invite?token={raw_token}"
+
+
+def regenerate_invite_urls(user_ids: List[int]) -> Dict[int, Optional[str]]:
     """
-    Gets existing valid invite token or regenerates if expired/missing.
-    Returns the complete invite URL (not just the token).
+    Issues a new invite token for each user and returns {user_id: invite URL}.
+    Tokens are stored hashed, so existing invites cannot be turned back into URLs;
+    every call inserts one AccountInvites row per user, in a single batch.
     """
+    if not user_ids:
+        return {}
+
     try:
         with get_sql_db_connection() as conn:
             cursor = conn.cursor()
-            
-            # Generate new token
-            raw_token = token_urlsafe(32)
-            token_hash = hashlib.sha256(raw_token.encode()).hexdigest()
             expires = datetime.datetime.utcnow() + datetime.timedelta(days=3)
-            
-            cursor.execute("""
+
+            raw_tokens = {user_id: token_urlsafe(32) for user_id in user_ids}
+            cursor.fast_executemany = True
+            cursor.executemany("""
                 INSERT INTO AccountInvites (user_id, token_hash, expires_at)
                 VALUES (?, ?, ?)
-            """, (user_id, token_hash, expires))
-            
+            """, [
+                (user_id, hashlib.sha256(raw_token.encode()).hexdigest(), expires)
+                for user_id, raw_token in raw_tokens.items()
+            ])
+
             conn.commit()
-            
-            # Build the complete invite URL
-            frontend_base_url = os.getenv('FRONTEND_BASE_URL')
-            if not frontend_base_url:
-                print("Warning: FRONTEND_BASE_URL not set")
-                return None
-            
-            invite_url = f"{frontend_base_url}/complete-invite?token={raw_token}"
-            return invite_url
-            
+
+            # Build the complete invite URLs
+            return {user_id: _build_invite_url(raw_token) for user_id, raw_token in raw_tokens.items()}
+
     except Exception as e:
-        print(f"Error managing invite URL: {e}")
-        return None
\ No newline at end of file
+        print(f"Error managing invite URLs: {e}")
+        return {}
+
+
+def regenerate_invite_url(user_id: int) -> Optional[str]:
+    """
+    Generates a new invite token for the user.
+    Returns the complete invite URL (not just the token).
+    """
+    return regenerate_invite_urls([user_id]).get(user_id)
@@ -1,62 +1,90 @@
-import os
 from typing import List, Dict, Optional
 
-from dotenv import load_dotenv
 from application.database.mssql_connection import get_sql_db_connection
 import pyodbc
 from fastapi import HTTPException
 
-from application.database.nosql_connection import get_cosmos_db_connection
+from application.database.nosql_connection import PROFILE_CONTAINER_NAME, get_container
 
-load_dotenv()
-DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
 
+def _user_scope_filter(role_id: Optional[int], tutor_user_id: Optional[int]):
+    """
+    Returns (sql, params) for a subquery selecting the ids of the users in scope,
+    or (None, ()) when every user is listed.
+    """
+    if tutor_user_id is not None:
+        # Only students assigned to the tutor
+        sql = """
+            SELECT s.user_id
+            FROM Students s
+            JOIN TutorStudents ts ON ts.student_id = s.id
+            WHERE ts.user_id = ?
+        """
+        params = (tutor_user_id,)
+        if role_id is not None:
+            sql += " AND EXISTS (SELECT 1 FROM UserRoles ur WHERE ur.user_id = s.user_id AND ur.role_id = ?)"
+            params += (role_id,)
+        return sql, params
+
+    if role_id is not None:
+        return "SELECT ur.user_id FROM UserRoles ur WHERE ur.role_id = ?", (role_id,)
+
+    return None, ()
+
+
+def is_user_in_tutor_scope(tutor_user_id: int, user_id: int) -> bool:
+    """Whether user_id is one of the students assigned to the tutor."""
+    scope_sql, scope_params = _user_scope_filter(None, tutor_user_id)
+    try:
+        with get_sql_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT 1 WHERE ? IN ({scope_sql})", (user_id, *scope_params))
+            return cursor.fetchone() is not None
+    except pyodbc.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+def _get_student_ids_with_profiles(student_ids: List[int]) -> set:
+    """One batched Cosmos query for which students already have a profile document."""
+    if not student_ids:
+        return set()
 
-CONTAINER_NAME = "ai-student-profile"
+    container = get_container(PROFILE_CONTAINER_NAME)
+    items = container.query_items(
+        "SELECT VALUE c.student_id FROM c WHERE ARRAY_CONTAINS(@sids, c.student_id)",
+        parameters=[{"name": "@sids", "value": student_ids}],
+        enable_cross_partition_query=True,
+    )
+    return set(items)
 
-client = get_cosmos_db_connection()
-db = client.get_database_client(DATABASE_NAME)
-container = db.get_container_client(CONTAINER_NAME)
 
+def get_all_users_with_roles(
+    role_id: Optional[int] = None,
+    tutor_user_id: Optional[int] = None,
+    include_invite_urls: bool = False
+) -> List[Dict]:
+    """
+    Lists users with their roles, student details and profile tag.
+
+    Runs a fixed number of set-based queries regardless of how many users are listed:
+    users, roles, student/year rows and tutor assignments from SQL, plus one Cosmos
+    query for profile existence. Invite URLs for inactive users are only generated
+    (which inserts AccountInvites rows) when include_invite_urls is set.
+    """
+    scope_sql, scope_params = _user_scope_filter(role_id, tutor_user_id)
+    scope_clause = f"WHERE {{column}} IN ({scope_sql})" if scope_sql else ""
 
-def get_all_users_with_roles(role_id: Optional[int] = None, tutor_user_id: Optional[int] = None) -> List[Dict]:
     try:
         with get_sql_db_connection() as conn:
             cursor = conn.cursor()
 
-            # Base query
-            if tutor_user_id is not None:
-                # Filter to only students assigned to the tutor
-                query = """
-                    SELECT u.id, u.first_name, u.last_name, u.email, u.gt_email, 
-                           u.profile_picture_url, u.is_active
-                    FROM Users u
-                    JOIN Students s ON s.user_id = u.id
-                    JOIN TutorStudents ts ON ts.student_id = s.id
-                    WHERE ts.user_id = ?
-                """
-                if role_id is not None:
-                    query += " AND EXISTS (SELECT 1 FROM UserRoles ur WHERE ur.user_id = u.id AND ur.role_id = ?)"
-                    cursor.execute(query, (tutor_user_id, role_id))
-                else:
-                    cursor.execute(query, (tutor_user_id,))
-            elif role_id is not None:
-                query = """
-                    SELECT u.id, u.first_name, u.last_name, u.email, u.gt_email, 
-                           u.profile_picture_url, u.is_active
-                    FROM Users u
-                    JOIN UserRoles ur ON u.id = ur.user_id
-                    WHERE ur.role_id = ?
-                """
-                cursor.execute(query, (role_id,))
-            else:
-                query = """
-                    SELECT u.id, u.first_name, u.last_name, u.email, u.gt_email, 
-                           u.profile_picture_url, u.is_active
-                    FROM Users u
-                """
-                cursor.execute(query)
-
+            # --- Users ---
+            cursor.execute(f"""
+                SELECT u.id, u.first_name, u.last_name, u.email, u.gt_email, 
+                       u.profile_picture_url, u.is_active
+                FROM Users u
+                {scope_clause.format(column="u.id")}
+            """, scope_params)
             users = cursor.fetchall()
             if not users:
                 return []
@@ -64,75 +92,85 @@ def get_all_users_with_roles(role_id: Optional[int] = None, tutor_user_id: Optio
             column_names = [desc[0] for desc in cursor.description]
             user_dicts = [dict(zip(column_names, row)) for row in users]
 
-            # Process each user
-            for user in user_dicts:
-                uid = user["id"]
+            # --- Roles ---
+            cursor.execute(f"""
+                SELECT ur.user_id, r.id, r.role_name
+                FROM Roles r
+                JOIN UserRoles ur ON r.id = ur.role_id
+                {scope_clause.format(column="ur.user_id")}
+            """, scope_params)
+            roles_by_user = {}
+            for user_id, rid, role_name in cursor.fetchall():
+                roles_by_user.setdefault(user_id, []).append((rid, role_name))
+
+            # --- Tutors with at least one student ---
+            cursor.execute(f"""
+                SELECT DISTINCT ts.user_id
+                FROM TutorStudents ts
+                {scope_clause.format(column="ts.user_id")}
+            """, scope_params)
+            tutors_with_students = {row[0] for row in cursor.fetchall()}
+
+            # --- Student / year rows ---
+            cursor.execute(f"""
+                SELECT s.user_id, s.id AS student_id, y.name AS year_name
+                FROM Students s
+                JOIN Years y ON s.year_id = y.id
+                {scope_clause.format(column="s.user_id")}
+            """, scope_params)
+            students_by_user = {}
+            for user_id, student_id, year_name in cursor.fetchall():
+                # Keep the first row per user, as the per-user lookup did
+                students_by_user.setdefault(user_id, (student_id, year_name))
+
+        # --- CosmosDB profile check, batched ---
+        profile_lookup_failed = False
+        try:
+            student_ids_with_profiles = _get_student_ids_with_profiles(
+                [student_id for student_id, _ in students_by_user.values()]
+            )
+        except Exception as ce:
+            # Fail gracefully but log
+            print(f"CosmosDB profile query failed: {ce}")
+            student_ids_with_profiles = set()
+            profile_lookup_failed = True
+
+        for user in user_dicts:
+            uid = user["id"]
+            role_data = roles_by_user.get(uid, [])
+            role_names = [r[1] for r in role_data]
 
-                # --- Roles ---
-                cursor.execute("""
-                    SELECT r.id, r.role_name
-                    FROM Roles r
-                    JOIN UserRoles ur ON r.id = ur.role_id
-                    WHERE ur.user_id = ?
-                """, (uid,))
-                role_data = cursor.fetchall()
-                role_ids = [r[0] for r in role_data]
-                role_names = [r[1] for r in role_data]
-
-                user["roles"] = role_names
-                user["role_ids"] = role_ids
-
-                # --- Profile Tag Logic ---
-                tag = None
-                if not user.get("is_active", True):
-                    tag = "Awaiting Activation"
-
-                elif "Peer Tutor" in role_names:
-                    cursor.execute("SELECT 1 FROM TutorStudents WHERE user_id = ?", (uid,))
-                    if not cursor.fetchone():
-                        tag = "No Students Assigned"
-
-                elif "Student" in role_names:
-                    cursor.execute("""
-                        SELECT s.id AS student_id, y.name AS year_name
-                        FROM Students s
-                        JOIN Years y ON s.year_id = y.id
-                        WHERE s.user_id = ?
-                    """, (uid,))
-                    row = cursor.fetchone()
-
-                    if row:
-                        student_id, year_name = row
-                        user["student_id"] = student_id
-                        user["year_name"] = year_name
-
-                        # CosmosDB Profile Check
-                        try:
-                            cosmos_result = list(container.query_items(
-                                "SELECT c.id FROM c WHERE c.student_id = @sid",
-                                parameters=[{"name": "@sid", "value": student_id}],
-                                enable_cross_partition_query=True,
-                            ))
-                            if not cosmos_result:
-                                tag = "Profile Incomplete"
-                        except Exception as ce:
-                            # Fail gracefully but log
-                            print(f"CosmosDB query failed for student {student_id}: {ce}")
-                            tag = "Profile Incomplete"
-
-                    else:
-                        tag = "Profile Incomplete"
+            user["roles"] = role_names
+            user["role_ids"] = [r[0] for r in role_data]
+
+            # --- Profile Tag Logic ---
+            tag = None
+            if not user.get("is_active", True):
+                tag = "Awaiting Activation"
+
+            elif "Peer Tutor" in role_names:
+                if uid not in tutors_with_students:
+                    tag = "No Students Assigned"
 
-                user["profile_tag"] = tag
-                
-                # Add invite URL for inactive users
-                if not user.get("is_active", True):
-                    from .user_invitations import regenerate_invite_url
-                    user["invite_url"] = regenerate_invite_url(uid)
+            elif "Student" in role_names:
+                student = students_by_user.get(uid)
+                if student:
+                    student_id, year_name = student
+                    user["student_id"] = student_id
+                    user["year_name"] = year_name
+
+                    if profile_lookup_failed or student_id not in student_ids_with_profiles:
+                        tag = "Profile Incomplete"
                 else:
-                    user["invite_url"] = None
+                    tag = "Profile Incomplete"
+
+            user["profile_tag"] = tag
+            user["invite_url"] = None
 
-            return user_dicts
+        if include_invite_urls:
+            attach_invite_urls(user_dicts)
+
+        return user_dicts
 
     except pyodbc.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -140,13 +178,29 @@ def get_all_users_with_roles(role_id: Optional[int] = None, tutor_user_id: Optio
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
+def attach_invite_urls(users: List[Dict]) -> List[Dict]:
+    """Generate fresh invite URLs for the inactive users in the list, in one batch."""
+    inactive_user_ids = [u["id"] for u in users if not u.get("is_active", True)]
+    if not inactive_user_ids:
+        return users
+
+    from .user_invitations import regenerate_invite_urls
+    invite_urls = regenerate_invite_urls(inactive_user_ids)
+    for user in users:
+        if user["id"] in invite_urls:
+            user["invite_url"] = invite_urls[user["id"]]
+    return users
+
+
 def get_all_users_with_roles_allowed(
     allowed_role_names: set[str],
     role_id: Optional[int] = None,
-    tutor_user_id: Optional[int] = None
+    tutor_user_id: Optional[int] = None,
+    include_invite_urls: bool = False
 ) -> List[Dict]:
     """
     Reuses get_all_users_with_roles and filters the results to allowed roles.
+    Invite URLs are generated after filtering so only listed users get new invites.
     """
     all_users = get_all_users_with_roles(role_id=role_id, tutor_user_id=tutor_user_id)
     if not all_users:
@@ -160,6 +214,9 @@ def get_all_users_with_roles_allowed(
             continue
         if role_names[0] in allowed_role_names:
             filtered.append(u)
+
+    if include_invite_urls:
+        attach_invite_urls(filtered)
     return filtered
 
 
@@ -2,14 +2,15 @@ import os
 from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, File, Form, Query, UploadFile, logger, status, HTTPException
 from typing import List, Optional, Dict, Set
-from application.database.mssql_crud_helpers import fetch_all
+from application.database.async_db import run_db
+from application.database.mssql_crud_helpers import fetch_all_async
 from application.features.auth.auth_helpers import hash_password
 from application.features.auth.crud import get_user_by_email
 from application.features.auth.permissions import _expand_roles, require_admin_access, require_peer_tutor_access, require_teacher_access
 from application.features.auth.schemas import StudentProfile, UserResponse
 from application.features.roles.crud import get_multiple_role_names_from_ids
-from application.features.users.crud.user_queries import get_all_users_with_roles_allowed, get_user_with_roles_by_id, update_user_email, update_user_name
-from application.features.users.crud.user_invitations import complete_user_invite, create_invited_user, get_user_id_from_invite_token
+from application.features.users.crud.user_queries import get_all_users_with_roles_allowed, get_user_with_roles_by_id, is_user_in_tutor_scope, update_user_email, update_user_name
+from application.features.users.crud.user_invitations import complete_user_invite, create_invited_user, get_user_id_from_invite_token, regenerate_invite_url
 from application.features.users.crud.user_management import delete_user_db
 
 from application.features.users.schemas import DefaultProfilePicture, InviteUserRequest, UserEmailUpdateData, UserNameUpdateData, UserDetailsResponse
@@ -22,28 +23,46 @@ load_dotenv()
 
 router = APIRouter()
 
+
+def _caller_user_scope(user_data: Dict):
+    """
+    Returns (allowed_role_names, tutor_user_id) for the users the caller may see:
+    roles at/below the caller's in the hierarchy, and for Peer Tutors only their
+    assigned students (tutor_user_id is None for everyone else).
+    """
+    caller_roles = user_data.get("role_names")
+    if not isinstance(caller_roles, list) or not caller_roles:
+        raise HTTPException(status_code=403, detail="Role information missing from token.")
+
+    # Expand roles per hierarchy (e.g., 'Peer Tutor' -> {'Peer Tutor','Student'})
+    allowed_role_names: Set[str] = _expand_roles(set(caller_roles))
+
+    # Check if the caller is a Peer Tutor. If so, only their assigned students are in scope
+    tutor_user_id = None
+    if "Peer Tutor" in caller_roles:
+        tutor_user_id = user_data.get("user_id")
+
+    return allowed_role_names, tutor_user_id
+
+
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
     role_id: Optional[int] = Query(None), 
+    include_invite_urls: bool = Query(False),
     user_data: Dict = Depends(require_peer_tutor_access)
 ):
     """
     Retrieves users with their roles, but filters to only those whose roles are
     at/below the caller’s role hierarchy. Optional role_id filter is allowed
     only if it maps to a role within the caller’s allowed set.
+    Fresh invite URLs for inactive users are only issued when include_invite_urls is set.
     """
 
-    caller_roles = user_data.get("role_names")
-    if not isinstance(caller_roles, list) or not caller_roles:
-        raise HTTPException(status_code=403, detail="Role information missing from token.")
-
-    # Expand roles per hierarchy (e.g., 'Peer Tutor' -> {'Peer Tutor','Student'})
-    allowed_role_names: Set[str] = _expand_roles(set(caller_roles))
+    allowed_role_names, tutor_user_id = _caller_user_scope(user_data)
 
-   
     # If role_id provided, ensure it resolves to an allowed role
     if role_id is not None:
-        names = get_multiple_role_names_from_ids([role_id]) or []
+        names = await run_db(get_multiple_role_names_from_ids, [role_id]) or []
         if not names:
             raise HTTPException(status_code=400, detail=f"Invalid role_id: {role_id}")
         if names[0] not in allowed_role_names:
@@ -52,21 +71,18 @@ async def get_users(
                 detail=f"You cannot filter by role '{names[0]}'.",
             )
 
-    # Check if the caller is a Peer Tutor. If so, only show their assigned students
-    tutor_user_id = None
-    if "Peer Tutor" in caller_roles:
-        tutor_user_id = user_data.get("user_id")
-    
-    users = get_all_users_with_roles_allowed(
+    users = await run_db(
+        get_all_users_with_roles_allowed,
         allowed_role_names=allowed_role_names,
         role_id=role_id,
-        tutor_user_id=tutor_user_id
+        tutor_user_id=tutor_user_id,
+        include_invite_urls=include_invite_urls
     )
 
     # Build a map of tutor_id -> [{ student_id, code, name }]
     tutored_map = defaultdict(list)
     try:
-        flat = get_all_tutor_students()
+        flat = await run_db(get_all_tutor_students)
         for r in flat:
             # r has: tutor_id, student_id, student_year, etc.
             year_name = r.get("student_year")
@@ -106,7 +122,7 @@ async def get_users(
 @router.get("/profile-picture-defaults", response_model=List[DefaultProfilePicture])
 async def get_profile_picture_defaults():
 
-   default_profile_pictures = fetch_all("ProfilePictureDefaults")
+   default_profile_pictures = await fetch_all_async("ProfilePictureDefaults")
 
    return [
        DefaultProfilePicture(id=p["id"], url=p["profile_picture_url"])
@@ -119,7 +135,7 @@ async def get_user_by_id(user_id: int, user_data: dict = Depends(require_teacher
     """
     Retrieves a user by ID
     """
-    user = get_user_with_roles_by_id(user_id)
+    user = await run_db(get_user_with_roles_by_id, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -152,10 +168,12 @@ async def invite_user(
     """
     email = request_data.google_email
 
-    if get_user_by_email(email):
+    if await run_db(get_user_by_email, email):
         raise HTTPException(409, "A user with this email already exists.")
 
-    result = create_invited_user(email, request_data.school_email, request_data.role_ids, request_data.student_type)
+    result = await run_db(
+        create_invited_user, email, request_data.school_email, request_data.role_ids, request_data.student_type
+    )
 
     if not result or "token" not in result:
         raise HTTPException(500, "Failed to create invited user")
@@ -171,6 +189,37 @@ async def invite_user(
     return {"message": f"Invite sent to {email}"}
 
 
+@router.post("/{user_id}/invite-url")
+async def regenerate_user_invite_url(
+    user_id: int,
+    user_data: dict = Depends(require_peer_tutor_access)
+):
+    """
+    Issues a new invite link for a user who has not completed account setup.
+    Only users the caller could list (same role hierarchy and tutor scope as GET /users) qualify.
+    """
+    allowed_role_names, tutor_user_id = _caller_user_scope(user_data)
+
+    user = await run_db(get_user_with_roles_by_id, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    role_names = user.get("roles") or []
+    if not role_names or role_names[0] not in allowed_role_names:
+        raise HTTPException(status_code=403, detail="You cannot issue invites for this user.")
+    if tutor_user_id is not None and not await run_db(is_user_in_tutor_scope, tutor_user_id, user_id):
+        raise HTTPException(status_code=403, detail="You cannot issue invites for this user.")
+
+    if user.get("is_active", True):
+        raise HTTPException(status_code=400, detail="User has already completed account setup.")
+
+    invite_url = await run_db(regenerate_invite_url, user_id)
+    if not invite_url:
+        raise HTTPException(status_code=500, detail="Failed to generate invite URL")
+
+    return {"user_id": user_id, "invite_url": invite_url}
+
+
 @router.post("/complete-invite", status_code=200)
 async def complete_invite(
     token: str = Form(...),
@@ -181,9 +230,9 @@ async def complete_invite(
     existing_blob_url: Optional[str] = Form(None),
 ):
     from application.utils.blob_upload import upload_profile_picture
-    hashed_pw = hash_password(password)
+    hashed_pw = await run_db(hash_password, password)
 
-    user_id = get_user_id_from_invite_token(token)
+    user_id = await run_db(get_user_id_from_invite_token, token)
     if not user_id:
         raise HTTPException(400, "Invalid or expired token")
 
@@ -195,7 +244,8 @@ async def complete_invite(
     else:
         blob_url = None 
 
-    success = complete_user_invite(
+    success = await run_db(
+        complete_user_invite,
         token=token,
         first_name=first_name,
         last_name=last_name,
@@ -218,7 +268,7 @@ async def delete_user(
     Deletes a user by ID. Only accessible to admins.
     """
     
-    result = delete_user_db(user_id)
+    result = await run_db(delete_user_db, user_id)
 
     if not result:
         raise HTTPException(
@@ -239,7 +289,7 @@ async def update_user_email_route(
     if data.email is None and data.gt_email is None:
         raise HTTPException(status_code=400, detail="At least one email must be provided")
 
-    updated_user = update_user_email(user_id, data.email, data.gt_email)
+    updated_user = await run_db(update_user_email, user_id, data.email, data.gt_email)
     return updated_user
 
 
@@ -253,5 +303,5 @@ async def update_user_name_route(
     if data.first_name is None and data.last_name is None:
         raise HTTPException(status_code=400, detail="At least one name field must be provided")
 
-    updated_user = update_user_name(user_id, data.first_name, data.last_name)
+    updated_user = await run_db(update_user_name, user_id, data.first_name, data.last_name)
     return updated_user
\ No newline at end of file
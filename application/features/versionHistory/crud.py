@@ -2,16 +2,21 @@ from fastapi import HTTPException
 from datetime import datetime
 from application.features.versionHistory.schemas import AssignmentVersionResponse, AssignmentVersionUpdate
 from azure.cosmos import exceptions
-from docx import Document
-from docx.shared import Inches
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from bs4 import BeautifulSoup
-import io
 import re
 
 # Import legacy conversion utilities
 from application.features.assignment_version_generation.crud import convert_json_to_html
+from application.features.versionHistory.version_summaries import refresh_assignment_version_summary
+from application.services.docx_render_pool import DocxRenderError, get_docx_render_pool
+from application.services.docx_rendering import convert_html_to_word_bytes
+from application.features.versionHistory.version_repository import (
+    delete_version_document,
+    get_version_by_number,
+    get_other_finalized_versions,
+    get_version_document,
+    get_versions_for_assignment,
+    replace_version_document,
+)
 
 
 def get_html_content_from_version_document(document: dict) -> str:
@@ -46,176 +51,32 @@ def get_html_content_from_version_document(document: dict) -> str:
     return "<p>No content available</p>"
 
 
-def convert_html_to_word_bytes(html_content: str) -> bytes:
-    """
-    Convert HTML content to Word document bytes
-    """
-    doc = Document()
-    
-    if not html_content:
-        doc.add_paragraph("No content available")
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Track numbered lists to ensure each section starts fresh
-    numbered_list_count = 0
-    
-    for element in soup.find_all(['h1', 'h2', 'h3', 'p', 'ul', 'ol', 'pre', 'div', 'hr']):
-        if element.name in ['h1', 'h2', 'h3']:
-            # Add headings - reset numbered list counter when we hit a new section
-            level = int(element.name[1])
-            doc.add_heading(element.get_text(strip=True), level=level)
-            numbered_list_count = 0  # Reset counter for new sections
-        
-        elif element.name == 'hr':
-            # Add a horizontal line separator instead of page break
-            paragraph = doc.add_paragraph()
-            # paragraph.add_run("_" * 50)  # Add a line of underscores as separator
-            numbered_list_count = 0  # Reset counter at section breaks
-        
-        elif element.name == 'p':
-            # Add paragraphs
-            text = element.get_text(strip=True)
-            if text:
-                paragraph = doc.add_paragraph(text)
-        
-        elif element.name in ['ul', 'ol']:
-            # Process lists recursively to handle nesting properly
-            def process_list(list_element, level=0, parent_numbering_id=None):
-                is_numbered = list_element.name == 'ol'
-
-                # Determine numbering format based on level
-                if is_numbered:
-                    if level == 0:
-                        style = 'List Number'
-                    elif level == 1:
-                        style = 'List Number 2'  # This should use letters (a,b,c)
-                    else:
-                        style = 'List Number 3'
-                else:
-                    style = 'List Bullet' if level == 0 else 'List Bullet 2'
-
-                # Process only DIRECT children (not recursive)
-                for child in list_element.children:
-                    if child.name == 'li':
-                        # Extract text content excluding nested lists
-                        text_parts = []
-                        for content in child.children:
-                            if isinstance(content, str):
-                                text_parts.append(content)
-                            elif content.name not in ['ul', 'ol']:
-                                text_parts.append(content.get_text())
-
-                        text = ''.join(text_parts).strip()
-
-                        if text:
-                            paragraph = doc.add_paragraph(text, style=style)
-
-                            # Set indentation level for nested lists
-                            if level > 0:
-                                paragraph.paragraph_format.left_indent = Inches(0.5 * level)
-
-                            # For nested numbered lists (level 1), set format to lowercase letters
-                            if is_numbered and level == 1:
-                                try:
-                                    pPr = paragraph._element.get_or_add_pPr()
-                                    numPr = pPr.get_or_add_numPr()
-                                    ilvl = numPr.get_or_add_ilvl()
-                                    ilvl.val = level
-
-                                    # Set number format to lowercase letters (lowerLetter)
-                                    numFmt = OxmlElement('w:numFmt')
-                                    numFmt.set(qn('w:val'), 'lowerLetter')
-
-                                    # This sets the level to use letter formatting
-                                except Exception:
-                                    pass  # Fallback if numbering manipulation fails
-
-                        # Process nested lists within this <li>
-                        for nested in child.find_all(['ul', 'ol'], recursive=False):
-                            process_list(nested, level + 1)
-
-            process_list(element)
-        
-        elif element.name == 'pre':
-            # Handle code blocks
-            text = element.get_text()
-            if text:
-                paragraph = doc.add_paragraph(text)
-                paragraph.style = 'Normal'
-                # Make code blocks appear in monospace-like formatting
-                for run in paragraph.runs:
-                    run.font.name = 'Courier New'
-        
-        elif element.name == 'div':
-            # Handle different div types
-            if 'ql-code-block' in element.get('class', []):
-                # Handle Quill code blocks
-                text = element.get_text()
-                if text.strip():
-                    paragraph = doc.add_paragraph(text)
-                    for run in paragraph.runs:
-                        run.font.name = 'Courier New'
-            elif 'counter-reset' in element.get('style', ''):
-                # This div marks a section boundary - reset numbering
-                numbered_list_count = 0
-                # Process child elements
-                for child in element.find_all(['h1', 'h2', 'h3', 'p', 'ul', 'ol', 'pre']):
-                    # Re-process child elements within this div
-                    pass
-    
-    # Convert to bytes
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    return buffer.getvalue()
-
-
-
-def get_assignment_version_by_doc_id(container, document_version_id: str) -> AssignmentVersionResponse:
-    query = "SELECT * FROM c WHERE c.id = @id"
-    parameters = [{"name": "@id", "value": document_version_id}]
-
+def get_assignment_version_by_doc_id(document_version_id: str) -> AssignmentVersionResponse:
     try:
-        items = list(container.query_items(
-            query=query,
-            parameters=parameters,
-            enable_cross_partition_query=True  # keep this if needed
-        ))
-        if not items:
+        item = get_version_document(document_version_id)
+        if not item:
             raise HTTPException(status_code=404, detail="Version not found")
-        return AssignmentVersionResponse(**items[0])
+        return AssignmentVersionResponse(**item)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch version: {str(e)}")
     
 
-def download_assignment_version(container, document_version_id: str) -> dict:
-    query = "SELECT * FROM c WHERE c.id = @id"
-    parameters = [{"name": "@id", "value": document_version_id}]
-
+def download_assignment_version(document_version_id: str) -> dict:
     try:
-        items = list(container.query_items(
-            query=query,
-            parameters=parameters,
-            enable_cross_partition_query=True
-        ))
-        if not items:
+        item = get_version_document(document_version_id)
+        if not item:
             raise HTTPException(status_code=404, detail="Version not found")
         
-        item = items[0]
-        
         # Get HTML content using the unified helper that handles all formats
         combined_html = get_html_content_from_version_document(item)
 
         if not combined_html or combined_html == "<p>No content available</p>":
             raise HTTPException(status_code=400, detail="No final content available for download")
         
-        # Convert to Word document
-        word_bytes = convert_html_to_word_bytes(combined_html)
+        # Convert to Word document on a render worker
+        word_bytes = get_docx_render_pool().render(convert_html_to_word_bytes, combined_html)
         
         # Generate a descriptive filename
         assignment_id = item.get("assignment_id", "unknown")
@@ -229,57 +90,39 @@ def download_assignment_version(container, document_version_id: str) -> dict:
         }
     except HTTPException:
         raise
+    except DocxRenderError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to download version: {str(e)}")
 
 
 
-def delete_version_by_assignment_version(container, assignment_id: str, version_number: int):
+def delete_version_by_assignment_version(assignment_id: str, version_number: int):
     try:
         # 1. Find document by assignment_id and version_number
-        query = """
-        SELECT * FROM c 
-        WHERE c.assignment_id = @assignment_id AND c.version_number = @version_number
-        """
-        params = [
-            {"name": "@assignment_id", "value": assignment_id},
-            {"name": "@version_number", "value": version_number}
-        ]
-        items = list(container.query_items(query=query, parameters=params, enable_cross_partition_query=True))
-
-        if not items:
+        item = get_version_by_number(assignment_id, version_number)
+        if not item:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        item = items[0]
-        doc_id = item["id"]
-        modifier_id = item["modifier_id"]
-
-        #2.  Delete using partition key
-        container.delete_item(item=doc_id, partition_key=str(modifier_id))
+        #2.  Delete using its own id as the partition key
+        delete_version_document(item["id"])
+        refresh_assignment_version_summary(item["assignment_id"])
 
+    except HTTPException:
+        raise
     except exceptions.CosmosResourceNotFoundError:
         raise HTTPException(status_code=404, detail="Document not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete version: {str(e)}")
 
-def update_version(container, assignment_id: str, version_number: int, update_data: AssignmentVersionUpdate) -> AssignmentVersionResponse:
+def update_version(assignment_id: str, version_number: int, update_data: AssignmentVersionUpdate) -> AssignmentVersionResponse:
     # 1. Find existing version
-    query = """
-    SELECT * FROM c
-    WHERE c.assignment_id = @assignment_id AND c.version_number = @version_number
-    """
-    params = [
-        {"name": "@assignment_id", "value": assignment_id},
-        {"name": "@version_number", "value": version_number}
-    ]
-    items = list(container.query_items(query=query, parameters=params, enable_cross_partition_query=True))
+    existing = get_version_by_number(assignment_id, version_number)
     
-    if not items:
+    if not existing:
         raise HTTPException(status_code=404, detail="Version not found")
 
-    existing = items[0]
     doc_id = existing["id"]
-    partition_key = existing["modifier_id"]
 
     # 2. Prepare the update
     update_dict = update_data.dict(exclude_unset=True)
@@ -295,67 +138,45 @@ def update_version(container, assignment_id: str, version_number: int, update_da
     try:
         # If this update sets finalized=True, unset others
         if update_dict.get("finalized") is True:
-            # Find all versions for this assignment
-            query_all = "SELECT * FROM c WHERE c.assignment_id = @assignment_id"
-            params_all = [{"name": "@assignment_id", "value": assignment_id}]
-            all_versions = list(container.query_items(
-                query=query_all,
-                parameters=params_all,
-                enable_cross_partition_query=True
-            ))
-
-            for v in all_versions:
+            for v in get_versions_for_assignment(assignment_id):
                 if v["id"] != doc_id and v.get("finalized"):
                     v["finalized"] = False
-                    container.replace_item(item=v["id"], body=v)
+                    replace_version_document(v)
 
         # Save the current version
-        container.replace_item(item=doc_id, body=existing)
+        replace_version_document(existing)
+        refresh_assignment_version_summary(existing["assignment_id"])
         existing["modifier_id"] = int(existing["modifier_id"])
         return AssignmentVersionResponse(**existing)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update version: {str(e)}")
     
-def finalize_by_id(container, assignment_version_id: str, finalized: bool) -> AssignmentVersionResponse:
+def finalize_by_id(assignment_version_id: str, finalized: bool) -> AssignmentVersionResponse:
     # Step 1: Get the current document by ID
     try:
-        items = list(container.query_items(
-            query="SELECT * FROM c WHERE c.id = @id",
-            parameters=[{"name": "@id", "value": assignment_version_id}],
-            enable_cross_partition_query=True
-        ))
+        current = get_version_document(assignment_version_id)
 
-        if not items:
+        if not current:
             raise HTTPException(status_code=404, detail="Assignment version not found")
 
-        current = items[0]
         assignment_id = current["assignment_id"]
         current["finalized"] = finalized
-        container.replace_item(item=current["id"], body=current)
+        replace_version_document(current)
 
         # Step 2: If setting to True, un-finalize all others
         if finalized:
-            others = list(container.query_items(
-                query="""
-                SELECT * FROM c 
-                WHERE c.assignment_id = @assignment_id AND c.id != @id
-                """,
-                parameters=[
-                    {"name": "@assignment_id", "value": assignment_id},
-                    {"name": "@id", "value": assignment_version_id}
-                ],
-                enable_cross_partition_query=True
-            ))
-
-            for item in others:
-                if item.get("finalized") is True:
-                    item["finalized"] = False
-                    container.replace_item(item=item["id"], body=item)
+            for item in get_other_finalized_versions(assignment_id, assignment_version_id):
+                item["finalized"] = False
+                replace_version_document(item)
+
+        refresh_assignment_version_summary(assignment_id)
 
         # Return updated
         current["modifier_id"] = int(current["modifier_id"])
         return AssignmentVersionResponse(**current)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to finalize version: {str(e)}")
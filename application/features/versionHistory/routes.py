@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, Response
-from application.database.nosql_connection import get_container
 from application.features.versionHistory import crud
 from application.features.versionHistory.schemas import AssignmentVersionResponse
 from application.features.auth.permissions import require_user_access 
@@ -12,8 +11,7 @@ def get_assignment_version_by_document_id(
     document_version_id: str,
     user_data: dict = Depends(require_user_access)
 ):
-    container = get_container()
-    version_details = crud.get_assignment_version_by_doc_id(container, document_version_id)
+    version_details = crud.get_assignment_version_by_doc_id(document_version_id)
 
     return version_details
 
@@ -22,8 +20,7 @@ def download_assignment_version(
     document_version_id: str,
     user_data: dict = Depends(require_user_access)
 ):
-    container = get_container()
-    download_data = crud.download_assignment_version(container, document_version_id)
+    download_data = crud.download_assignment_version(document_version_id)
     
     return Response(
         content=download_data["file_content"],
@@ -38,5 +35,4 @@ def finalize_assignment_version(
     document_version_id: str,
     user_data: dict = Depends(require_user_access)
 ):
-    container = get_container()
-    return crud.finalize_by_id(container, document_version_id, True)
+    return crud.finalize_by_id(document_version_id, True)
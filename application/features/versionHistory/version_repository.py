@@ -0,0 +1,79 @@
+"""
+Version document repository.
+
+Documents in ai-assignment-versions-v2 are partitioned by their own id, so every
+lookup by id is a single-partition point read (1 RU) rather than a fan-out query.
+All reads and writes of individual version documents go through these helpers so
+the partition key is always supplied consistently.
+"""
+from typing import List, Optional
+
+from azure.cosmos import exceptions
+
+from application.database.nosql_connection import get_container
+
+
+def get_version_document(version_id: str) -> Optional[dict]:
+    """Point-read a version document by id. Returns None when it does not exist."""
+    try:
+        return get_container().read_item(item=version_id, partition_key=version_id)
+    except exceptions.CosmosResourceNotFoundError:
+        return None
+
+
+def create_version_document(doc: dict) -> dict:
+    return get_container().create_item(body=doc)
+
+
+def replace_version_document(doc: dict) -> dict:
+    return get_container().replace_item(item=doc["id"], body=doc)
+
+
+def delete_version_document(version_id: str):
+    get_container().delete_item(item=version_id, partition_key=version_id)
+
+
+def get_versions_for_assignment(assignment_id) -> List[dict]:
+    """All version documents of one assignment (cross-partition, filtered on assignment_id)."""
+    return list(get_container().query_items(
+        query="SELECT * FROM c WHERE c.assignment_id = @assignment_id",
+        parameters=[{"name": "@assignment_id", "value": assignment_id}],
+        enable_cross_partition_query=True
+    ))
+
+
+def get_version_by_number(assignment_id, version_number: int) -> Optional[dict]:
+    items = list(get_container().query_items(
+        query="""
+        SELECT * FROM c
+        WHERE c.assignment_id = @assignment_id AND c.version_number = @version_number
+        """,
+        parameters=[
+            {"name": "@assignment_id", "value": assignment_id},
+            {"name": "@version_number", "value": version_number}
+        ],
+        enable_cross_partition_query=True
+    ))
+    return items[0] if items else None
+
+
+def get_other_finalized_versions(assignment_id, version_id: str) -> List[dict]:
+    return list(get_container().query_items(
+        query="""
+        SELECT * FROM c
+        WHERE c.assignment_id = @assignment_id AND c.id != @id AND c.finalized = true
+        """,
+        parameters=[
+            {"name": "@assignment_id", "value": assignment_id},
+            {"name": "@id", "value": version_id}
+        ],
+        enable_cross_partition_query=True
+    ))
+
+
+def get_version_numbers_for_assignment(assignment_id) -> List[int]:
+    return list(get_container().query_items(
+        query="SELECT VALUE c.version_number FROM c WHERE c.assignment_id = @aid",
+        parameters=[{"name": "@aid", "value": assignment_id}],
+        enable_cross_partition_query=True
+    ))
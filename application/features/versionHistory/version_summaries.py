@@ -0,0 +1,171 @@
+"""
+Materialized per-assignment version summaries.
+
+List endpoints only need a handful of fields derived from an assignment's versions
+(finalized, rating status, last modification and the finalized version id). Instead
+of scanning every version document on each request, one small summary document per
+assignment is kept in its own container and refreshed whenever a version is created,
+regenerated, edited, finalized, rated or deleted.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from application.database.nosql_connection import VERSION_SUMMARIES_CONTAINER_NAME, get_container
+
+
+# Above this many ids a full read of the summary container beats an ARRAY_CONTAINS query
+SUMMARY_FULL_READ_THRESHOLD = 500
+
+DEFAULT_VERSION_SUMMARY = {
+    "finalized": False,
+    "rating_status": "Pending",
+    "date_modified": None,
+    "final_version_id": None,
+}
+
+
+def summarize_versions(versions: List[dict]) -> dict:
+    """Derive list-level metadata from all version documents of one assignment."""
+    if not versions:
+        return dict(DEFAULT_VERSION_SUMMARY, version_count=0)
+
+    date_modified = max(
+        [
+            datetime.fromisoformat(v["date_modified"]).replace(tzinfo=None)
+            for v in versions
+            if v.get("date_modified")
+        ],
+        default=None
+    )
+
+    finalized_versions = [v for v in versions if v.get("finalized")]
+    finalized_version = finalized_versions[0] if finalized_versions else None
+
+    if finalized_version and finalized_version.get("rating_data"):
+        rating_status = "Rated"
+    elif any(v.get("rating_data") for v in versions):
+        rating_status = "Partially Rated"
+    else:
+        rating_status = "Pending"
+
+    return {
+        "finalized": finalized_version is not None,
+        "rating_status": rating_status,
+        "date_modified": date_modified,
+        "final_version_id": finalized_version.get("id") if finalized_version else None,
+        "version_count": len(versions),
+    }
+
+
+def _to_document(assignment_id, summary: dict) -> dict:
+    date_modified = summary.get("date_modified")
+    return {
+        "id": str(assignment_id),
+        "assignment_id": assignment_id,
+        "finalized": summary["finalized"],
+        "rating_status": summary["rating_status"],
+        "date_modified": date_modified.isoformat() if date_modified else None,
+        "final_version_id": summary["final_version_id"],
+        "version_count": summary.get("version_count", 0),
+    }
+
+
+def _from_document(doc: dict) -> dict:
+    date_modified = doc.get("date_modified")
+    return {
+        "finalized": doc.get("finalized", False),
+        "rating_status": doc.get("rating_status", "Pending"),
+        "date_modified": datetime.fromisoformat(date_modified) if date_modified else None,
+        "final_version_id": doc.get("final_version_id"),
+    }
+
+
+def _query_versions_for_assignments(assignment_ids: List[int]) -> Dict[str, List[dict]]:
+    versions_container = get_container()
+    items = versions_container.query_items(
+        query="""
+        SELECT c.id, c.assignment_id, c.finalized, c.rating_data, c.date_modified
+        FROM c WHERE ARRAY_CONTAINS(@ids, c.assignment_id)
+        """,
+        parameters=[{"name": "@ids", "value": assignment_ids}],
+        enable_cross_partition_query=True
+    )
+
+    grouped = {str(aid): [] for aid in assignment_ids}
+    for item in items:
+        grouped.setdefault(str(item.get("assignment_id")), []).append(item)
+    return grouped
+
+
+def _normalize_ids(assignment_ids: Iterable) -> List[int]:
+    normalized = []
+    for aid in assignment_ids:
+        try:
+            normalized.append(int(aid))
+        except (TypeError, ValueError):
+            continue
+    return normalized
+
+
+def refresh_assignment_version_summary(assignment_id) -> Optional[dict]:
+    """
+    Recompute and store the summary for a single assignment from its version documents.
+    Failures are logged and swallowed so the write that triggered the refresh still succeeds.
+    """
+    try:
+        assignment_id = int(assignment_id)
+        versions = _query_versions_for_assignments([assignment_id]).get(str(assignment_id), [])
+        summary = summarize_versions(versions)
+        get_container(VERSION_SUMMARIES_CONTAINER_NAME).upsert_item(_to_document(assignment_id, summary))
+        return summary
+    except Exception as e:
+        print(f"Failed to refresh version summary for assignment {assignment_id}: {e}")
+        return None
+
+
+def delete_assignment_version_summary(assignment_id):
+    try:
+        get_container(VERSION_SUMMARIES_CONTAINER_NAME).delete_item(
+            item=str(assignment_id), partition_key=str(assignment_id)
+        )
+    except Exception as e:
+        print(f"Failed to delete version summary for assignment {assignment_id}: {e}")
+
+
+def get_version_summaries_map(assignment_ids: Iterable) -> Dict[str, dict]:
+    """
+    Return {assignment_id: summary} for the requested assignments.
+
+    Requested assignments without a stored summary (e.g. created before summaries
+    existed) are computed from their versions in a single query and stored, so the
+    next call is served entirely from the summary container.
+    """
+    ids = _normalize_ids(assignment_ids)
+    if not ids:
+        return {}
+
+    summaries_container = get_container(VERSION_SUMMARIES_CONTAINER_NAME)
+
+    if len(ids) > SUMMARY_FULL_READ_THRESHOLD:
+        # Large requests (e.g. the admin list) are cheaper as one feed over the small summary docs
+        wanted = {str(aid) for aid in ids}
+        docs = (doc for doc in summaries_container.read_all_items() if doc["id"] in wanted)
+    else:
+        docs = summaries_container.query_items(
+            query="SELECT * FROM c WHERE ARRAY_CONTAINS(@ids, c.assignment_id)",
+            parameters=[{"name": "@ids", "value": ids}],
+            enable_cross_partition_query=True
+        )
+    result = {doc["id"]: _from_document(doc) for doc in docs}
+
+    missing = [aid for aid in ids if str(aid) not in result]
+    if missing:
+        for aid, versions in _query_versions_for_assignments(missing).items():
+            document = _to_document(int(aid), summarize_versions(versions))
+            try:
+                summaries_container.upsert_item(document)
+            except Exception as e:
+                print(f"Failed to store version summary for assignment {aid}: {e}")
+            result[aid] = _from_document(document)
+
+    return result
@@ -0,0 +1,192 @@
+"""
+Content-addressed caching for model outputs.
+
+Keys are SHA-256 hashes of everything that determines an output (the normalized
+input text, the prompt version and the model), so an unchanged input maps to the
+same entry and any prompt or model change produces a new one.
+
+A ContentCache always has an in-process LRU tier bounded by entry count and TTL.
+It can be backed by a persistent tier (Cosmos, with per-item TTL) so entries
+survive restarts and are shared between worker processes. Concurrent
+get_or_compute calls for the same key share a single computation.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from azure.cosmos import exceptions
+
+from application.database.nosql_connection import get_container
+
+
+def normalize_text(value: Any) -> str:
+    """Canonical text for hashing: whitespace collapsed, lists/dicts serialized stably."""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, (list, tuple)):
+        return json.dumps([normalize_text(v) for v in value], ensure_ascii=False)
+    if isinstance(value, dict):
+        return json.dumps({k: normalize_text(v) for k, v in sorted(value.items())}, ensure_ascii=False)
+    return normalize_text(str(value)) if value is not None else ""
+
+
+def make_cache_key(namespace: str, content: Any, prompt_version: str, model: Optional[str]) -> str:
+    digest = hashlib.sha256()
+    for part in (namespace, prompt_version, model or "", normalize_text(content)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class MemoryCacheTier:
+    """Thread-safe LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class CosmosCacheTier:
+    """Cache entries as small Cosmos documents (partition key = id) expiring via `ttl`."""
+
+    def __init__(self, container_name: str, ttl_seconds: int):
+        self.container_name = container_name
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str):
+        try:
+            doc = get_container(self.container_name).read_item(item=key, partition_key=key)
+        except exceptions.CosmosResourceNotFoundError:
+            return None
+        return doc.get("value")
+
+    def set(self, key: str, value):
+        get_container(self.container_name).upsert_item({"id": key, "value": value, "ttl": self.ttl_seconds})
+
+
+class ContentCache:
+    def __init__(self, name: str, memory: MemoryCacheTier, persistent=None):
+        self.name = name
+        self.memory = memory
+        self.persistent = persistent
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _count(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        if self.persistent is not None:
+            try:
+                value = self.persistent.get(key)
+            except Exception as e:
+                print(f"{self.name} cache read failed: {e}")
+                value = None
+            if value is not None:
+                self.memory.set(key, value)
+                self._count("persistent_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value):
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            try:
+                self.persistent.set(key, value)
+            except Exception as e:
+                # The value is still cached in memory; persistence is best-effort
+                print(f"{self.name} cache write failed: {e}")
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # Another thread is already computing this key; wait for its result
+            return pending.result()
+
+        try:
+            value = compute()
+            if value is not None:
+                self.set(key, value)
+            pending.set_result(value)
+            return value
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.hits + self.persistent_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self.memory),
+                "max_entries": self.memory.max_entries,
+                "ttl_seconds": self.memory.ttl_seconds,
+                "persistent": type(self.persistent).__name__ if self.persistent else None,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.memory.evictions,
+                "expirations": self.memory.expirations,
+            }
@@ -0,0 +1,252 @@
+"""
+Content-addressed cache of rendered Word documents.
+
+Keys are SHA-256 hashes of the render function, DOCX_RENDERER_VERSION and the
+render arguments (the HTML, plus the title where there is one), so an unchanged
+version is served as the bytes rendered last time without parsing its HTML again,
+and a renderer change produces new keys.
+
+The local tier is a directory of .docx files bounded by total size with LRU
+eviction. It can be backed by a blob container so documents are shared between
+instances and survive redeploys.
+
+    DOCX_CACHE_DIR             local cache directory (default: <tmp>/docx-render-cache)
+    DOCX_CACHE_MAX_MB          local tier size; 0 disables the cache
+    DOCX_CACHE_BLOB_CONTAINER  blob container for the shared tier; empty disables it
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient
+from dotenv import load_dotenv
+
+from application.services.docx_rendering import DOCX_RENDERER_VERSION
+
+load_dotenv()
+
+DOCX_CACHE_DIR = os.getenv("DOCX_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "docx-render-cache")
+DOCX_CACHE_MAX_MB = int(os.getenv("DOCX_CACHE_MAX_MB", "512"))
+DOCX_CACHE_BLOB_CONTAINER = os.getenv("DOCX_CACHE_BLOB_CONTAINER", "")
+
+DOCX_SUFFIX = ".docx"
+
+
+def make_docx_cache_key(func: Callable, args: tuple) -> str:
+    digest = hashlib.sha256()
+    for part in (f"{func.__module__}.{func.__qualname__}", DOCX_RENDERER_VERSION, *map(str, args)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class DiskCacheTier:
+    """
+    Rendered documents as files named by key, evicting least recently used files
+    once the directory exceeds max_bytes. Files are written atomically, so worker
+    processes sharing the directory never read a partial document.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + DOCX_SUFFIX)
+
+    def _load_index(self):
+        # Files left by earlier runs, oldest use first
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(DOCX_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name[:-len(DOCX_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self.total_bytes += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # The modification time orders files for the next run's index
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process sharing the directory
+            with self._lock:
+                size = self._sizes.pop(key, None)
+                if size is not None:
+                    self.total_bytes -= size
+            return None
+
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+            else:
+                self._sizes[key] = len(data)
+                self.total_bytes += len(data)
+                self._evict()
+        return data
+
+    def set(self, key: str, value: bytes):
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(value)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self.total_bytes += len(value) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(value)
+            self._evict()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sizes)
+
+
+class BlobCacheTier:
+    """Rendered documents as blobs named by key in a dedicated container."""
+
+    def __init__(self, container_name: str, connection_string: Optional[str] = None):
+        self.container_name = container_name
+        self.connection_string = connection_string or os.getenv("STORAGE_ACCOUNT_CONNECTION_STRING")
+        self._container = None
+        self._lock = threading.Lock()
+
+    def _get_container(self):
+        if self._container is None:
+            with self._lock:
+                if self._container is None:
+                    service = BlobServiceClient.from_connection_string(self.connection_string)
+                    self._container = service.get_container_client(self.container_name)
+        return self._container
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._get_container().download_blob(key + DOCX_SUFFIX).readall()
+        except ResourceNotFoundError:
+            return None
+
+    def set(self, key: str, value: bytes):
+        self._get_container().upload_blob(key + DOCX_SUFFIX, value, overwrite=True)
+
+
+class DocxCache:
+    def __init__(self, disk: DiskCacheTier, blob: Optional[BlobCacheTier] = None):
+        self.disk = disk
+        self.blob = blob
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.blob_hits = 0
+        self.misses = 0
+        self.write_failures = 0
+
+    def _count(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = self.disk.get(key)
+        except OSError as e:
+            print(f"DOCX cache read failed: {e}")
+            value = None
+        if value is not None:
+            self._count("hits")
+            return value
+
+        if self.blob is not None:
+            try:
+                value = self.blob.get(key)
+            except Exception as e:
+                print(f"DOCX blob cache read failed: {e}")
+                value = None
+            if value is not None:
+                self._store_on_disk(key, value)
+                self._count("blob_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def _store_on_disk(self, key: str, value: bytes):
+        try:
+            self.disk.set(key, value)
+        except OSError as e:
+            # Caching is best-effort; the caller already has the document
+            self._count("write_failures")
+            print(f"DOCX cache write failed: {e}")
+
+    def set(self, key: str, value: bytes):
+        self._store_on_disk(key, value)
+        if self.blob is not None:
+            try:
+                self.blob.set(key, value)
+            except Exception as e:
+                self._count("write_failures")
+                print(f"DOCX blob cache write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.hits + self.blob_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self.disk),
+                "bytes": self.disk.total_bytes,
+                "max_bytes": self.disk.max_bytes,
+                "blob_container": self.blob.container_name if self.blob else None,
+                "hits": self.hits,
+                "blob_hits": self.blob_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.disk.evictions,
+                "write_failures": self.write_failures,
+            }
+
+
+_cache: Optional[DocxCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_docx_cache() -> Optional[DocxCache]:
+    """The process-wide render cache, or None when DOCX_CACHE_MAX_MB is 0 or the directory is unusable."""
+    global _cache
+    if _cache is None and DOCX_CACHE_MAX_MB > 0:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    disk = DiskCacheTier(DOCX_CACHE_DIR, DOCX_CACHE_MAX_MB * 1024 * 1024)
+                except OSError as e:
+                    print(f"DOCX cache disabled, {DOCX_CACHE_DIR} is not usable: {e}")
+                    return None
+                blob = BlobCacheTier(DOCX_CACHE_BLOB_CONTAINER) if DOCX_CACHE_BLOB_CONTAINER else None
+                _cache = DocxCache(disk, blob)
+    return _cache
+
+
+def get_docx_cache_stats() -> dict:
+    return _cache.stats() if _cache is not None else {"enabled": DOCX_CACHE_MAX_MB > 0, "entries": 0}
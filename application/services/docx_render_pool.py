@@ -0,0 +1,222 @@
+"""
+Process pool for DOCX rendering.
+
+Turning HTML into a Word document (parse, build, serialize) is CPU-bound and holds
+the GIL, so renders run on a pool of worker processes instead of request threads.
+The pool is created on first use and shut down with the app.
+
+    DOCX_RENDER_WORKERS          worker processes; 0 renders in the calling thread
+    DOCX_RENDER_MAX_PENDING      renders queued or running across all requests; further
+                                 submissions wait for a free slot
+    DOCX_RENDER_TIMEOUT_SECONDS  per render, from submission; also bounds the wait for a slot
+
+render_many() fans a sequence of renders out across the workers and yields the
+results in the original order, keeping only a bounded window in flight. With a
+render cache (see docx_cache), renders whose output is cached skip the pool.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from application.services.docx_cache import DocxCache, get_docx_cache, make_docx_cache_key
+
+load_dotenv()
+
+DOCX_RENDER_WORKERS = int(os.getenv("DOCX_RENDER_WORKERS", str(min(os.cpu_count() or 1, 4))))
+DOCX_RENDER_MAX_PENDING = int(os.getenv("DOCX_RENDER_MAX_PENDING", str(max(DOCX_RENDER_WORKERS, 1) * 4)))
+DOCX_RENDER_TIMEOUT_SECONDS = float(os.getenv("DOCX_RENDER_TIMEOUT_SECONDS", "60"))
+# Workers are replaced after this many renders to cap memory growth from long runs
+DOCX_RENDER_TASKS_PER_WORKER = 200
+
+RenderJob = Tuple[Callable[..., bytes], tuple]
+
+
+class DocxRenderError(Exception):
+    """A render could not be queued or did not finish in time."""
+
+
+class DocxRenderPool:
+    def __init__(self, workers: int = DOCX_RENDER_WORKERS, max_pending: int = DOCX_RENDER_MAX_PENDING,
+                 timeout: float = DOCX_RENDER_TIMEOUT_SECONDS, cache: Optional[DocxCache] = None):
+        self.workers = workers
+        self.max_pending = max(max_pending, 1)
+        self.timeout = timeout
+        self.cache = cache
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.queue_full = 0
+        self.pending = 0
+        self.turnaround_seconds_total = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers import only the rendering module, not the forked app state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=DOCX_RENDER_TASKS_PER_WORKER,
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, attr: str, amount=1):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + amount)
+
+    def _finished(self, future: Future, submitted_at: float):
+        self._slots.release()
+        self._count("pending", -1)
+        if future.cancelled() or future.exception() is not None:
+            self._count("failed")
+        else:
+            self._count("completed")
+            self._count("turnaround_seconds_total", time.monotonic() - submitted_at)
+
+    def _run_inline(self, func: Callable[..., bytes], args: tuple) -> Future:
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _submit(self, func: Callable[..., bytes], args: tuple) -> Tuple[Future, float, Optional[str]]:
+        """
+        Queue func(*args) on a worker, waiting up to the timeout for a free slot.
+        Returns the future, its deadline and the cache key to store the result under.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_docx_cache_key(func, args)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future, time.monotonic() + self.timeout, None
+
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count("queue_full")
+            raise DocxRenderError("Document rendering is busy, try again shortly")
+        self._count("submitted")
+        self._count("pending")
+        submitted_at = time.monotonic()
+
+        try:
+            if self.workers <= 0:
+                future = self._run_inline(func, args)
+            else:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(func, *args)
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory); start a fresh pool for this and later renders
+                    self._reset_executor(executor)
+                    future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            self._count("pending", -1)
+            self._count("failed")
+            raise
+
+        future.add_done_callback(lambda f: self._finished(f, submitted_at))
+        return future, submitted_at + self.timeout, cache_key
+
+    def _result(self, future: Future, deadline: float, cache_key: Optional[str]) -> bytes:
+        try:
+            result = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            future.cancel()
+            self._count("timed_out")
+            raise DocxRenderError(f"Document rendering took longer than {self.timeout:.0f}s")
+        if cache_key is not None:
+            # Stored from the consuming thread so cache I/O never holds up the pool
+            self.cache.set(cache_key, result)
+        return result
+
+    def render(self, func: Callable[..., bytes], *args) -> bytes:
+        return self._result(*self._submit(func, args))
+
+    def render_many(self, jobs: Iterable[RenderJob], window: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Render (func, args) jobs in parallel, yielding results in job order. At most
+        `window` jobs are in flight for this call, so a large export neither floods
+        the queue nor holds every result in memory.
+        """
+        window = max(1, min(window or max(self.workers, 1) * 2, self.max_pending))
+        in_flight = deque()
+        try:
+            for func, args in jobs:
+                if len(in_flight) >= window:
+                    yield self._result(*in_flight.popleft())
+                in_flight.append(self._submit(func, args))
+            while in_flight:
+                yield self._result(*in_flight.popleft())
+        finally:
+            # The consumer stopped early or a render failed; drop what has not started
+            for future, _, _ in in_flight:
+                future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "queue_full": self.queue_full,
+                # Submission to result, queueing included
+                "avg_turnaround_seconds": round(self.turnaround_seconds_total / self.completed, 3) if self.completed else 0.0,
+            }
+
+
+_pool: Optional[DocxRenderPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_docx_render_pool() -> DocxRenderPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DocxRenderPool(cache=get_docx_cache())
+    return _pool
+
+
+def shutdown_docx_render_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def get_docx_render_stats() -> dict:
+    return _pool.stats() if _pool is not None else {"workers": DOCX_RENDER_WORKERS, "started": False}
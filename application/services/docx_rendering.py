@@ -0,0 +1,257 @@
+"""
+HTML and text to Word (.docx) rendering.
+
+These functions are pure CPU work with no app state, so they can run on the DOCX
+render worker processes (see docx_render_pool) as well as in the calling thread.
+
+Documents start from new_document(), which copies the package of a base template
+parsed once per process instead of unzipping and parsing python-docx's default
+template for every render. DocumentStyles resolves each style name once per document.
+"""
+import copy
+import io
+import threading
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.document import Document as DocxDocument
+from docx.opc.package import OpcPackage
+from docx.shared import Inches
+from docx.styles.style import BaseStyle
+
+# Part of every render cache key; bump when a change here alters the documents produced
+DOCX_RENDERER_VERSION = "1"
+
+_base_package: Optional[OpcPackage] = None
+_base_package_lock = threading.Lock()
+
+
+def new_document() -> DocxDocument:
+    """An empty document, equivalent to Document(), copied from the preloaded base template."""
+    global _base_package
+    if _base_package is None:
+        with _base_package_lock:
+            if _base_package is None:
+                _base_package = Document().part.package
+    # Copy the package (parts, relationships and their XML roots), not a Document:
+    # Document caches proxies for child elements such as the body, and a deep copy
+    # would detach those from the copied XML tree
+    return copy.deepcopy(_base_package).main_document_part.document
+
+
+class DocumentStyles:
+    """Style lookups for one document; python-docx searches styles.xml by name on every use."""
+
+    def __init__(self, doc: DocxDocument):
+        self._styles = doc.styles
+        self._by_name: Dict[str, BaseStyle] = {}
+
+    def __getitem__(self, name: str) -> BaseStyle:
+        style = self._by_name.get(name)
+        if style is None:
+            style = self._by_name[name] = self._styles[name]
+        return style
+
+
+def convert_html_to_word_bytes(html_content: str) -> bytes:
+    """
+    Convert HTML content to Word document bytes
+    """
+    doc = new_document()
+    styles = DocumentStyles(doc)
+    
+    if not html_content:
+        doc.add_paragraph("No content available")
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        buffer.seek(0)
+        return buffer.getvalue()
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    # Track numbered lists to ensure each section starts fresh
+    numbered_list_count = 0
+    
+    for element in soup.find_all(['h1', 'h2', 'h3', 'p', 'ul', 'ol', 'pre', 'div', 'hr']):
+        if element.name in ['h1', 'h2', 'h3']:
+            # Add headings - reset numbered list counter when we hit a new section
+            level = int(element.name[1])
+            doc.add_heading(element.get_text(strip=True), level=level)
+            numbered_list_count = 0  # Reset counter for new sections
+        
+        elif element.name == 'hr':
+            # Add a horizontal line separator instead of page break
+            paragraph = doc.add_paragraph()
+            # paragraph.add_run("_" * 50)  # Add a line of underscores as separator
+            numbered_list_count = 0  # Reset counter at section breaks
+        
+        elif element.name == 'p':
+            # Add paragraphs
+            text = element.get_text(strip=True)
+            if text:
+                paragraph = doc.add_paragraph(text)
+        
+        elif element.name in ['ul', 'ol']:
+            # Process lists recursively to handle nesting properly
+            def process_list(list_element, level=0, parent_numbering_id=None):
+                is_numbered = list_element.name == 'ol'
+
+                # Determine numbering format based on level
+                if is_numbered:
+                    if level == 0:
+                        style = 'List Number'
+                    elif level == 1:
+                        style = 'List Number 2'  # This should use letters (a,b,c)
+                    else:
+                        style = 'List Number 3'
+                else:
+                    style = 'List Bullet' if level == 0 else 'List Bullet 2'
+
+                # Process only DIRECT children (not recursive)
+                for child in list_element.children:
+                    if child.name == 'li':
+                        # Extract text content excluding nested lists
+                        text_parts = []
+                        for content in child.children:
+                            if isinstance(content, str):
+                                text_parts.append(content)
+                            elif content.name not in ['ul', 'ol']:
+                                text_parts.append(content.get_text())
+
+                        text = ''.join(text_parts).strip()
+
+                        if text:
+                            paragraph = doc.add_paragraph(text, style=styles[style])
+
+                            # Set indentation level for nested lists
+                            if level > 0:
+                                paragraph.paragraph_format.left_indent = Inches(0.5 * level)
+
+                            # For nested numbered lists (level 1), set format to lowercase letters
+                            if is_numbered and level == 1:
+                                try:
+                                    pPr = paragraph._element.get_or_add_pPr()
+                                    numPr = pPr.get_or_add_numPr()
+                                    ilvl = numPr.get_or_add_ilvl()
+                                    ilvl.val = level
+
+                                    # Set number format to lowercase letters (lowerLetter)
+                                    numFmt = OxmlElement('w:numFmt')
+                                    numFmt.set(qn('w:val'), 'lowerLetter')
+
+                                    # This sets the level to use letter formatting
+                                except Exception:
+                                    pass  # Fallback if numbering manipulation fails
+
+                        # Process nested lists within this <li>
+                        for nested in child.find_all(['ul', 'ol'], recursive=False):
+                            process_list(nested, level + 1)
+
+            process_list(element)
+        
+        elif element.name == 'pre':
+            # Handle code blocks
+            text = element.get_text()
+            if text:
+                paragraph = doc.add_paragraph(text)
+                paragraph.style = styles['Normal']
+                # Make code blocks appear in monospace-like formatting
+                for run in paragraph.runs:
+                    run.font.name = 'Courier New'
+        
+        elif element.name == 'div':
+            # Handle different div types
+            if 'ql-code-block' in element.get('class', []):
+                # Handle Quill code blocks
+                text = element.get_text()
+                if text.strip():
+                    paragraph = doc.add_paragraph(text)
+                    for run in paragraph.runs:
+                        run.font.name = 'Courier New'
+            elif 'counter-reset' in element.get('style', ''):
+                # This div marks a section boundary - reset numbering
+                numbered_list_count = 0
+                # Process child elements
+                for child in element.find_all(['h1', 'h2', 'h3', 'p', 'ul', 'ol', 'pre']):
+                    # Re-process child elements within this div
+                    pass
+    
+    # Convert to bytes
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def render_text_to_word_bytes(title: str, content: str) -> bytes:
+    """Word document with the title as a heading and the plain text content below it."""
+    doc = new_document()
+    doc.add_heading(title, 0)
+    doc.add_paragraph(content)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def html_to_word_document(html_content: str, title: str) -> Document:
+    """Convert HTML content to a Word document with basic formatting."""
+    doc = new_document()
+    styles = DocumentStyles(doc)
+
+    # Add title as heading
+    doc.add_heading(title, 0)
+
+    # Parse HTML content
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # Process each element
+    for element in soup:
+        if element.name == 'p':
+            # Add paragraph
+            paragraph = doc.add_paragraph()
+            add_text_with_formatting(paragraph, element)
+        elif element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+            # Add heading
+            level = int(element.name[1])
+            doc.add_heading(element.get_text(strip=True), level)
+        elif element.name == 'ul':
+            # Add unordered list
+            for li in element.find_all('li'):
+                p = doc.add_paragraph(li.get_text(strip=True), style=styles['List Bullet'])
+        elif element.name == 'ol':
+            # Add ordered list
+            for li in element.find_all('li'):
+                p = doc.add_paragraph(li.get_text(strip=True), style=styles['List Number'])
+        elif element.name is None and element.strip():
+            # Plain text node
+            doc.add_paragraph(element.strip())
+
+    return doc
+
+
+def add_text_with_formatting(paragraph, element):
+    """Add text to paragraph with basic formatting (bold, italic)."""
+    for content in element.children:
+        if content.name == 'strong' or content.name == 'b':
+            run = paragraph.add_run(content.get_text())
+            run.bold = True
+        elif content.name == 'em' or content.name == 'i':
+            run = paragraph.add_run(content.get_text())
+            run.italic = True
+        elif content.name is None:
+            # Plain text
+            paragraph.add_run(str(content))
+        else:
+            # Other tags, just get text
+            paragraph.add_run(content.get_text())
+
+
+def render_titled_html_to_word_bytes(html_content: str, title: str) -> bytes:
+    """html_to_word_document() saved to bytes."""
+    doc = html_to_word_document(html_content, title)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
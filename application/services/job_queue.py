@@ -0,0 +1,309 @@
+"""
+Background job queue for long-running model calls.
+
+Generation requests can take a minute or more, which is longer than proxies keep
+a request open. Instead of holding the request, routes submit the work here and
+return a job id immediately; a bounded pool of worker threads runs the work and
+records the outcome in a job store that clients poll.
+
+Two stores are available, selected with GENERATION_JOB_BACKEND:
+    memory  - jobs live in this process (default, and what the tests use)
+    cosmos  - jobs are kept in the ai-generation-jobs container so any worker
+              process can answer a status poll
+"""
+import datetime
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from azure.cosmos import exceptions
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from application.database.nosql_connection import GENERATION_JOBS_CONTAINER_NAME, get_container
+
+load_dotenv()
+
+GENERATION_JOB_BACKEND = os.getenv("GENERATION_JOB_BACKEND", "memory")
+GENERATION_JOB_WORKERS = int(os.getenv("GENERATION_JOB_WORKERS", "4"))
+GENERATION_JOB_MAX_QUEUE = int(os.getenv("GENERATION_JOB_MAX_QUEUE", "100"))
+GENERATION_JOB_RETENTION_SECONDS = int(os.getenv("GENERATION_JOB_RETENTION_SECONDS", "3600"))
+
+# Attempts (and the pause between them) to record a finished job before giving up
+JOB_FINISH_ATTEMPTS = 3
+JOB_FINISH_RETRY_SECONDS = 0.5
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+TERMINAL_STATUSES = {JOB_SUCCEEDED, JOB_FAILED}
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+def _utc_now_iso() -> str:
+    return datetime.datetime.utcnow().isoformat() + "Z"
+
+
+# ---------- stores ----------
+
+class InMemoryJobStore:
+    """Keeps job records in a dict; finished jobs are dropped after the retention period."""
+
+    def __init__(self, retention_seconds: int = GENERATION_JOB_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, dict] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.retention_seconds
+        for job_id in [j for j, t in self._finished_at.items() if t < cutoff]:
+            self._finished_at.pop(job_id, None)
+            self._jobs.pop(job_id, None)
+
+    def create(self, job: dict):
+        with self._lock:
+            self._prune()
+            self._jobs[job["id"]] = dict(job)
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            if job.get("status") in TERMINAL_STATUSES:
+                self._finished_at[job_id] = time.monotonic()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+class CosmosJobStore:
+    """
+    Stores job records in Cosmos (partition key = job id). Records carry a `ttl`
+    so the container expires them when default TTL is enabled on it.
+    """
+
+    def __init__(self, retention_seconds: int = GENERATION_JOB_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+
+    def _container(self):
+        return get_container(GENERATION_JOBS_CONTAINER_NAME)
+
+    def create(self, job: dict):
+        self._container().create_item(body=dict(job, ttl=self.retention_seconds))
+
+    def update(self, job_id: str, **fields):
+        job = self.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        self._container().replace_item(item=job_id, body=job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        try:
+            return self._container().read_item(item=job_id, partition_key=job_id)
+        except exceptions.CosmosResourceNotFoundError:
+            return None
+
+
+# ---------- queue ----------
+
+class JobQueue:
+    """
+    Runs submitted callables on a bounded thread pool and records their status,
+    result or error in the job store. At most `max_queue` jobs may wait for a
+    worker; further submissions raise JobQueueFullError.
+    """
+
+    def __init__(self, store, workers: int = GENERATION_JOB_WORKERS, max_queue: int = GENERATION_JOB_MAX_QUEUE):
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="generation-job")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._started = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def submit(self, kind: str, func: Callable[..., Any], *args, owner_id: Optional[int] = None,
+               resource_id: Optional[str] = None, **kwargs) -> dict:
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise JobQueueFullError(f"Generation queue is full ({self._queued} jobs waiting)")
+            self._queued += 1
+            self._submitted += 1
+
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "status": JOB_QUEUED,
+            "owner_id": owner_id,
+            "resource_id": resource_id,
+            "created_at": _utc_now_iso(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        try:
+            self.store.create(job)
+            future = self._executor.submit(self._run, job["id"], time.monotonic(), func, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+                self._submitted -= 1
+            raise
+
+        future.add_done_callback(lambda f: self._on_cancelled(job["id"]) if f.cancelled() else None)
+        return job
+
+    def _on_cancelled(self, job_id: str):
+        with self._lock:
+            self._queued -= 1
+            self._failed += 1
+        self._finish(job_id, JOB_FAILED, error={"status_code": 503, "detail": "Server shut down before the job ran"})
+
+    def _finish(self, job_id: str, status: str, result=None, error=None):
+        """
+        Record the job's outcome, retrying store failures. If the outcome still
+        cannot be written (e.g. the result is too large for the store), fall back
+        to marking the job failed without a result, so pollers never see a job
+        that stays running.
+        """
+        for attempt in range(JOB_FINISH_ATTEMPTS):
+            if attempt:
+                time.sleep(JOB_FINISH_RETRY_SECONDS)
+            try:
+                self.store.update(job_id, status=status, result=result, error=error, finished_at=_utc_now_iso())
+                return
+            except Exception as e:
+                print(f"Failed to record outcome of job {job_id} (attempt {attempt + 1}): {e}")
+                last_error = e
+
+        try:
+            self.store.update(
+                job_id,
+                status=JOB_FAILED,
+                result=None,
+                error={"status_code": 500, "detail": f"Could not record the job outcome: {last_error}"},
+                finished_at=_utc_now_iso(),
+            )
+        except Exception as e:
+            print(f"Failed to mark job {job_id} as failed: {e}")
+
+    def _run(self, job_id: str, submitted_at: float, func, args, kwargs):
+        waited = time.monotonic() - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._started += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        started = time.monotonic()
+        try:
+            self.store.update(job_id, status=JOB_RUNNING, started_at=_utc_now_iso())
+        except Exception as e:
+            print(f"Failed to mark job {job_id} as running: {e}")
+
+        status, result, error = JOB_SUCCEEDED, None, None
+        try:
+            result = func(*args, **kwargs)
+        except HTTPException as e:
+            status, error = JOB_FAILED, {"status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            status, error = JOB_FAILED, {"status_code": 500, "detail": f"Unexpected error: {e}"}
+
+        with self._lock:
+            self._running -= 1
+            self._run_total += time.monotonic() - started
+            if status == JOB_SUCCEEDED:
+                self._succeeded += 1
+            else:
+                self._failed += 1
+
+        self._finish(job_id, status, result=result, error=error)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work; jobs that have not started are marked failed."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self._succeeded + self._failed
+            return {
+                "backend": type(self.store).__name__,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "submitted": self._submitted,
+                "succeeded": self._succeeded,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_seconds": round(self._wait_total / self._started, 3) if self._started else 0.0,
+                "max_wait_seconds": round(self._wait_max, 3),
+                "avg_run_seconds": round(self._run_total / finished, 3) if finished else 0.0,
+            }
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def _store_from_env():
+    if GENERATION_JOB_BACKEND == "cosmos":
+        return CosmosJobStore()
+    return InMemoryJobStore()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, creating it on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(_store_from_env())
+    return _queue
+
+
+def set_job_queue(queue: Optional[JobQueue]):
+    """Replace the process-wide queue (e.g. with an in-memory one in tests)."""
+    global _queue
+    with _queue_lock:
+        _queue = queue
+
+
+def close_job_queue():
+    global _queue
+    with _queue_lock:
+        queue = _queue
+        _queue = None
+    if queue is not None:
+        queue.shutdown(wait=False)
+
+
+def get_job_queue_stats() -> dict:
+    return get_job_queue().stats()
@@ -0,0 +1,156 @@
+"""
+Rule-based conversion of pasted assignment text to display HTML.
+
+Blank lines separate blocks. Within a block, lines starting with a bullet or dash
+become <ul> items, lines starting with "1." / "1)" / "(1)" become <ol> items (with a
+start number when a list resumes after a break), and every other line is its own <p>
+paragraph unless it continues a hard-wrapped line before it. A short line that introduces a list, or
+stands alone in title case, capitals or ending in a colon, is treated as a heading and
+rendered bold, as the GPT formatter did. The text itself is only HTML-escaped, never reworded.
+
+convert_text_to_html() also returns a confidence between 0 and 1. Layouts the rules
+cannot represent faithfully (column-aligned tables, nested or lettered outlines,
+hard-wrapped text with no paragraph breaks, numbering that skips) lower it, so the
+caller can hand those to the model instead.
+"""
+import html
+import re
+from typing import List, Optional, Tuple
+
+_BULLET = re.compile(r"^\s*[-*•●‣▪◦–]\s+(.*)$")
+_NUMBERED = re.compile(r"^\s*(?:(\d{1,3})[.)]|\((\d{1,3})\))\s+(.*)$")
+_MARKDOWN_HEADING = re.compile(r"^\s*#{1,6}\s+(.*)$")
+# Outline markers the rules do not nest: "a.", "(b)", "iv)", "IV."
+_OUTLINE = re.compile(r"^\s*(?:[a-zA-Z][.)]|\([a-zA-Z]\)|[ivxIVX]{1,5}[.)])\s+")
+# Two or more aligned gaps on a line usually mean a table
+_COLUMNS = re.compile(r"\S(?:\t+| {3,})\S(?:.*\S)?(?:\t+| {3,})\S")
+
+HEADING_MAX_WORDS = 10
+# A line at least this long with no closing punctuation, followed by one starting in
+# lowercase, was wrapped mid-sentence and is joined with it
+WRAPPED_LINE_MIN_CHARS = 60
+# Lines per block above which a block without list markers looks hard-wrapped
+WRAPPED_BLOCK_LINES = 12
+
+
+def _escape(text: str) -> str:
+    return html.escape(text.strip(), quote=False)
+
+
+def _is_heading(line: str, followed_by_list: bool, alone: bool) -> bool:
+    text = line.strip()
+    if not text or len(text.split()) > HEADING_MAX_WORDS:
+        return False
+    if text.endswith(":"):
+        return alone or followed_by_list
+    if text[-1] in ".,;!?)":
+        return False
+    if followed_by_list:
+        return True
+    return alone and (text.isupper() or text.istitle())
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _continues(previous: str, line: str) -> bool:
+    previous, line = previous.strip(), line.strip()
+    return len(previous) >= WRAPPED_LINE_MIN_CHARS and previous[-1] not in ".:;!?" and line[:1].islower()
+
+
+def _classify(line: str) -> Tuple[str, str, Optional[int]]:
+    """Return (kind, text, number) for one line: kind is ul, ol, heading or text."""
+    match = _MARKDOWN_HEADING.match(line)
+    if match:
+        return "heading", match.group(1), None
+    match = _BULLET.match(line)
+    if match:
+        return "ul", match.group(1), None
+    match = _NUMBERED.match(line)
+    if match:
+        return "ol", match.group(3), int(match.group(1) or match.group(2))
+    return "text", line, None
+
+
+def convert_text_to_html(text: str) -> Tuple[str, float]:
+    """Convert plain text to simple HTML; returns (html, confidence)."""
+    blocks = [block.split("\n") for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n").strip("\n"))]
+    parts: List[str] = []
+    total_lines = 0
+    doubtful_lines = 0
+
+    for block in blocks:
+        lines = [line for line in block if line.strip()]
+        if not lines:
+            continue
+        total_lines += len(lines)
+        classified = [_classify(line) for line in lines]
+        has_list = any(kind in ("ul", "ol") for kind, _, _ in classified)
+
+        # List items indented past the block's outermost items are nested, which the
+        # flat lists produced here cannot show
+        list_indents = [_indent(line) for line, (kind, _, _) in zip(lines, classified) if kind in ("ul", "ol")]
+        list_indent = min(list_indents, default=0)
+        for line, (kind, _, _) in zip(lines, classified):
+            if _COLUMNS.search(line) or _OUTLINE.match(line):
+                doubtful_lines += 1
+            elif kind in ("ul", "ol") and _indent(line) > list_indent:
+                doubtful_lines += 1
+        if not has_list and len(lines) > WRAPPED_BLOCK_LINES:
+            doubtful_lines += len(lines) // 2
+
+        paragraph: List[str] = []
+        list_kind: Optional[str] = None
+        list_start: Optional[int] = None
+        items: List[str] = []
+        expected_number: Optional[int] = None
+
+        def flush_paragraph():
+            if paragraph:
+                parts.append(f"<p>{' '.join(_escape(line) for line in paragraph)}</p>")
+                paragraph.clear()
+
+        def flush_list():
+            nonlocal list_kind
+            if list_kind:
+                start = f' start="{list_start}"' if list_kind == "ol" and list_start not in (None, 1) else ""
+                parts.append(f"<{list_kind}{start}>" + "".join(f"<li>{item}</li>" for item in items) + f"</{list_kind}>")
+                items.clear()
+                list_kind = None
+
+        for index, (kind, content, number) in enumerate(classified):
+            next_kind = classified[index + 1][0] if index + 1 < len(classified) else None
+
+            if kind in ("ul", "ol"):
+                flush_paragraph()
+                if kind != list_kind:
+                    flush_list()
+                    list_kind = kind
+                    list_start = expected_number = number
+                if kind == "ol" and number != expected_number:
+                    doubtful_lines += 1
+                expected_number = (number or 0) + 1
+                items.append(_escape(content))
+            elif kind == "text" and list_kind and lines[index][:1].isspace():
+                # Indented continuation of the previous list item
+                items[-1] += " " + _escape(content)
+            elif kind == "text" and paragraph and _continues(paragraph[-1], content):
+                paragraph.append(content)
+            elif kind == "heading" or _is_heading(
+                content, followed_by_list=next_kind in ("ul", "ol"), alone=len(lines) == 1
+            ):
+                flush_list()
+                flush_paragraph()
+                parts.append(f"<p><strong>{_escape(content)}</strong></p>")
+            else:
+                flush_list()
+                flush_paragraph()
+                paragraph.append(content)
+
+        flush_list()
+        flush_paragraph()
+
+    if not total_lines:
+        return "", 1.0
+    return "\n".join(parts), round(1.0 - min(doubtful_lines / total_lines, 1.0), 3)
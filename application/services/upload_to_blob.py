@@ -1,15 +1,15 @@
 from azure.storage.blob.aio import BlobServiceClient
 from azure.storage.blob import ContentSettings
+import asyncio
 import uuid
 import os
-import io
-from docx import Document
-from docx.shared import Inches
-from bs4 import BeautifulSoup
 
 from dotenv import load_dotenv
 from fastapi import HTTPException, UploadFile, status
 
+from application.services.docx_render_pool import get_docx_render_pool
+from application.services.docx_rendering import render_titled_html_to_word_bytes
+
 load_dotenv()
 
 storage_account_connection_string = os.getenv("STORAGE_ACCOUNT_CONNECTION_STRING")
@@ -42,68 +42,13 @@ async def upload_to_blob(file: UploadFile, file_bytes: bytes):
         )
 
 
-def html_to_word_document(html_content: str, title: str) -> Document:
-    """Convert HTML content to a Word document with basic formatting."""
-    doc = Document()
-
-    # Add title as heading
-    doc.add_heading(title, 0)
-
-    # Parse HTML content
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Process each element
-    for element in soup:
-        if element.name == 'p':
-            # Add paragraph
-            paragraph = doc.add_paragraph()
-            add_text_with_formatting(paragraph, element)
-        elif element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            # Add heading
-            level = int(element.name[1])
-            doc.add_heading(element.get_text(strip=True), level)
-        elif element.name == 'ul':
-            # Add unordered list
-            for li in element.find_all('li'):
-                p = doc.add_paragraph(li.get_text(strip=True), style='List Bullet')
-        elif element.name == 'ol':
-            # Add ordered list
-            for li in element.find_all('li'):
-                p = doc.add_paragraph(li.get_text(strip=True), style='List Number')
-        elif element.name is None and element.strip():
-            # Plain text node
-            doc.add_paragraph(element.strip())
-
-    return doc
-
-
-def add_text_with_formatting(paragraph, element):
-    """Add text to paragraph with basic formatting (bold, italic)."""
-    for content in element.children:
-        if content.name == 'strong' or content.name == 'b':
-            run = paragraph.add_run(content.get_text())
-            run.bold = True
-        elif content.name == 'em' or content.name == 'i':
-            run = paragraph.add_run(content.get_text())
-            run.italic = True
-        elif content.name is None:
-            # Plain text
-            paragraph.add_run(str(content))
-        else:
-            # Other tags, just get text
-            paragraph.add_run(content.get_text())
-
-
 async def upload_html_as_word_to_blob(html_content: str, title: str, student_id: int) -> str:
     """Convert HTML content to Word document and upload to blob storage."""
     try:
-        # Generate Word document
-        doc = html_to_word_document(html_content, title)
-
-        # Save document to memory
-        doc_bytes = io.BytesIO()
-        doc.save(doc_bytes)
-        doc_bytes.seek(0)
+        # Generate Word document on a render worker (served from the render cache when unchanged)
+        word_bytes = await asyncio.to_thread(
+            get_docx_render_pool().render, render_titled_html_to_word_bytes, html_content, title
+        )
 
         # Create blob name
         safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
@@ -114,7 +59,7 @@ async def upload_html_as_word_to_blob(html_content: str, title: str, student_id:
         async with BlobServiceClient.from_connection_string(storage_account_connection_string) as blob_service_client:
             async with blob_service_client.get_blob_client(container=container_name, blob=blob_name) as blob_client:
                 await blob_client.upload_blob(
-                    doc_bytes.getvalue(),
+                    word_bytes,
                     overwrite=True,
                     content_settings=ContentSettings(
                         content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
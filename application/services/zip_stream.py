@@ -0,0 +1,66 @@
+"""
+Streaming ZIP archives.
+
+Exports describe their archives as iterables of (path, data) entries. stream_zip()
+turns such an iterable into the bytes of a ZIP file, yielding each entry's compressed
+bytes as soon as it has been written. Only the entry being written is held in memory,
+so an export of any size can be sent through a StreamingResponse without first
+building the whole archive in a buffer. prefix_entries() nests one producer's entries
+in a folder of another archive.
+"""
+import io
+import zipfile
+from typing import Iterable, Iterator, Tuple, Union
+
+ZipEntry = Tuple[str, Union[bytes, str]]
+
+ERROR_ENTRY_NAME = "EXPORT_ERROR.txt"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file object that hands written bytes back in chunks."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def prefix_entries(folder: str, entries: Iterable[ZipEntry]) -> Iterator[ZipEntry]:
+    """Place entries under folder/, so one producer can fill a folder of a larger archive."""
+    for name, data in entries:
+        yield f"{folder}/{name}", data
+
+
+def stream_zip(entries: Iterable[ZipEntry], compression: int = zipfile.ZIP_DEFLATED) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of entries piece by piece.
+
+    If producing an entry fails part-way, the error is written to EXPORT_ERROR.txt
+    and the archive is still closed properly, since the response status has already
+    been sent by then.
+    """
+    sink = _ChunkSink()
+    # zipfile writes data descriptors instead of seeking back when the file is unseekable
+    with zipfile.ZipFile(sink, "w", compression) as archive:
+        try:
+            for name, data in entries:
+                archive.writestr(name, data)
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            print(f"ZIP export stopped early: {e}")
+            archive.writestr(ERROR_ENTRY_NAME, f"The export stopped early because of an error: {e}\n")
+    yield sink.drain()
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from application.features.assignment_version_generation import content_condenser
+
+
+class CharEncoder:
+    def encode(self, text, disallowed_special=()):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+@pytest.fixture
+def condenser(monkeypatch):
+    monkeypatch.setattr(content_condenser, "get_encoder", lambda model: CharEncoder())
+    monkeypatch.setattr(content_condenser, "count_tokens", lambda text, model: len(text))
+    monkeypatch.setattr(content_condenser, "ASSIGNMENT_CONDENSE_THRESHOLD_TOKENS", 100)
+    monkeypatch.setattr(content_condenser, "ASSIGNMENT_CONDENSE_CHUNK_TOKENS", 40)
+    monkeypatch.setattr(content_condenser, "_condensed_cache", content_condenser.ContentCache(
+        "assignment_condense", content_condenser.MemoryCacheTier(max_entries=10, ttl_seconds=60)
+    ))
+
+    rows = {}
+    monkeypatch.setattr(content_condenser, "_load_condensed",
+                        lambda assignment_id, digest: rows.get((assignment_id, digest)))
+    monkeypatch.setattr(content_condenser, "_store_condensed",
+                        lambda assignment_id, digest, condensed: rows.__setitem__((assignment_id, digest), condensed))
+
+    calls = []
+    lock = threading.Lock()
+
+    def fake_response(prompt, model, override_max_tokens, system_prompt, call_type):
+        with lock:
+            calls.append(prompt)
+        part = prompt.split("Part ")[1].split(" ")[0]
+        return f"summary {part}"
+
+    monkeypatch.setattr(content_condenser, "get_gpt_response", fake_response)
+    return rows, calls
+
+
+def test_short_content_is_used_as_is(condenser):
+    rows, calls = condenser
+    assert content_condenser.get_prompt_content(1, "Essay", "short text") == "short text"
+    assert calls == [] and rows == {}
+
+
+def test_split_keeps_paragraphs_and_cuts_oversized_ones(monkeypatch):
+    monkeypatch.setattr(content_condenser, "get_encoder", lambda model: CharEncoder())
+    chunks = content_condenser.split_into_chunks("a" * 10 + "\n\n" + "b" * 10 + "\n\n" + "c" * 90, 40)
+
+    assert chunks[0] == "a" * 10 + "\n\n" + "b" * 10
+    assert [len(c) for c in chunks[1:]] == [40, 40, 10]
+
+
+def test_long_content_is_condensed_in_order_and_stored(condenser):
+    rows, calls = condenser
+    content = "\n\n".join(f"paragraph {i} " + "x" * 25 for i in range(6))
+
+    condensed = content_condenser.get_prompt_content(7, "Essay", content)
+
+    assert condensed == "\n\n".join(f"summary {i}" for i in range(1, 7))
+    assert len(calls) == 6
+    assert rows == {(7, content_condenser.content_hash(content)): condensed}
+
+
+def test_stored_and_cached_condensations_are_reused(condenser):
+    rows, calls = condenser
+    content = "\n\n".join("y" * 35 for _ in range(4))
+
+    first = content_condenser.get_prompt_content(1, "Essay", content)
+    calls.clear()
+    # Same row: read back from the assignment row
+    assert content_condenser.get_prompt_content(1, "Essay", content) == first
+    # Another row with identical content: served from the in-process cache
+    assert content_condenser.get_prompt_content(2, "Essay", content) == first
+    assert calls == []
+
+    # Edited content no longer matches the stored hash
+    content_condenser.get_prompt_content(1, "Essay", content + "\n\nnew task " + "z" * 20)
+    assert calls
+
+
+def test_condense_failure_falls_back_to_original(condenser, monkeypatch):
+    rows, _ = condenser
+
+    def failing(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(content_condenser, "get_gpt_response", failing)
+    content = "w" * 150
+    assert content_condenser.get_prompt_content(3, "Essay", content) == content
+    assert rows == {}
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from application.features.assignment_version_generation import crud
+
+
+def _parse(frames):
+    events = []
+    for frame in frames:
+        lines = frame.strip().split("\n")
+        events.append((lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: "))))
+    return events
+
+
+def _setup(monkeypatch, chunks, closed):
+    version_doc = {
+        "id": "v1",
+        "assignment_id": 5,
+        "final_generated_content": {"html_content": "<p>old</p>"},
+        "date_modified": "2025-01-01T00:00:00Z",
+    }
+    ctx = {"version_doc": version_doc, "selected_options": ["opt_1"], "additional_edit_suggestions": "", "prompt_tokens": 42}
+    saved = []
+
+    context = (version_doc, {"id": 5, "title": "Essay", "content": "text"}, {}, {})
+    monkeypatch.setattr(crud, "load_assignment_context", lambda version_id: context)
+
+    def build_prompt(**kwargs):
+        # The context loaded on the DB executor is passed through, not reloaded
+        assert kwargs["context"] is context
+        return [{"role": "user", "content": "prompt"}], ctx
+
+    monkeypatch.setattr(crud, "build_prompt_for_version", build_prompt)
+    monkeypatch.setattr(crud, "replace_version_document", lambda doc: saved.append(dict(doc)))
+    monkeypatch.setattr(crud, "refresh_assignment_version_summary", lambda assignment_id: None)
+
+    async def fake_stream(**kwargs):
+        # The count made while building the prompt is reused for the output budget
+        assert kwargs["prompt_tokens"] == 42
+        try:
+            for chunk in chunks:
+                yield chunk
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(crud, "stream_gpt_prompt_html", fake_stream)
+    return saved
+
+
+async def _collect(disconnect_after=None):
+    frames = []
+    calls = 0
+
+    async def is_disconnected():
+        nonlocal calls
+        calls += 1
+        return disconnect_after is not None and calls > disconnect_after
+
+    async for frame in crud.stream_assignment_version_generation("v1", ["opt_1"], "", is_disconnected):
+        frames.append(frame)
+    return frames
+
+
+def test_stream_emits_deltas_and_persists_with_history(monkeypatch):
+    closed = []
+    saved = _setup(monkeypatch, ["<h2>Plan", "</h2> ", "<p>Go</p>\n"], closed)
+
+    events = _parse(asyncio.run(_collect()))
+
+    assert [e for e, _ in events] == ["start", "delta", "delta", "delta", "complete"]
+    assert events[0][1] == {"version_document_id": "v1"}
+    assert events[-1][1]["html_content"] == "<h2>Plan</h2> <p>Go</p>"
+
+    assert len(saved) == 1
+    doc = saved[0]
+    assert doc["final_generated_content"] == {"html_content": "<h2>Plan</h2> <p>Go</p>"}
+    assert doc["generation_history"][0]["html_content"] == "<p>old</p>"
+    assert doc["generation_history"][0]["generation_type"] == "regeneration"
+    assert closed == [True]
+
+
+def test_disconnect_closes_upstream_and_skips_persist(monkeypatch):
+    closed = []
+    saved = _setup(monkeypatch, ["a", "b", "c", "d"], closed)
+
+    events = _parse(asyncio.run(_collect(disconnect_after=1)))
+
+    assert [e for e, _ in events] == ["start", "delta"]
+    assert saved == []
+    assert closed == [True]
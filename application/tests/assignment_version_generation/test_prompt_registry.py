@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from application.features.assignment_version_generation.prompt_registry import (
+    EXPECTED_PLACEHOLDERS,
+    PROMPTS_DIR,
+    PromptRegistry,
+    PromptTemplateError,
+)
+
+
+def _write(directory, name, text):
+    path = directory / f"{name}.txt"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_shipped_templates_load_and_render_like_str_format():
+    registry = PromptRegistry(PROMPTS_DIR)
+    values = {
+        "class_name": "Biology",
+        "assignment_title": "Cells",
+        "assignment_content": "Describe a {cell}.",
+        "assignment_type": "Essay",
+    }
+
+    template_text = (PROMPTS_DIR / "group_B_rec_prompt.txt").read_text(encoding="utf-8")
+    assert registry.render("group_B_rec_prompt", **values) == template_text.format(**values)
+    assert set(registry.versions()) >= {"group_A_rec_prompt", "group_B_version_generation_prompt"}
+
+
+def test_placeholder_mismatch_fails_at_load(tmp_path):
+    _write(tmp_path, "greeting", "Hello {name}, welcome to {place}")
+
+    with pytest.raises(PromptTemplateError, match="unexpected"):
+        PromptRegistry(tmp_path, expected={"greeting": {"name"}})
+
+    with pytest.raises(PromptTemplateError, match="Missing prompt templates"):
+        PromptRegistry(tmp_path, expected={"farewell": {"name"}})
+
+
+def test_render_requires_every_placeholder(tmp_path):
+    _write(tmp_path, "greeting", "Hello {name}! {{literal}}")
+    registry = PromptRegistry(tmp_path, expected={})
+
+    assert registry.render("greeting", name="Ada") == "Hello Ada! {literal}"
+    with pytest.raises(KeyError):
+        registry.render("greeting")
+
+
+def test_hot_reload_picks_up_edits_and_keeps_last_good_version(tmp_path):
+    path = _write(tmp_path, "greeting", "Hello {name}")
+    registry = PromptRegistry(tmp_path, expected={"greeting": {"name"}}, hot_reload=True)
+    first_version = registry.get("greeting").version
+
+    path.write_text("Hi {name}", encoding="utf-8")
+    os.utime(path, (1, 1))
+    assert registry.render("greeting", name="Ada") == "Hi Ada"
+    second_version = registry.get("greeting").version
+    assert second_version != first_version
+
+    path.write_text("Hi {nickname}", encoding="utf-8")
+    os.utime(path, (2, 2))
+    assert registry.render("greeting", name="Ada") == "Hi Ada"
+    assert registry.get("greeting").version == second_version
+
+
+def test_active_templates_keep_variable_input_after_static_prefix():
+    registry = PromptRegistry(PROMPTS_DIR)
+
+    for name, fields in EXPECTED_PLACEHOLDERS.items():
+        messages = registry.render_messages(name, **{field: f"<{field}>" for field in fields})
+        system, user = messages[0]["content"], messages[1]["content"]
+
+        assert [m["role"] for m in messages] == ["system", "user"]
+        assert system == registry.get(name).static_prefix
+        assert user.startswith("Input:")
+        assert not any(f"<{field}>" in system for field in fields)
+        assert registry.render(name, **{field: f"<{field}>" for field in fields}).endswith(user)
@@ -0,0 +1,150 @@
+import pytest
+from fastapi import HTTPException
+
+from application.features.assignment_version_generation import crud
+from application.features.assignment_version_generation.sections import (
+    find_section,
+    find_sections,
+    normalize_section_html,
+    splice_section,
+)
+
+GENERATED_HTML = (
+    "<section> <h2>Assignment Instructions</h2> <ul> <li>Read the article &amp; take notes.</li> </ul> </section> "
+    "<section> <h2>Step by step plan</h2> <ol> <li>Open the reading.</li> </ol> </section> "
+    "<section> <h2>Support Tools</h2> <ul> <li>Timer</li> </ul> "
+    "<section data-block=\"template\"> <h3>Template</h3> <pre>[NOTES]</pre> </section> </section> "
+    "<section> <h2>Motivational Message</h2> <p>You can do it 💪.</p> </section> "
+    "<!-- TEMPLATE_REQUIRED: yes -->"
+)
+
+# Current group A/B output: bare <h2> blocks without <section> wrappers
+H2_HTML = (
+    "<h2>Assignment Instructions</h2> <ul> <li>Read the pages. 📚</li> </ul> "
+    "<h2>Step by step plan</h2> <ol> <li>Check Canvas. 🔔</li> </ol> "
+    "<h2>Support Tools</h2> <ul> <li>Timer</li> </ul> "
+    "<section data-block=\"template\"> <h3>Template</h3> <pre>[NOTES]</pre> </section> "
+    "<h3>AI Prompts</h3> <ul> <li>Make a checklist.</li> </ul> "
+    "<h2>AI Policy</h2> <ul> <li>Do not copy from AI. 🛑</li> </ul> "
+    "<h2>Motivational Message</h2> <p>You can do it. 🚀</p> "
+    "<!-- TEMPLATE_REQUIRED: yes ; TEMPLATE_TYPE: reading -->"
+)
+
+
+def test_sections_are_found_by_heading_or_class():
+    keys = [section["key"] for section in find_sections(GENERATED_HTML)]
+    assert keys == ["instructions", "plan", "support-tools", "motivation"]
+
+    # The nested template block stays inside support tools
+    assert "[NOTES]" in find_section(GENERATED_HTML, "support-tools")["html"]
+
+    legacy = crud.convert_json_to_html({"promptsHtml": "<ul><li>Why?</li></ul>", "motivationalMessageHtml": "<p>Go</p>"})
+    assert [section["key"] for section in find_sections(legacy)] == ["prompts", "motivation"]
+
+
+def test_splice_only_touches_the_section():
+    section = find_section(GENERATED_HTML, "motivation")
+    new_section = normalize_section_html("```html\n<section><h2>Motivation</h2><p>Keep going 🚀.</p></section>\n```", section)
+    updated = splice_section(GENERATED_HTML, section, new_section)
+
+    assert new_section == "<section><h2>Motivation</h2><p>Keep going 🚀.</p></section>"
+    assert updated == GENERATED_HTML.replace(section["html"], new_section)
+
+
+def test_unwrapped_output_keeps_the_original_tag():
+    section = {"html": '<section class="motivation"><h2>Motivation</h2></section>'}
+    assert normalize_section_html("<h2>Motivation</h2><p>New</p>", section) == \
+        '<section class="motivation"><h2>Motivation</h2><p>New</p></section>'
+
+
+def test_bare_h2_blocks_are_sections():
+    sections = find_sections(H2_HTML)
+    assert [section["key"] for section in sections] == ["instructions", "plan", "support-tools", "ai-policy", "motivation"]
+
+    support = find_section(H2_HTML, "support-tools")
+    assert "[NOTES]" in support["html"] and "AI Prompts" in support["html"]
+    assert support["html"].endswith("</ul>")
+    # The trailing template marker is not part of the last section
+    assert find_section(H2_HTML, "motivation")["html"] == "<h2>Motivational Message</h2> <p>You can do it. 🚀</p>"
+
+
+def test_bare_h2_sections_are_spliced_without_a_wrapper():
+    section = find_section(H2_HTML, "plan")
+    new_section = normalize_section_html("<section><h2>Step by step plan</h2><ol><li>Watch first.</li></ol></section>", section)
+    updated = splice_section(H2_HTML, section, new_section)
+
+    assert new_section == "<h2>Step by step plan</h2><ol><li>Watch first.</li></ol>"
+    assert updated == H2_HTML.replace(section["html"], new_section)
+    assert [s["key"] for s in find_sections(updated)] == [s["key"] for s in find_sections(H2_HTML)]
+
+
+def _setup(monkeypatch, html_content=GENERATED_HTML):
+    version_doc = {
+        "id": "v1",
+        "assignment_id": 5,
+        "finalized": True,
+        "final_generated_content": {"html_content": html_content},
+        "date_modified": "2025-01-01T00:00:00Z",
+    }
+    saved, prompts = [], []
+    monkeypatch.setattr(crud, "get_version_document", lambda version_id: version_doc)
+    monkeypatch.setattr(crud, "_load_section_context", lambda assignment_id: {
+        "assignment_title": "Notes", "class_name": "EAS 1600", "reading_level": "Grade 4", "writing_level": "Grade 3",
+    })
+    monkeypatch.setattr(crud, "replace_version_document", lambda doc: saved.append(dict(doc)))
+    monkeypatch.setattr(crud, "refresh_assignment_version_summary", lambda assignment_id: None)
+
+    def fake_model(prompt, model, override_max_tokens, system_prompt):
+        prompts.append((system_prompt, prompt, override_max_tokens))
+        return "<section><h2>Step by step plan</h2><ol><li>Watch the video first.</li></ol></section>"
+
+    monkeypatch.setattr(crud, "process_gpt_prompt_html", fake_model)
+    return saved, prompts
+
+
+def test_regenerating_a_section_sends_only_that_section_and_keeps_history(monkeypatch):
+    saved, prompts = _setup(monkeypatch)
+
+    result = crud.handle_section_regeneration("v1", "plan", "Start with a video")
+
+    system_prompt, prompt, max_tokens = prompts[0]
+    assert max_tokens == crud.SECTION_MAX_OUTPUT_TOKENS
+    assert "Open the reading." in prompt and "Start with a video" in prompt
+    assert "Timer" not in prompt and "You can do it" not in prompt
+    assert "-\tMotivational Message" in prompt
+
+    assert result["section"] == "plan"
+    assert "Watch the video first." in result["html_content"]
+    assert "Open the reading." not in result["html_content"]
+    assert "[NOTES]" in result["html_content"]
+
+    doc = saved[-1]
+    assert doc["finalized"] is False
+    assert doc["final_generated_content"] == {"html_content": result["html_content"]}
+    assert doc["generation_history"][-1]["html_content"] == GENERATED_HTML
+    assert doc["generation_history"][-1]["generation_type"] == "section_regeneration"
+    assert doc["generation_history"][-1]["section"] == "plan"
+
+
+def test_regenerating_a_section_of_h2_only_html(monkeypatch):
+    saved, prompts = _setup(monkeypatch, H2_HTML)
+
+    result = crud.handle_section_regeneration("v1", "plan", "Start with a video")
+
+    assert "Check Canvas." in prompts[0][1] and "Timer" not in prompts[0][1]
+    assert result["html_content"] == H2_HTML.replace(
+        "<h2>Step by step plan</h2> <ol> <li>Check Canvas. 🔔</li> </ol>",
+        "<h2>Step by step plan</h2><ol><li>Watch the video first.</li></ol>",
+    )
+
+
+def test_unknown_or_missing_sections_are_rejected(monkeypatch):
+    _setup(monkeypatch)
+
+    with pytest.raises(HTTPException) as unknown:
+        crud.handle_section_regeneration("v1", "summary", "Shorter")
+    assert unknown.value.status_code == 400
+
+    with pytest.raises(HTTPException) as missing:
+        crud.handle_section_regeneration("v1", "prompts", "Shorter")
+    assert missing.value.status_code == 404
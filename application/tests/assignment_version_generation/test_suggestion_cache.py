@@ -0,0 +1,49 @@
+from application.features.assignment_version_generation import helpers
+from application.features.gpt import token_budget
+from application.services.content_cache import ContentCache, MemoryCacheTier
+
+
+def _setup(monkeypatch):
+    calls = []
+
+    def fake_gpt(prompt, model=None, override_max_tokens=None, system_prompt=None, prompt_tokens=None):
+        assert prompt_tokens > 0
+        calls.append(prompt)
+        return {"skills_for_success": "Focus", "learning_pathways": [{"name": "Outline first"}]}
+
+    monkeypatch.setattr(helpers, "process_gpt_prompt_version_suggestion_json", fake_gpt)
+    # Rough counts instead of downloading a tokenizer
+    monkeypatch.setattr(token_budget, "count_tokens", lambda text, model: len(text) // 4)
+    token_budget.count_static_tokens.cache_clear()
+    monkeypatch.setattr(helpers, "_suggestion_cache", ContentCache("test", MemoryCacheTier(10, 60)))
+    return calls
+
+
+ASSIGNMENT = {"title": "Cells", "content": "Describe a cell.", "assignment_type": "Essay"}
+CLASS_INFO = {"class_name": "Biology", "learning_goal": "Explain structure"}
+
+
+def test_group_b_students_share_one_generation(monkeypatch):
+    calls = _setup(monkeypatch)
+
+    first = helpers.generate_assignment_modification_suggestions(
+        {"group_type": "B", "strengths": ["art"]}, ASSIGNMENT, CLASS_INFO
+    )
+    first["learning_pathways"][0]["internal_id"] = "opt_1"
+    second = helpers.generate_assignment_modification_suggestions(
+        {"group_type": "B", "strengths": ["music"]}, ASSIGNMENT, CLASS_INFO
+    )
+
+    assert len(calls) == 1
+    assert "internal_id" not in second["learning_pathways"][0]
+
+
+def test_group_a_profiles_are_keyed_separately(monkeypatch):
+    calls = _setup(monkeypatch)
+    profile = {"group_type": "A", "reading_level": "3", "strengths": ["art"]}
+
+    helpers.generate_assignment_modification_suggestions(profile, ASSIGNMENT, CLASS_INFO)
+    helpers.generate_assignment_modification_suggestions(dict(profile), ASSIGNMENT, CLASS_INFO)
+    helpers.generate_assignment_modification_suggestions(dict(profile, reading_level="5"), ASSIGNMENT, CLASS_INFO)
+
+    assert len(calls) == 2
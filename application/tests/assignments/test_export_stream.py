@@ -0,0 +1,93 @@
+import io
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+
+from application.features.assignments.crud import assignment_export
+from application.services.docx_render_pool import DocxRenderPool
+
+
+def _export_data(student_id):
+    return {
+        "student": {"id": student_id, "first_name": "Ada", "last_name": "L"},
+        "classes": [],
+        "assignments": [{
+            "assignment_id": 7,
+            "title": "Essay: draft",
+            "content": None,
+            "html_content": "<p>original</p>",
+            "class_info": None,
+            "versions": [
+                {"version_number": 1, "final_generated_content": {"html_content": "<p>v1</p>"}},
+                {"version_number": 2, "finalized": True, "rating_data": {"difficulty": 3},
+                 "final_generated_content": {"html_content": "<p>v2</p>"}},
+            ],
+        }],
+        "export_metadata": {"total_assignments": 1},
+    }
+
+
+@pytest.fixture
+def fake_sources(monkeypatch):
+    rendered = []
+
+    def render(html):
+        rendered.append(html)
+        return f"docx:{html}".encode()
+
+    monkeypatch.setattr(assignment_export, "export_student_assignments_json",
+                        lambda student_id, assignment_ids=None: _export_data(student_id))
+    monkeypatch.setattr(assignment_export, "get_html_content_from_version_document",
+                        lambda version: version["final_generated_content"]["html_content"])
+    monkeypatch.setattr(assignment_export, "convert_html_to_word_bytes", render)
+    # The fake renderer cannot be sent to worker processes
+    monkeypatch.setattr(assignment_export, "get_docx_render_pool", lambda: DocxRenderPool(workers=0))
+    monkeypatch.setattr(assignment_export, "get_complete_profile",
+                        lambda student_id: {"student_id": student_id, "first_name": "Ada", "last_name": "L"})
+    return rendered
+
+
+def _read(chunks):
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_student_download_renders_lazily_and_streams(fake_sources):
+    stream = assignment_export.export_student_assignments_download(5)
+    # Nothing is rendered until the response starts reading
+    assert fake_sources == []
+
+    with _read(stream) as archive:
+        folder = "assignments/assignment_7_Essay_ draft"
+        assert archive.read(f"{folder}/original_assignment.docx") == b"docx:<p>original</p>"
+        assert archive.read(f"{folder}/version_2_finalized.docx") == b"docx:<p>v2</p>"
+        assert b"Version 2 (FINALIZED)" in archive.read(f"{folder}/ratings.txt")
+        assert "student_info.txt" in archive.namelist()
+
+
+def test_all_students_export_has_a_folder_per_student(fake_sources, monkeypatch):
+    from application.features.students import crud as students_crud
+
+    monkeypatch.setattr(students_crud, "fetch_all_students_with_names", lambda: [
+        {"id": 1, "first_name": "Ada", "last_name": "L"},
+        {"id": 2, "first_name": "Bo", "last_name": "K"},
+    ])
+
+    with _read(assignment_export.export_all_students_complete_data()) as archive:
+        names = archive.namelist()
+        assert "student_1_Ada_L/student_profile.json" in names
+        assert "student_2_Bo_K/assignments/assignment_7_Essay_ draft/version_1.docx" in names
+        assert names[-2:] == ["export_summary.csv", "export_metadata.txt"]
+        assert b"1,Ada,L" in archive.read("export_summary.csv")
+
+    # Original plus two versions per student, each rendered exactly once
+    assert len(fake_sources) == 6
+
+
+def test_missing_students_fail_before_streaming(monkeypatch):
+    from application.features.students import crud as students_crud
+
+    monkeypatch.setattr(students_crud, "fetch_all_students_with_names", lambda: [])
+    with pytest.raises(HTTPException) as error:
+        assignment_export.export_all_students_complete_data()
+    assert error.value.status_code == 404
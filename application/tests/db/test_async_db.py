@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from application.database.async_db import get_db_executor_stats, run_db
+
+
+def test_run_db_does_not_block_event_loop():
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        thread_name = await run_db(lambda: (time.sleep(0.2), threading.current_thread().name)[1])
+        task.cancel()
+        return ticks, thread_name
+
+    ticks, thread_name = asyncio.run(main())
+    assert ticks >= 5
+    assert thread_name.startswith("db")
+
+
+def test_run_db_propagates_exceptions_and_kwargs():
+    def lookup(record_id, missing=False):
+        if missing:
+            raise HTTPException(status_code=404, detail="Not found")
+        return {"id": record_id}
+
+    assert asyncio.run(run_db(lookup, 7)) == {"id": 7}
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run_db(lookup, 7, missing=True))
+    assert exc.value.status_code == 404
+
+
+def test_executor_stats_settle_after_calls():
+    async def main():
+        await asyncio.gather(*(run_db(time.sleep, 0.01) for _ in range(20)))
+
+    before = get_db_executor_stats()["submitted"]
+    asyncio.run(main())
+    stats = get_db_executor_stats()
+
+    assert stats["submitted"] == before + 20
+    assert stats["running"] == 0
+    assert stats["queued"] == 0
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pyodbc
+import pytest
+
+from application.database.mssql_connection import PoolTimeoutError, SqlConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.autocommit = False
+        self.rollbacks = 0
+        self.alive = True
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def execute(self, *args):
+                if not conn.alive:
+                    raise pyodbc.OperationalError("connection lost")
+
+            def fetchone(self):
+                return (1,)
+
+            def close(self):
+                pass
+
+        return Cursor()
+
+    def rollback(self):
+        if not self.alive:
+            raise pyodbc.OperationalError("connection lost")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def connect():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    return SqlConnectionPool(connect, **kwargs), created
+
+
+def test_connections_are_reused():
+    pool, created = make_pool(max_size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(created) == 1
+    assert first.rollbacks == 2
+    assert pool.stats()["created"] == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_acquire_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, acquire_timeout=0.05)
+
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+
+    assert pool.stats()["timeouts"] == 1
+    assert pool.stats()["in_use"] == 0
+
+
+def test_waiter_receives_released_connection():
+    pool, created = make_pool(max_size=1, acquire_timeout=2)
+    entry = pool.acquire()
+    received = []
+
+    def borrower():
+        with pool.connection() as conn:
+            received.append(conn)
+
+    thread = threading.Thread(target=borrower)
+    thread.start()
+    time.sleep(0.05)
+    assert pool.stats()["waiting"] == 1
+
+    pool.release(entry)
+    thread.join(timeout=2)
+
+    assert received == [created[0]]
+    assert len(created) == 1
+
+
+def test_idle_and_lifetime_expiry_recycle_connections():
+    pool, created = make_pool(max_size=1, max_idle_seconds=0)
+
+    with pool.connection():
+        pass
+    with pool.connection():
+        pass
+
+    assert len(created) == 2
+    assert created[0].closed
+    assert pool.stats()["recycled"] == 1
+
+
+def test_dead_connection_is_replaced_after_failed_ping():
+    pool, created = make_pool(max_size=1, ping_after_seconds=0)
+
+    with pool.connection():
+        pass
+    created[0].alive = False
+    with pool.connection() as conn:
+        assert conn is created[1]
+
+    assert created[0].closed
+
+
+def test_close_rejects_new_acquisitions():
+    pool, created = make_pool(max_size=1)
+    with pool.connection():
+        pass
+
+    pool.close()
+
+    assert created[0].closed
+    with pytest.raises(pyodbc.OperationalError):
+        pool.acquire()
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from application.features.gpt.openai_client import ConcurrencyLimiter, ConnectionCounter
+
+
+def test_limiter_caps_concurrent_requests():
+    limiter = ConcurrencyLimiter(2)
+
+    def call():
+        with limiter.slot():
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = limiter.stats()
+    assert stats["peak_in_flight"] == 2
+    assert stats["acquired"] == 6
+    assert stats["waited"] >= 4
+    assert stats["in_flight"] == 0
+
+
+def test_cancelled_async_wait_does_not_leak_a_slot():
+    limiter = ConcurrencyLimiter(1)
+
+    async def scenario():
+        async def hold():
+            async with limiter.slot_async():
+                await asyncio.sleep(0.1)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+
+        async def wait_for_slot():
+            async with limiter.slot_async():
+                pass
+
+        waiter = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await holder
+        await asyncio.sleep(0.05)
+
+        async with limiter.slot_async():
+            return limiter.stats()["in_flight"]
+
+    assert asyncio.run(scenario()) == 1
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_async_waiters_do_not_occupy_threads_and_share_the_cap_with_threads():
+    limiter = ConcurrencyLimiter(1)
+    release = threading.Event()
+
+    def hold_in_thread():
+        with limiter.slot():
+            release.wait()
+
+    holder = threading.Thread(target=hold_in_thread)
+    holder.start()
+    time.sleep(0.05)
+
+    async def scenario():
+        async def call():
+            async with limiter.slot_async():
+                await asyncio.sleep(0)
+
+        threads_before = threading.active_count()
+        tasks = [asyncio.create_task(call()) for _ in range(50)]
+        await asyncio.sleep(0.05)
+        waiting = limiter.stats()["waiting"], threading.active_count() - threads_before
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return waiting
+
+    assert asyncio.run(scenario()) == (50, 0)
+    holder.join()
+    stats = limiter.stats()
+    assert stats["peak_in_flight"] == 1 and stats["acquired"] == 51
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connection_counter_sees_keep_alive_reuse():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    counter = ConnectionCounter()
+    try:
+        with httpx.Client(event_hooks={"request": [counter.on_request]}) as client:
+            for _ in range(3):
+                client.get(f"http://127.0.0.1:{server.server_port}/")
+    finally:
+        server.shutdown()
+
+    assert counter.stats() == {"requests": 3, "connections_opened": 1, "reuse_rate": 0.667}
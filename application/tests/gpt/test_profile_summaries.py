@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from application.features.gpt import crud
+
+
+def _slow(label):
+    def summarize(value):
+        time.sleep(0.2)
+        return f"{label}:{value}"
+    return summarize
+
+
+@pytest.fixture
+def slow_summaries(monkeypatch):
+    monkeypatch.setattr(crud, "summarize_strengths", _slow("strengths"))
+    monkeypatch.setattr(crud, "summarize_short_term_goals", _slow("short"))
+    monkeypatch.setattr(crud, "summarize_long_term_goals", _slow("long"))
+    monkeypatch.setattr(crud, "summarize_best_ways_to_learn", _slow("help"))
+    monkeypatch.setattr(crud, "generate_vision_statement", _slow("vision"))
+
+
+def test_all_summaries_run_concurrently(slow_summaries):
+    start = time.monotonic()
+    result = crud.generate_profile_summaries(
+        strengths=["kind"],
+        short_term_goals="read",
+        long_term_goals="graduate",
+        best_ways_to_help="examples",
+        vision_source="profile",
+    )
+    elapsed = time.monotonic() - start
+
+    assert result == {
+        "strength_short": "strengths:['kind']",
+        "short_term_goals": "short:read",
+        "long_term_goals": "long:graduate",
+        "best_ways_to_help": "help:examples",
+        "vision": "vision:profile",
+    }
+    assert elapsed < 0.6
+
+
+def test_only_requested_summaries_run(slow_summaries):
+    result = crud.generate_profile_summaries(short_term_goals="read", vision_source="profile")
+    assert set(result) == {"short_term_goals", "vision"}
+
+
+def test_failure_is_raised(monkeypatch, slow_summaries):
+    def boom(value):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(crud, "summarize_long_term_goals", boom)
+
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        crud.generate_profile_summaries(strengths=["kind"], long_term_goals="graduate")
+
+
+def test_unchanged_input_is_served_from_cache(monkeypatch):
+    from application.services.content_cache import ContentCache, MemoryCacheTier
+
+    monkeypatch.setattr(crud, "_summary_cache", ContentCache("test", MemoryCacheTier(10, 60)))
+    calls = []
+
+    def fake_prompt(prompt, model=None):
+        calls.append(prompt)
+        return "I am kind."
+
+    monkeypatch.setattr(crud, "process_gpt_prompt", fake_prompt)
+
+    assert crud.summarize_strengths(["kind", "curious"]) == "I am kind."
+    assert crud.summarize_strengths(["kind",  " curious "]) == "I am kind."
+    assert len(calls) == 1
+
+    crud.summarize_strengths(["kind"])
+    assert len(calls) == 2
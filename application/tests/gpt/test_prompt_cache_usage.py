@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+from application.features.gpt.gpt_connection import get_prompt_cache_stats, record_prompt_cache_usage
+
+
+def test_cached_tokens_are_counted_for_both_apis():
+    before = get_prompt_cache_stats()
+
+    # Chat Completions usage
+    record_prompt_cache_usage(SimpleNamespace(
+        prompt_tokens=9000, prompt_tokens_details=SimpleNamespace(cached_tokens=8192)
+    ))
+    # Responses API usage
+    record_prompt_cache_usage(SimpleNamespace(
+        input_tokens=1000, input_tokens_details=SimpleNamespace(cached_tokens=0)
+    ))
+    record_prompt_cache_usage(None)
+
+    after = get_prompt_cache_stats()
+    assert after["calls"] - before["calls"] == 2
+    assert after["calls_with_cached_tokens"] - before["calls_with_cached_tokens"] == 1
+    assert after["prompt_tokens"] - before["prompt_tokens"] == 10000
+    assert after["cached_tokens"] - before["cached_tokens"] == 8192
+    assert 0 < after["cached_token_rate"] <= 1
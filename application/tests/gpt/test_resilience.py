@@ -0,0 +1,169 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from application.features.gpt import resilience
+from application.features.gpt.openai_client import ConcurrencyLimiter
+from application.features.gpt.resilience import CircuitBreaker, ModelUnavailableError, ResilientCaller
+
+
+def _error(cls, status, headers=None, body=None):
+    response = httpx.Response(status, headers=headers or {}, request=httpx.Request("POST", "https://api.test/v1"))
+    return cls("upstream said no", response=response, body=body)
+
+
+def _caller(failure_threshold=5, reset_seconds=30, max_retries=4):
+    return ResilientCaller(
+        CircuitBreaker(failure_threshold, reset_seconds), max_retries=max_retries, limiter=ConcurrencyLimiter(4)
+    )
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "OPENAI_BACKOFF_BASE_SECONDS", 0.001)
+
+
+def _flaky(errors, result="ok"):
+    calls = []
+
+    def func(timeout):
+        calls.append(timeout)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return func, calls
+
+
+def test_retries_rate_limits_and_server_errors_then_succeeds():
+    caller = _caller()
+    func, calls = _flaky([
+        _error(openai.RateLimitError, 429, {"retry-after-ms": "5"}),
+        _error(openai.InternalServerError, 503),
+    ])
+
+    assert caller.call(func, call_type="summary") == "ok"
+    assert len(calls) == 3
+    stats = caller.stats()
+    assert stats["retries"] == 2
+    assert stats["retries_by_reason"] == {"rate_limited": 1, "server_error": 1}
+    assert stats["circuit"]["state"] == "closed"
+
+
+def test_client_errors_are_not_retried():
+    caller = _caller()
+    func, calls = _flaky([_error(openai.BadRequestError, 400)])
+
+    with pytest.raises(openai.BadRequestError):
+        caller.call(func)
+    assert len(calls) == 1
+
+    quota, calls = _flaky([_error(openai.RateLimitError, 429, body={"code": "insufficient_quota"})])
+    with pytest.raises(openai.RateLimitError):
+        caller.call(quota)
+    assert len(calls) == 1
+
+
+def test_retry_after_beyond_deadline_fails_fast(monkeypatch):
+    monkeypatch.setitem(resilience.CALL_DEADLINES, "summary", 1)
+    caller = _caller()
+    func, calls = _flaky([_error(openai.RateLimitError, 429, {"retry-after": "30"})])
+
+    with pytest.raises(ModelUnavailableError) as exc:
+        caller.call(func, call_type="summary")
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "30"
+    assert len(calls) == 1
+    assert caller.stats()["deadline_exceeded"] == 1
+
+
+def test_circuit_opens_rejects_and_recovers(monkeypatch):
+    caller = _caller(failure_threshold=2, reset_seconds=0.05, max_retries=0)
+    failing, _ = _flaky([_error(openai.InternalServerError, 500)] * 2)
+
+    for _ in range(2):
+        with pytest.raises(ModelUnavailableError):
+            caller.call(failing)
+
+    healthy, calls = _flaky([])
+    with pytest.raises(ModelUnavailableError, match="temporarily unavailable"):
+        caller.call(healthy)
+    assert calls == []
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert caller.call(healthy) == "ok"
+    circuit = caller.stats()["circuit"]
+    assert circuit == {"state": "closed", "consecutive_failures": 0, "trips": 1, "rejected": 1}
+
+
+def test_async_calls_retry_connection_errors():
+    caller = _caller()
+    attempts = []
+
+    async def func(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.test/v1"))
+        return "streamed"
+
+    assert asyncio.run(caller.acall(func, call_type="stream")) == "streamed"
+    assert caller.stats()["retries_by_reason"] == {"connection": 1}
+    assert attempts[0].read <= resilience.CALL_DEADLINES["stream"]
+
+
+def test_throttling_burst_does_not_open_the_circuit():
+    caller = _caller(failure_threshold=5)
+    attempts = {}
+
+    async def throttled_once(name):
+        async def func(timeout):
+            attempts[name] = attempts.get(name, 0) + 1
+            if attempts[name] == 1:
+                raise _error(openai.RateLimitError, 429, {"retry-after-ms": "5"})
+            return name
+        return await caller.acall(func, call_type="summary")
+
+    async def burst():
+        return await asyncio.gather(*(throttled_once(i) for i in range(6)))
+
+    assert asyncio.run(burst()) == list(range(6))
+    stats = caller.stats()
+    assert stats["circuit"]["state"] == "closed" and stats["circuit"]["consecutive_failures"] == 0
+    assert stats["failures"] == 0
+
+    # A call that is only ever throttled fails, but does not count against the upstream
+    throttled, _ = _flaky([_error(openai.RateLimitError, 429, {"retry-after-ms": "1"})] * 5)
+    with pytest.raises(ModelUnavailableError):
+        caller.call(throttled)
+    assert caller.stats()["circuit"]["consecutive_failures"] == 0
+
+
+def test_each_call_counts_once_and_retries_are_not_cut_short():
+    caller = _caller(failure_threshold=2, max_retries=3)
+    failing, calls = _flaky([_error(openai.InternalServerError, 500)] * 4)
+
+    with pytest.raises(ModelUnavailableError):
+        caller.call(failing)
+    assert len(calls) == 4
+    assert caller.stats()["circuit"]["consecutive_failures"] == 1
+
+    # Another call trips the circuit while this one is between retries; it still finishes
+    breaker = caller.breaker
+    recovering, calls = _flaky([_error(openai.InternalServerError, 500)])
+
+    def trip_then_recover(timeout):
+        if not calls:
+            breaker.record_failure()
+        return recovering(timeout)
+
+    assert caller.call(trip_then_recover) == "ok"
+
+    healthy, _ = _flaky([])
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(ModelUnavailableError):
+        caller.call(healthy)
+    assert caller.stats()["failures"] == 2
@@ -0,0 +1,67 @@
+import pytest
+
+from application.features.gpt import gpt_connection, token_budget
+
+
+class CharEncoder:
+    """One token per character, so budgets are easy to reason about offline."""
+
+    def encode(self, text, disallowed_special=()):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+@pytest.fixture(autouse=True)
+def char_tokens(monkeypatch):
+    monkeypatch.setattr(token_budget, "get_encoder", lambda model: CharEncoder())
+    monkeypatch.setitem(token_budget.MODEL_LIMITS, "tiny", {"context": 1000, "max_output": 200})
+    monkeypatch.setattr(token_budget, "PROMPT_TOKEN_MARGIN", 0)
+    monkeypatch.setattr(token_budget, "MIN_OUTPUT_TOKENS", 50)
+    token_budget.count_static_tokens.cache_clear()
+    yield
+    token_budget.count_static_tokens.cache_clear()
+
+
+def test_model_limits_use_longest_prefix():
+    assert token_budget.model_limits("gpt-4o-mini")["context"] == 128000
+    assert token_budget.model_limits("gpt-4.1-nano")["max_output"] == 32768
+    assert token_budget.model_limits("tiny-2")["context"] == 1000
+    assert token_budget.model_limits("unknown") == token_budget.FALLBACK_LIMITS
+
+
+def test_output_allowance_shrinks_before_failing():
+    assert token_budget.output_tokens_for(100, "tiny", 500) == 200
+    assert token_budget.output_tokens_for(900, "tiny", 150) == 100
+    with pytest.raises(ValueError):
+        token_budget.output_tokens_for(980, "tiny", 150)
+
+
+def test_oversized_content_is_shortened_to_fit():
+    values = {"assignment_title": "t" * 50, "assignment_content": "a" * 600 + "z" * 600}
+
+    fitted, prompt_tokens = token_budget.fit_values(300, values, "tiny", 200, "assignment_content")
+
+    content = fitted["assignment_content"]
+    assert prompt_tokens == 1000 - 200
+    assert fitted["assignment_title"] == values["assignment_title"]
+    assert len(content) == 1000 - 200 - 300 - 50
+    assert token_budget.TRUNCATION_NOTICE in content
+    assert content.startswith("a") and content.endswith("z")
+
+
+def test_content_that_fits_is_untouched():
+    values = {"assignment_content": "short", "assignment_title": "t" * 10}
+    fitted, prompt_tokens = token_budget.fit_values(300, values, "tiny", 200, "assignment_content")
+    assert fitted is values
+    assert prompt_tokens == 300 + 5 + 10
+    assert token_budget.fit_values(300, values, "tiny", 200, None) == (values, 315)
+
+
+def test_known_prompt_count_is_not_encoded_again(monkeypatch):
+    def no_encoding(text, model):
+        raise AssertionError("prompt was counted again")
+
+    monkeypatch.setattr(gpt_connection, "_count_tokens", no_encoding)
+    assert gpt_connection._max_output_tokens_for("x" * 900, "tiny", 150, "system", prompt_tokens=900) == 100
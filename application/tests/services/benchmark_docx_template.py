@@ -0,0 +1,35 @@
+"""
+Micro-benchmark of the fixed cost of creating a Word document, before any content
+is added: python-docx's Document() against new_document()'s template copy.
+
+Not part of the test suite, since wall-clock timings are unreliable under load. Run
+from the repository root:
+
+    python -m application.tests.services.benchmark_docx_template [runs]
+"""
+import sys
+import time
+
+from docx import Document
+
+from application.services.docx_rendering import new_document
+
+
+def per_document_ms(make, runs: int) -> float:
+    make()
+    started = time.perf_counter()
+    for _ in range(runs):
+        make()
+    return (time.perf_counter() - started) / runs * 1000
+
+
+def main(runs: int = 200):
+    baseline_ms = per_document_ms(Document, runs)
+    template_ms = per_document_ms(new_document, runs)
+    print(f"fixed cost per document over {runs} runs:")
+    print(f"  Document()      {baseline_ms:6.2f} ms")
+    print(f"  new_document()  {template_ms:6.2f} ms  ({baseline_ms / template_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
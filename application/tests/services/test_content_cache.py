@@ -0,0 +1,86 @@
+import threading
+import time
+
+from application.services.content_cache import ContentCache, MemoryCacheTier, make_cache_key
+
+
+class DictTier:
+    def __init__(self):
+        self.items = {}
+
+    def get(self, key):
+        return self.items.get(key)
+
+    def set(self, key, value):
+        self.items[key] = value
+
+
+def test_key_ignores_whitespace_but_not_prompt_or_model():
+    base = make_cache_key("summarize", "I like  reading\n", "1", "gpt-4o")
+
+    assert make_cache_key("summarize", " I like reading", "1", "gpt-4o") == base
+    assert make_cache_key("summarize", "I like writing", "1", "gpt-4o") != base
+    assert make_cache_key("summarize", "I like reading", "2", "gpt-4o") != base
+    assert make_cache_key("summarize", "I like reading", "1", "gpt-4.1") != base
+    assert make_cache_key("vision", "I like reading", "1", "gpt-4o") != base
+
+
+def test_lru_eviction_and_ttl():
+    tier = MemoryCacheTier(max_entries=2, ttl_seconds=0.05)
+    tier.set("a", 1)
+    tier.set("b", 2)
+    tier.get("a")
+    tier.set("c", 3)
+
+    assert tier.get("b") is None
+    assert tier.get("a") == 1
+    assert tier.evictions == 1
+
+    time.sleep(0.06)
+    assert tier.get("a") is None
+    assert tier.expirations == 1
+
+
+def test_get_or_compute_uses_persistent_tier():
+    persistent = DictTier()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "summary"
+
+    first = ContentCache("test", MemoryCacheTier(10, 60), persistent)
+    assert first.get_or_compute("k", compute) == "summary"
+    assert first.get_or_compute("k", compute) == "summary"
+
+    # A fresh process only has the persistent tier
+    second = ContentCache("test", MemoryCacheTier(10, 60), persistent)
+    assert second.get_or_compute("k", compute) == "summary"
+
+    assert len(calls) == 1
+    assert first.stats()["hits"] == 1
+    assert second.stats()["persistent_hits"] == 1
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ContentCache("test", MemoryCacheTier(max_entries=10, ttl_seconds=60))
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+    assert cache.stats()["coalesced"] == 4
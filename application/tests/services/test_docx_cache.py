@@ -0,0 +1,76 @@
+import os
+
+from application.services import docx_cache
+from application.services.docx_cache import BlobCacheTier, DiskCacheTier, DocxCache, make_docx_cache_key
+from application.services.docx_render_pool import DocxRenderPool
+from application.services.docx_rendering import convert_html_to_word_bytes, render_titled_html_to_word_bytes
+
+
+class InMemoryBlobTier(BlobCacheTier):
+    def __init__(self):
+        super().__init__("docx-cache", connection_string="unused")
+        self.blobs = {}
+
+    def get(self, key):
+        return self.blobs.get(key)
+
+    def set(self, key, value):
+        self.blobs[key] = value
+
+
+def test_keys_cover_renderer_arguments_and_version(monkeypatch):
+    key = make_docx_cache_key(convert_html_to_word_bytes, ("<p>a</p>",))
+
+    assert key == make_docx_cache_key(convert_html_to_word_bytes, ("<p>a</p>",))
+    assert key != make_docx_cache_key(convert_html_to_word_bytes, ("<p>b</p>",))
+    assert key != make_docx_cache_key(render_titled_html_to_word_bytes, ("<p>a</p>", "Title"))
+
+    monkeypatch.setattr(docx_cache, "DOCX_RENDERER_VERSION", "next")
+    assert key != make_docx_cache_key(convert_html_to_word_bytes, ("<p>a</p>",))
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    tier = DiskCacheTier(str(tmp_path), max_bytes=25)
+    tier.set("a", b"x" * 10)
+    tier.set("b", b"y" * 10)
+    assert tier.get("a") == b"x" * 10
+
+    tier.set("c", b"z" * 10)
+
+    assert tier.get("b") is None
+    assert tier.get("a") and tier.get("c")
+    assert tier.evictions == 1 and tier.total_bytes == 20
+    assert sorted(os.listdir(tmp_path)) == ["a.docx", "c.docx"]
+
+    # A new process picks up what is already on disk
+    assert len(DiskCacheTier(str(tmp_path), max_bytes=25)) == 2
+
+
+def test_repeat_renders_are_served_from_the_cache(tmp_path):
+    renders = []
+
+    def render(html):
+        renders.append(html)
+        return f"docx:{html}".encode()
+
+    cache = DocxCache(DiskCacheTier(str(tmp_path), max_bytes=1024))
+    pool = DocxRenderPool(workers=0, cache=cache)
+
+    assert pool.render(render, "<p>v1</p>") == b"docx:<p>v1</p>"
+    assert list(pool.render_many([(render, ("<p>v1</p>",)), (render, ("<p>v2</p>",))])) == \
+        [b"docx:<p>v1</p>", b"docx:<p>v2</p>"]
+
+    assert renders == ["<p>v1</p>", "<p>v2</p>"]
+    assert cache.stats()["hits"] == 1
+    assert pool.stats()["submitted"] == 2
+
+
+def test_blob_tier_fills_an_empty_disk(tmp_path):
+    blob = InMemoryBlobTier()
+    DocxCache(DiskCacheTier(str(tmp_path / "first"), max_bytes=1024), blob).set("k", b"doc")
+
+    # Another instance with its own disk finds the document in blob storage
+    other = DocxCache(DiskCacheTier(str(tmp_path / "second"), max_bytes=1024), blob)
+    assert other.get("k") == b"doc"
+    assert other.get("k") == b"doc"
+    assert other.stats()["blob_hits"] == 1 and other.stats()["hits"] == 1
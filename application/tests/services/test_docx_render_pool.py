@@ -0,0 +1,67 @@
+import io
+import time
+
+import pytest
+from docx import Document
+
+from application.services.docx_render_pool import DocxRenderError, DocxRenderPool
+from application.services.docx_rendering import convert_html_to_word_bytes, render_text_to_word_bytes
+
+
+def _text(docx_bytes):
+    return "\n".join(p.text for p in Document(io.BytesIO(docx_bytes)).paragraphs)
+
+
+def test_worker_processes_render_in_order():
+    pool = DocxRenderPool(workers=2, max_pending=4, timeout=60)
+    try:
+        jobs = [(convert_html_to_word_bytes, (f"<h2>Version {i}</h2><p>Body {i}</p>",)) for i in range(6)]
+        jobs.append((render_text_to_word_bytes, ("Original", "Plain text")))
+
+        results = list(pool.render_many(jobs, window=3))
+
+        assert [_text(result).split("\n")[0] for result in results[:6]] == [f"Version {i}" for i in range(6)]
+        assert _text(results[-1]) == "Original\nPlain text"
+        stats = pool.stats()
+        assert stats["completed"] == 7 and stats["pending"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_inline_mode_runs_in_the_calling_thread():
+    calls = []
+    pool = DocxRenderPool(workers=0, max_pending=2)
+
+    def render(html):
+        calls.append(html)
+        return html.encode()
+
+    results = pool.render_many((render, (f"<p>{i}</p>",)) for i in range(5))
+    assert calls == []
+    assert list(results) == [f"<p>{i}</p>".encode() for i in range(5)]
+    assert pool.stats()["completed"] == 5
+
+
+def test_render_errors_reach_the_caller_and_free_the_slot():
+    pool = DocxRenderPool(workers=0, max_pending=1)
+
+    def broken(html):
+        raise ValueError("bad html")
+
+    with pytest.raises(ValueError):
+        pool.render(broken, "<p>")
+
+    assert pool.render(lambda html: b"ok", "<p>") == b"ok"
+    assert pool.stats()["failed"] == 1
+
+
+def test_slow_renders_time_out():
+    pool = DocxRenderPool(workers=1, max_pending=1, timeout=0.5)
+    try:
+        started = time.monotonic()
+        with pytest.raises(DocxRenderError):
+            pool.render(time.sleep, 3)
+        assert time.monotonic() - started < 2.5
+        assert pool.stats()["timed_out"] == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,52 @@
+import io
+
+from docx import Document
+
+from application.services import docx_rendering
+from application.services.docx_rendering import (
+    DocumentStyles,
+    convert_html_to_word_bytes,
+    new_document,
+    render_titled_html_to_word_bytes,
+)
+
+
+def test_template_copies_are_independent():
+    first = new_document()
+    first.add_paragraph("only in the first")
+
+    second = new_document()
+    assert [p.text for p in second.paragraphs] == []
+    assert [s.name for s in second.styles] == [s.name for s in Document().styles]
+
+
+def test_reading_the_template_does_not_empty_later_documents():
+    new_document().paragraphs
+    template = docx_rendering._base_package.main_document_part.document
+    assert template.paragraphs == [] and len(template.sections) == 1
+
+    doc = Document(io.BytesIO(convert_html_to_word_bytes("<h2>Plan</h2><p>Still here</p>")))
+    assert [p.text for p in doc.paragraphs] == ["Plan", "Still here"]
+
+
+def test_style_lookups_resolve_once_per_document():
+    doc = new_document()
+    styles = DocumentStyles(doc)
+
+    assert styles["List Bullet 2"] is styles["List Bullet 2"]
+    assert doc.add_paragraph("item", style=styles["List Number"]).style.name == "List Number"
+
+
+def test_rendered_lists_keep_their_styles():
+    html = "<h2>Plan</h2><ol><li>Read</li></ol><ul><li>Timer</li></ul><pre>[NOTES]</pre>"
+    doc = Document(io.BytesIO(convert_html_to_word_bytes(html)))
+    assert [(p.text, p.style.name) for p in doc.paragraphs] == [
+        ("Plan", "Heading 2"),
+        ("Read", "List Number"),
+        ("Timer", "List Bullet"),
+        ("[NOTES]", "Normal"),
+    ]
+
+    titled = Document(io.BytesIO(render_titled_html_to_word_bytes("<ol><li>Step</li></ol>", "Essay")))
+    assert [(p.text, p.style.name) for p in titled.paragraphs] == [("Essay", "Title"), ("Step", "List Number")]
+
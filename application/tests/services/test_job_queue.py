@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from application.services import job_queue
+from application.services.job_queue import (
+    JOB_FAILED,
+    JOB_SUCCEEDED,
+    InMemoryJobStore,
+    JobQueue,
+    JobQueueFullError,
+)
+
+
+def wait_for(queue, job_id, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in (JOB_SUCCEEDED, JOB_FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_result_is_recorded():
+    queue = JobQueue(InMemoryJobStore(), workers=1, max_queue=5)
+    try:
+        job = queue.submit("test", lambda a, b=0: {"sum": a + b}, 2, b=3, owner_id=7)
+        assert job["status"] == "queued"
+
+        done = wait_for(queue, job["id"])
+        assert done["status"] == JOB_SUCCEEDED
+        assert done["result"] == {"sum": 5}
+        assert done["owner_id"] == 7
+        assert done["started_at"] and done["finished_at"]
+    finally:
+        queue.shutdown()
+
+
+def test_http_errors_are_recorded_on_the_job():
+    def fail():
+        raise HTTPException(status_code=404, detail="Version document not found")
+
+    queue = JobQueue(InMemoryJobStore(), workers=1, max_queue=5)
+    try:
+        done = wait_for(queue, queue.submit("test", fail)["id"])
+        assert done["status"] == JOB_FAILED
+        assert done["error"] == {"status_code": 404, "detail": "Version document not found"}
+        assert queue.stats()["failed"] == 1
+    finally:
+        queue.shutdown()
+
+
+def test_queue_rejects_beyond_capacity_and_tracks_wait():
+    release = threading.Event()
+    queue = JobQueue(InMemoryJobStore(), workers=1, max_queue=2)
+    try:
+        first = queue.submit("test", release.wait)
+        time.sleep(0.05)  # let the worker pick up the first job
+        queue.submit("test", lambda: None)
+        queue.submit("test", lambda: None)
+
+        with pytest.raises(JobQueueFullError):
+            queue.submit("test", lambda: None)
+
+        stats = queue.stats()
+        assert stats["queue_depth"] == 2
+        assert stats["running"] == 1
+        assert stats["rejected"] == 1
+
+        time.sleep(0.05)
+        release.set()
+        wait_for(queue, first["id"])
+    finally:
+        queue.shutdown()
+
+    stats = queue.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["succeeded"] == 3
+    assert stats["max_wait_seconds"] >= 0.05
+
+
+def test_unstarted_jobs_fail_on_shutdown():
+    release = threading.Event()
+    queue = JobQueue(InMemoryJobStore(), workers=1, max_queue=5)
+    queue.submit("test", release.wait)
+    time.sleep(0.05)
+    pending = queue.submit("test", lambda: None)
+
+    release.set()
+    queue.shutdown()
+
+    job = queue.get(pending["id"])
+    assert job["status"] in (JOB_FAILED, JOB_SUCCEEDED)
+    if job["status"] == JOB_FAILED:
+        assert job["error"]["status_code"] == 503
+    assert queue.stats()["queue_depth"] == 0
+
+
+def test_finished_jobs_expire_from_memory_store():
+    store = InMemoryJobStore(retention_seconds=0)
+    store.create({"id": "a", "status": "queued"})
+    store.update("a", status=JOB_SUCCEEDED)
+    store.create({"id": "b", "status": "queued"})
+
+    assert store.get("a") is None
+    assert store.get("b")["status"] == "queued"
+
+
+class FlakyStore(InMemoryJobStore):
+    """Rejects the first `failures` outcome writes, and any write carrying an oversized result."""
+
+    def __init__(self, failures=0):
+        super().__init__()
+        self.failures = failures
+
+    def update(self, job_id, **fields):
+        if "finished_at" in fields:
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("store unavailable")
+            if fields.get("result") == "too large":
+                raise RuntimeError("request entity too large")
+        super().update(job_id, **fields)
+
+
+def test_outcome_writes_are_retried(monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_FINISH_RETRY_SECONDS", 0)
+    queue = JobQueue(FlakyStore(failures=2), workers=1, max_queue=5)
+    try:
+        done = wait_for(queue, queue.submit("test", lambda: "ok")["id"])
+        assert done["status"] == JOB_SUCCEEDED and done["result"] == "ok"
+    finally:
+        queue.shutdown()
+
+
+def test_unrecordable_outcome_still_finishes_the_job(monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_FINISH_RETRY_SECONDS", 0)
+    queue = JobQueue(FlakyStore(), workers=1, max_queue=5)
+    try:
+        done = wait_for(queue, queue.submit("test", lambda: "too large")["id"])
+        assert done["status"] == JOB_FAILED and done["result"] is None
+        assert done["error"]["status_code"] == 500
+        assert "request entity too large" in done["error"]["detail"]
+    finally:
+        queue.shutdown()
@@ -0,0 +1,95 @@
+from application.features.gpt import crud as gpt_crud
+from application.services.text_to_html import convert_text_to_html
+
+
+ASSIGNMENT_TEXT = """ESSAY ASSIGNMENT
+
+Write a 500 word essay about your favourite book.
+Use at least two sources.
+
+Steps:
+1. Pick a book
+2. Read it
+   carefully and take notes
+3. Write the essay
+
+Tips
+- Start early
+- Ask for help
+
+Due Friday."""
+
+
+def test_headings_lists_and_paragraphs():
+    html, confidence = convert_text_to_html(ASSIGNMENT_TEXT)
+
+    assert confidence == 1.0
+    assert html.split("\n") == [
+        "<p><strong>ESSAY ASSIGNMENT</strong></p>",
+        "<p>Write a 500 word essay about your favourite book.</p>",
+        "<p>Use at least two sources.</p>",
+        "<p><strong>Steps:</strong></p>",
+        "<ol><li>Pick a book</li><li>Read it carefully and take notes</li><li>Write the essay</li></ol>",
+        "<p><strong>Tips</strong></p>",
+        "<ul><li>Start early</li><li>Ask for help</li></ul>",
+        "<p>Due Friday.</p>",
+    ]
+
+
+def test_text_is_escaped_not_reworded():
+    html, _ = convert_text_to_html("Show that x < y & y > z.")
+    assert html == "<p>Show that x &lt; y &amp; y &gt; z.</p>"
+
+
+def test_each_line_is_a_paragraph_unless_it_was_wrapped():
+    html, _ = convert_text_to_html("Question 1\nWhat is 2+2?\nQuestion 2\nWhat is 3+3?")
+    assert html.split("\n") == ["<p>Question 1</p>", "<p>What is 2+2?</p>", "<p>Question 2</p>", "<p>What is 3+3?</p>"]
+
+    html, _ = convert_text_to_html("Name: ___\nDate: ___")
+    assert html == "<p>Name: ___</p>\n<p>Date: ___</p>"
+
+    wrapped = "Read the assigned chapter and write down three questions that you\nwould like to ask in class."
+    assert convert_text_to_html(wrapped)[0] == (
+        "<p>Read the assigned chapter and write down three questions that you would like to ask in class.</p>"
+    )
+
+
+def test_numbered_list_resumed_after_a_blank_line_keeps_its_numbers():
+    html, confidence = convert_text_to_html("1. a\n2. b\n\n3. c")
+    assert html == '<ol><li>a</li><li>b</li></ol>\n<ol start="3"><li>c</li></ol>'
+    assert confidence == 1.0
+
+
+def test_layouts_the_rules_cannot_represent_lower_confidence():
+    assert convert_text_to_html("Name    Points    Due\nEssay    10    Fri\nQuiz    5    Mon")[1] < 0.5
+    assert convert_text_to_html("a. First part\nb. Second part\n  i. Sub-question")[1] < 0.5
+    assert convert_text_to_html("1. One\n3. Three\n4. Four")[1] < 1.0
+    assert convert_text_to_html("- a\n  - nested b\n- c")[1] < 0.8
+    assert convert_text_to_html("1. Plan\n   - outline\n2. Draft")[1] < 0.8
+    assert convert_text_to_html("  - indented\n  - together")[1] == 1.0
+
+
+def test_model_is_only_called_for_low_confidence(monkeypatch):
+    calls = []
+
+    def fake_model(prompt, model, override_max_tokens):
+        calls.append(prompt)
+        return "<table>...</table>"
+
+    monkeypatch.setattr(gpt_crud, "process_gpt_prompt_html", fake_model)
+
+    assert gpt_crud.generate_html_from_text("Tips\n- Start early") == \
+        "<p><strong>Tips</strong></p>\n<ul><li>Start early</li></ul>"
+    assert calls == []
+
+    assert gpt_crud.generate_html_from_text("Name    Points    Due\nEssay    10    Fri") == "<table>...</table>"
+    assert len(calls) == 1
+
+
+def test_model_failure_falls_back_to_local_html(monkeypatch):
+    def failing(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(gpt_crud, "process_gpt_prompt_html", failing)
+    html = gpt_crud.generate_html_from_text("Name    Points    Due\nEssay    10    Fri")
+    assert html == "<p>Name    Points    Due</p>\n<p>Essay    10    Fri</p>"
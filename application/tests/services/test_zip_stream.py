@@ -0,0 +1,56 @@
+import io
+import zipfile
+
+from application.services.zip_stream import ERROR_ENTRY_NAME, prefix_entries, stream_zip
+
+
+def test_entries_are_streamed_one_by_one():
+    produced = []
+
+    def entries():
+        for i in range(3):
+            produced.append(i)
+            yield f"folder/file_{i}.txt", f"content {i}" * 100
+
+    chunks = []
+    for chunk in stream_zip(entries()):
+        # Each entry's bytes are sent before the next one is produced
+        chunks.append((len(produced), chunk))
+
+    assert [count for count, _ in chunks[:3]] == [1, 2, 3]
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunk for _, chunk in chunks))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["folder/file_0.txt", "folder/file_1.txt", "folder/file_2.txt"]
+        assert archive.read("folder/file_2.txt") == b"content 2" * 100
+
+
+def test_failure_mid_stream_still_produces_a_valid_archive():
+    def entries():
+        yield "first.txt", b"ok"
+        raise RuntimeError("database went away")
+
+    data = b"".join(stream_zip(entries()))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.namelist() == ["first.txt", ERROR_ENTRY_NAME]
+        assert b"database went away" in archive.read(ERROR_ENTRY_NAME)
+
+
+def test_prefixed_producers_nest_without_rezipping():
+    def student(name):
+        yield "profile.txt", name
+        yield "assignments/a.docx", b"docx"
+
+    def entries():
+        yield from prefix_entries("student_1", student("Ada"))
+        yield from prefix_entries("student_2", student("Bo"))
+        yield "export_summary.csv", "id\n1\n2\n"
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(entries())))) as archive:
+        assert archive.namelist() == [
+            "student_1/profile.txt", "student_1/assignments/a.docx",
+            "student_2/profile.txt", "student_2/assignments/a.docx",
+            "export_summary.csv",
+        ]
+        assert archive.read("student_2/profile.txt") == b"Bo"
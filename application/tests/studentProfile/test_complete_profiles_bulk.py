@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+
+from application.features.student_profile import crud
+
+
+DETAILS = [
+    # s.id, y.id, y.name, u.id, first, last, email, gt_email, picture, embed, edit, group
+    (1, 10, "Year 1", 100, "Ada", "L", "ada@x.com", "ada@gt.edu", None, None, None, "A"),
+    (2, None, None, 200, "Tom", "T", "tom@x.com", "tom@gt.edu", None, None, None, "B"),
+    (3, 10, "Year 1", 300, "Sam", "S", "sam@x.com", "sam@gt.edu", None, None, None, "A"),
+]
+CLASSES = [(1, 7, "Biology", "BIO101", "Pass"), (1, 8, "Art", "ART100", "Draw")]
+DOCS = [
+    {"student_id": 1, "strengths": ["Kind"], "summaries": {"strength_short": "Kind"}, "vision": "V"},
+    {"student_id": 2, "strengths": ["Fast"]},
+    {"student_id": 99, "strengths": ["Inactive"]},
+]
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+        self._rows = []
+
+    def execute(self, query, params=()):
+        self.log.append(query)
+        self._rows = CLASSES if "StudentClasses" in query else DETAILS
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class FakeConnection:
+    def __init__(self, log):
+        self.log = log
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+
+class FakeContainer:
+    def __init__(self):
+        self.queries = 0
+
+    def query_items(self, query, parameters=None, enable_cross_partition_query=False):
+        self.queries += 1
+        return iter(DOCS)
+
+
+def test_bulk_loader_joins_in_memory(monkeypatch):
+    log = []
+    container = FakeContainer()
+
+    @contextmanager
+    def fake_connection():
+        yield FakeConnection(log)
+
+    monkeypatch.setattr(crud, "get_sql_db_connection", fake_connection)
+    monkeypatch.setattr(crud, "get_container", lambda name: container)
+
+    profiles = {p["student_id"]: p for p in crud.get_all_complete_profiles()}
+
+    assert len(log) == 2
+    assert container.queries == 1
+    # Student 3 has no profile doc and student 99 is not active
+    assert set(profiles) == {1, 2}
+
+    ada = profiles[1]
+    assert ada["first_name"] == "Ada" and ada["year_name"] == "Year 1"
+    assert [c["class_name"] for c in ada["classes"]] == ["Biology", "Art"]
+    assert ada["profile_summaries"]["strengths_short"] == "Kind"
+    assert ada["profile_summaries"]["vision"] == "V"
+
+    # Missing year behaves like the single-profile INNER JOIN: no SQL details
+    tom = profiles[2]
+    assert tom["first_name"] is None and tom["year_name"] is None
+    assert tom["classes"] == []
+    assert tom["strengths"] == ["Fast"]
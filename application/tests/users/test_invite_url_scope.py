@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from application.features.users import routes
+
+USERS = {
+    10: {"id": 10, "roles": ["Admin"], "is_active": False},
+    11: {"id": 11, "roles": ["Student"], "is_active": False},
+    12: {"id": 12, "roles": ["Student"], "is_active": False},
+}
+PEER_TUTOR = {"user_id": 2, "role_names": ["Peer Tutor"]}
+ADMIN = {"user_id": 1, "role_names": ["Admin"]}
+
+
+@pytest.fixture
+def issued(monkeypatch):
+    issued = []
+    monkeypatch.setattr(routes, "get_user_with_roles_by_id", lambda user_id: USERS.get(user_id))
+    # Tutor 2 is assigned the student with user id 11 only
+    monkeypatch.setattr(routes, "is_user_in_tutor_scope", lambda tutor_user_id, user_id: user_id == 11)
+
+    def regenerate(user_id):
+        issued.append(user_id)
+        return f"https://app/complete-invite?token={user_id}"
+
+    monkeypatch.setattr(routes, "regenerate_invite_url", regenerate)
+    return issued
+
+
+def _regenerate(user_id, user_data):
+    return asyncio.run(routes.regenerate_user_invite_url(user_id, user_data))
+
+
+def test_peer_tutor_can_only_reissue_invites_for_their_students(issued):
+    assert _regenerate(11, PEER_TUTOR)["user_id"] == 11
+
+    for user_id in (10, 12):
+        with pytest.raises(HTTPException) as denied:
+            _regenerate(user_id, PEER_TUTOR)
+        assert denied.value.status_code == 403
+
+    assert issued == [11]
+
+
+def test_admin_can_reissue_any_pending_invite(issued):
+    assert _regenerate(10, ADMIN)["user_id"] == 10
+    assert _regenerate(12, ADMIN)["user_id"] == 12
+
+
+def test_unknown_user_is_not_found(issued):
+    with pytest.raises(HTTPException) as missing:
+        _regenerate(99, ADMIN)
+    assert missing.value.status_code == 404
+    assert issued == []
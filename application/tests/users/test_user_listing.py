@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+
+from application.features.users.crud import user_queries
+
+
+USERS = [
+    (1, "Ada", "L", "ada@x.com", "ada@gt.edu", None, True),
+    (2, "Tom", "T", "tom@x.com", "tom@gt.edu", None, True),
+    (3, "Sam", "S", "sam@x.com", "sam@gt.edu", None, True),
+    (4, "New", "N", "new@x.com", "new@gt.edu", None, False),
+    (5, "Pat", "P", "pat@x.com", "pat@gt.edu", None, True),
+]
+ROLES = [(1, 1, "Admin"), (2, 3, "Peer Tutor"), (3, 4, "Student"), (4, 4, "Student"), (5, 4, "Student")]
+TUTORS = [(2,)]
+STUDENTS = [(3, 30, "Year 1"), (5, 50, "Year 2")]
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+        self.description = None
+        self._rows = []
+
+    def execute(self, query, params=()):
+        self.log.append((query, params))
+        if "FROM Users u" in query:
+            self.description = [(c,) for c in (
+                "id", "first_name", "last_name", "email", "gt_email", "profile_picture_url", "is_active"
+            )]
+            self._rows = USERS
+        elif "FROM Roles r" in query:
+            self._rows = ROLES
+        elif "FROM TutorStudents ts" in query:
+            self._rows = TUTORS
+        elif "FROM Students s" in query:
+            self._rows = STUDENTS
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class FakeConnection:
+    def __init__(self, log):
+        self.log = log
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+
+class FakeContainer:
+    def __init__(self, student_ids):
+        self.student_ids = student_ids
+        self.queries = 0
+
+    def query_items(self, query, parameters=None, enable_cross_partition_query=False):
+        self.queries += 1
+        requested = parameters[0]["value"]
+        return [sid for sid in requested if sid in self.student_ids]
+
+
+def _patch(monkeypatch, container):
+    log = []
+
+    @contextmanager
+    def fake_connection():
+        yield FakeConnection(log)
+
+    monkeypatch.setattr(user_queries, "get_sql_db_connection", fake_connection)
+    monkeypatch.setattr(user_queries, "get_container", lambda name: container)
+    return log
+
+
+def test_listing_uses_constant_queries_and_tags_users(monkeypatch):
+    container = FakeContainer(student_ids={30})
+    log = _patch(monkeypatch, container)
+
+    users = {u["id"]: u for u in user_queries.get_all_users_with_roles()}
+
+    assert len(log) == 4
+    assert container.queries == 1
+    assert users[1]["profile_tag"] is None
+    assert users[2]["profile_tag"] is None
+    assert users[3]["profile_tag"] is None and users[3]["student_id"] == 30
+    assert users[4]["profile_tag"] == "Awaiting Activation"
+    assert users[5]["profile_tag"] == "Profile Incomplete"
+    assert all(u["invite_url"] is None for u in users.values())
+
+
+def test_role_filter_is_applied_to_every_query(monkeypatch):
+    log = _patch(monkeypatch, FakeContainer(student_ids=set()))
+
+    user_queries.get_all_users_with_roles(role_id=4)
+
+    assert all("ur.role_id = ?" in query and params == (4,) for query, params in log)
+
+
+def test_invite_urls_only_generated_when_requested(monkeypatch):
+    _patch(monkeypatch, FakeContainer(student_ids=set()))
+    calls = []
+
+    from application.features.users.crud import user_invitations
+
+    def fake_regenerate(user_ids):
+        calls.append(list(user_ids))
+        return {uid: f"https://app/complete-invite?token={uid}" for uid in user_ids}
+
+    monkeypatch.setattr(user_invitations, "regenerate_invite_urls", fake_regenerate)
+
+    user_queries.get_all_users_with_roles()
+    assert calls == []
+
+    users = {u["id"]: u for u in user_queries.get_all_users_with_roles(include_invite_urls=True)}
+    assert calls == [[4]]
+    assert users[4]["invite_url"].endswith("token=4")
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from application.features.versionHistory.version_summaries import (
+    _from_document,
+    _to_document,
+    summarize_versions,
+)
+
+
+def test_summarize_versions_without_versions_is_pending():
+    summary = summarize_versions([])
+
+    assert summary["finalized"] is False
+    assert summary["rating_status"] == "Pending"
+    assert summary["date_modified"] is None
+    assert summary["final_version_id"] is None
+    assert summary["version_count"] == 0
+
+
+def test_summarize_versions_rated_finalized_version():
+    versions = [
+        {"id": "a", "date_modified": "2025-07-14T15:00:00Z", "finalized": False},
+        {"id": "b", "date_modified": "2025-07-15T09:30:00", "finalized": True, "rating_data": {"goals_section": {}}},
+    ]
+
+    summary = summarize_versions(versions)
+
+    assert summary["finalized"] is True
+    assert summary["rating_status"] == "Rated"
+    assert summary["final_version_id"] == "b"
+    assert summary["date_modified"] == datetime(2025, 7, 15, 9, 30)
+    assert summary["version_count"] == 2
+
+
+def test_summarize_versions_partially_rated():
+    versions = [
+        {"id": "a", "finalized": True},
+        {"id": "b", "rating_data": {"goals_section": {}}},
+    ]
+
+    assert summarize_versions(versions)["rating_status"] == "Partially Rated"
+
+
+def test_summary_document_round_trip():
+    summary = summarize_versions([
+        {"id": "a", "date_modified": "2025-07-14T15:00:00Z", "finalized": True},
+    ])
+
+    document = _to_document(57, summary)
+
+    assert document["id"] == "57"
+    assert document["assignment_id"] == 57
+    assert _from_document(document) == {
+        "finalized": True,
+        "rating_status": "Pending",
+        "date_modified": datetime(2025, 7, 14, 15, 0),
+        "final_version_id": "a",
+    }
@@ -1,11 +1,9 @@
 # gpt_client.py
 import json
 from typing import Iterator, Callable, List, Dict, Any
-from openai import OpenAI
+from application.features.gpt.openai_client import get_openai_client, openai_limiter, timeout_for
 from application.utils.openai_tools import EMIT_SECTION_TOOL
 
-client = OpenAI()
-
 def _buf_key(ev) -> str | None:
     # Works across event shapes
     return getattr(ev, "item_id", None) or getattr(getattr(ev, "item", None), "id", None)
@@ -53,13 +51,14 @@ def stream_sections_with_tools(
         yield f'event: section\ndata: {json.dumps({"key": key, "html": html})}\n\n'
 
     try:
-        with client.responses.stream(
+        with openai_limiter.slot(), get_openai_client().responses.stream(
             model=model,
             input=messages,
             tools=EMIT_SECTION_TOOL,
             tool_choice="auto",
             # temperature=0.2,
-            max_output_tokens=9000
+            max_output_tokens=9000,
+            timeout=timeout_for("stream"),
         ) as stream:
             for event in stream:
                 et = event.type
@@ -2,23 +2,14 @@ import datetime
 import os
 from dotenv import load_dotenv
 from fastapi import HTTPException
-from application.database.nosql_connection import get_cosmos_db_connection
+from application.database.nosql_connection import get_container
 from application.features.assignment_version_generation.assignment_context import build_prompt_for_version
 from gpt_client_nonstream import process_gpt_prompt_json
 
 
 load_dotenv()
-DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME")
 GPT_MODEL = os.getenv("GPT_MODEL")
 
-PROFILE_CONTAINER_NAME = "ai-student-profile"
-VERSIONS_CONTAINER_NAME = "ai-assignment-versions-v2"
-
-_cosmos = get_cosmos_db_connection()
-_db = _cosmos.get_database_client(DATABASE_NAME)
-versions_container = _db.get_container_client(VERSIONS_CONTAINER_NAME)
-profile_container  = _db.get_container_client(PROFILE_CONTAINER_NAME)
-
 
 def handle_assignment_version_generation(
     assignment_version_id: str,
@@ -26,6 +17,7 @@ def handle_assignment_version_generation(
     additional_edit_suggestions: str | None
 ):
     # Build messages + context (same as streaming)
+    versions_container = get_container()
     messages, ctx = build_prompt_for_version(
         assignment_version_id=assignment_version_id,
         selected_options=selected_options,